@@ -1,6 +1,16 @@
+import sys
+import asyncio
+import logging
+from pathlib import Path
+
 import psycopg2
 from psycopg2 import Error
-import logging
+
+# Каталог проекта - для импорта модулей приложения при запуске скрипта по пути
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config import settings  # noqa: E402
+from src.migrations import run as migrate  # noqa: E402
 
 # Настройка логирования
 logging.basicConfig(
@@ -10,13 +20,16 @@ logger = logging.getLogger(__name__)
 
 # Параметры подключения к базе данных
 db_params = {
-    "dbname": "postgres",
-    "user": "postgres",
-    "password": "postgres",
-    "host": "localhost",
-    "port": "5434",
+    "dbname": settings.DB_NAME,
+    "user": settings.DB_USER,
+    "password": settings.DB_PASS,
+    "host": settings.DB_HOST,
+    "port": settings.DB_PORT,
 }
 
+# Каталог с CSV-файлами
+DATA_DIR = Path(__file__).resolve().parent
+
 # Список таблиц и соответствующих CSV-файлов с колонками
 tables = [
     {
@@ -41,46 +54,6 @@ tables = [
     },
 ]
 
-create_script = """
-CREATE TYPE NATIONALITY AS ENUM ('Russian', 'American', 'British', 'French', 'German');
-
-CREATE TABLE authors (
-    author_id SERIAL PRIMARY KEY,
-    first_name VARCHAR(50) NOT NULL,
-    last_name VARCHAR(50) NOT NULL,
-    nationality NATIONALITY NOT NULL
-);
-
-CREATE TYPE BOOK_CATEGORY AS ENUM ('Fiction', 'Non-fiction', 'Science', 'History', 'Fantasy');
-
-CREATE TABLE books (
-    book_id SERIAL PRIMARY KEY,
-    title VARCHAR(50) UNIQUE NOT NULL,
-    publication_year DATE NOT NULL,
-    category BOOK_CATEGORY NOT NULL,
-    author_id INT,
-    CONSTRAINT fk_author FOREIGN KEY (author_id) REFERENCES authors (author_id) ON DELETE SET NULL
-);
-
-CREATE TABLE readers (
-    reader_id SERIAL PRIMARY KEY,
-    first_name VARCHAR(50) NOT NULL,
-    last_name VARCHAR(50) NOT NULL,
-    email VARCHAR(255) UNIQUE NOT NULL,
-    CONSTRAINT valid_email CHECK (
-        email ~* '^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$'
-    )
-);
-
-CREATE TABLE book_readers (
-    book_id INT,
-    reader_id INT,
-    CONSTRAINT fk_book FOREIGN KEY (book_id) REFERENCES books (book_id) ON DELETE CASCADE,
-    CONSTRAINT fk_reader FOREIGN KEY (reader_id) REFERENCES readers (reader_id) ON DELETE CASCADE,
-    PRIMARY KEY (book_id, reader_id)
-);
-"""
-
 synchronize_script = """
 SELECT setval(
         'authors_author_id_seq', (
@@ -104,24 +77,10 @@ SELECT setval('readers_reader_id_seq', (
 """
 
 
-def check_table_exists(cursor, table_name):
-    """Проверка существования таблицы в базе данных."""
-    cursor.execute(
-        """
-        SELECT EXISTS (
-            SELECT FROM information_schema.tables 
-            WHERE table_name = %s
-        );
-    """,
-        (table_name,),
-    )
-    return cursor.fetchone()[0]
-
-
 def import_csv_to_table(cursor, table_name, csv_file, columns):
     """Импорт данных из CSV в указанную таблицу, пустые строки интерпретируются как NULL."""
     try:
-        with open(csv_file, "r", encoding="utf-8") as f:
+        with open(DATA_DIR / csv_file, "r", encoding="utf-8") as f:
             next(f)  # Пропускаем заголовок
             cursor.copy_from(f, table_name, sep=",", columns=columns, null="")
         logger.info(f"Successfully imported data from {csv_file} into {table_name}")
@@ -138,6 +97,10 @@ def main():
     conn = None
     cur = None
     try:
+        # Схема создаётся или обновляется миграциями (src/migrations.py)
+        logger.info("Applying migrations...")
+        asyncio.run(migrate())
+
         logger.info("Connecting to the database...")
         conn = psycopg2.connect(**db_params)
         cur = conn.cursor()
@@ -148,10 +111,6 @@ def main():
             csv_file = table["csv_file"]
             columns = table["columns"]
 
-            # Проверка существования таблицы
-            if not check_table_exists(cur, table_name):
-                cur.execute(create_script)
-
             logger.info(f"Importing data into {table_name} from {csv_file}...")
             import_csv_to_table(cur, table_name, csv_file, columns)
 
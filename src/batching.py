@@ -0,0 +1,111 @@
+"""
+Модуль для объединения точечных чтений параллельных запросов.
+
+`BatchLoader` собирает чтения объектов по первичному ключу, поступившие
+от разных запросов воркера за короткое окно (`POINT_READ_BATCH_WINDOW`)
+или до `POINT_READ_BATCH_SIZE` ключей, и выполняет их одним запросом
+`WHERE id IN (...)`. Одинаковые ключи читаются один раз, а результаты
+раздаются ожидающим запросам. Так при всплеске промахов кэша запросы
+не занимают по соединению из пула на каждое чтение.
+
+Пакет читается в отдельной сессии вне единицы работы запроса (при наличии
+реплик - из реплики). Запрос, который уже писал в своей единице работы или
+закреплён за основной БД, должен видеть свои изменения, поэтому читает
+в своей сессии, не объединяясь с другими.
+"""
+
+import time
+import asyncio
+from typing import Any, Optional
+
+from sqlalchemy import select
+from sqlalchemy.exc import NoResultFound
+from sqlalchemy.orm import InstrumentedAttribute
+
+from src.config import POINT_READ_BATCH_WINDOW, POINT_READ_BATCH_SIZE
+from src.database import async_session_maker, current_unit, detached_context
+from src.replicas import primary_until
+
+
+class BatchLoader:
+    """Класс для чтения объектов по первичному ключу пакетами между запросами."""
+
+    def __init__(
+        self,
+        entity: type,
+        key: InstrumentedAttribute,
+        window: float = POINT_READ_BATCH_WINDOW,
+        max_size: int = POINT_READ_BATCH_SIZE,
+    ):
+        """
+        Инициализирует загрузчик.
+
+        Args:
+            entity (type): Класс модели ORM.
+            key (InstrumentedAttribute): Атрибут первичного ключа.
+            window (float): Окно сбора пакета в секундах (0 - без объединения).
+            max_size (int): Размер пакета, при котором он читается сразу.
+        """
+        self.entity = entity
+        self.key = key
+        self.window = window
+        self.max_size = max_size
+        self.pending: dict[Any, asyncio.Future] = {}
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.tasks: set[asyncio.Task] = set()
+
+    def can_batch(self) -> bool:
+        """Проверяет, можно ли объединить чтение текущего запроса с другими."""
+        if self.window <= 0 or time.time() < primary_until.get():
+            return False
+        unit = current_unit.get()
+        return unit is None or not unit.session.info.get("primary")
+
+    async def load(self, id: Any) -> Any:
+        """
+        Получает объект по первичному ключу в пакете с чтениями других запросов.
+
+        Raises:
+            NoResultFound: Объекта нет.
+        """
+        future = self.pending.get(id)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self.pending[id] = future
+            if len(self.pending) >= self.max_size:
+                self._flush()
+            elif self.timer is None:
+                self.timer = asyncio.get_running_loop().call_later(
+                    self.window, self._flush
+                )
+        # Отмена одного запроса не должна отменять чтение для остальных
+        obj = await asyncio.shield(future)
+        if obj is None:
+            raise NoResultFound(f"{self.entity.__name__} {id} not found")
+        return obj
+
+    def _flush(self) -> None:
+        """Запускает чтение собранного пакета."""
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        batch, self.pending = self.pending, {}
+        task = asyncio.create_task(self._read(batch), context=detached_context())
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _read(self, batch: dict[Any, asyncio.Future]) -> None:
+        """Читает пакет одним запросом и раздаёт результаты ожидающим."""
+        try:
+            async with async_session_maker() as session:
+                stmt = select(self.entity).where(self.key.in_(list(batch)))
+                result = await session.execute(stmt)
+                found = {getattr(obj, self.key.key): obj for obj in result.scalars()}
+        except Exception as error:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for id, future in batch.items():
+            if not future.done():
+                future.set_result(found.get(id))
@@ -0,0 +1,210 @@
+"""
+Модуль для пакетной записи объектов.
+
+Элементы записываются пачками по `BULK_BATCH_SIZE` в одной транзакции,
+по одному пакетному запросу на пачку. Пачка выполняется в точке сохранения
+(SAVEPOINT): при нарушении ограничения (IntegrityError) она откатывается
+и повторяется поэлементно, тоже в точках сохранения, чтобы отметить
+конфликтующие элементы и записать остальные.
+"""
+
+from typing import Any, Awaitable, Callable, Iterator, NamedTuple, Optional, Sequence
+
+from fastapi import status
+from pydantic import BaseModel as BaseSchema
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import BULK_BATCH_SIZE
+from src.schemas.bulk import BulkItemResult, BulkResponse
+
+# Корутина, выполняемая перед удалением пачки объектов по их ID
+BeforeDelete = Callable[[AsyncSession, list[int]], Awaitable[None]]
+
+
+class BulkResult(NamedTuple):
+    """Результат операции над одним элементом пачки."""
+
+    status: int
+    object: Optional[Any] = None
+    detail: Optional[str] = None
+
+
+# Результаты элементов, которые не удалось записать
+NOT_FOUND = BulkResult(status.HTTP_404_NOT_FOUND, detail="Объект не найден.")
+CONFLICT = BulkResult(status.HTTP_409_CONFLICT, detail="Запрещена операция.")
+
+
+def batches(items: Sequence[Any]) -> Iterator[Sequence[Any]]:
+    """Разбивает элементы на пачки по `BULK_BATCH_SIZE`."""
+    for start in range(0, len(items), BULK_BATCH_SIZE):
+        yield items[start : start + BULK_BATCH_SIZE]
+
+
+async def bulk_insert(
+    session: AsyncSession, model: type, rows: Sequence[dict]
+) -> list[BulkResult]:
+    """Создаёт объекты пачками запросов INSERT ... RETURNING."""
+    results = []
+    for batch in batches(rows):
+        try:
+            async with session.begin_nested():
+                objects = await _insert(session, model, batch)
+            results.extend(BulkResult(status.HTTP_200_OK, obj) for obj in objects)
+        except IntegrityError:
+            for row in batch:
+                results.append(
+                    await _isolated(
+                        session, lambda row=row: _insert(session, model, [row])
+                    )
+                )
+    return results
+
+
+async def bulk_update(
+    session: AsyncSession, model: type, pk: str, items: Sequence[tuple[int, dict]]
+) -> list[BulkResult]:
+    """
+    Обновляет объекты по ID, увеличивая их версии.
+
+    Элементы пачки с одинаковым набором полей обновляются одним запросом
+    с несколькими наборами параметров, затем пачка читается одним запросом IN.
+    """
+    results = []
+    for batch in batches(items):
+        try:
+            async with session.begin_nested():
+                objects = await _update(session, model, pk, batch)
+            results.extend(_found(objects, id) for id, _ in batch)
+        except IntegrityError:
+            for item in batch:
+                results.append(
+                    await _isolated(
+                        session,
+                        lambda item=item: _update(session, model, pk, [item]),
+                        item[0],
+                    )
+                )
+    return results
+
+
+async def bulk_delete(
+    session: AsyncSession,
+    model: type,
+    pk: str,
+    ids: Sequence[int],
+    before: Optional[BeforeDelete] = None,
+) -> list[BulkResult]:
+    """Удаляет объекты по ID пачками запросов DELETE ... WHERE id IN (...)."""
+    results = []
+    for batch in batches(ids):
+        try:
+            async with session.begin_nested():
+                objects = await _delete(session, model, pk, batch, before)
+            results.extend(_found(objects, id) for id in batch)
+        except IntegrityError:
+            for id in batch:
+                results.append(
+                    await _isolated(
+                        session,
+                        lambda id=id: _delete(session, model, pk, [id], before),
+                        id,
+                    )
+                )
+    return results
+
+
+def bulk_response(
+    results: Sequence[BulkResult], schema: type[BaseSchema]
+) -> BulkResponse:
+    """Строит ответ пакетной операции из результатов элементов."""
+    items = [
+        BulkItemResult(
+            index=index,
+            status=result.status,
+            data=schema.model_validate(result.object) if result.object else None,
+            detail=result.detail,
+        )
+        for index, result in enumerate(results)
+    ]
+    succeeded = sum(result.status == status.HTTP_200_OK for result in results)
+    return BulkResponse(
+        results=items, succeeded=succeeded, failed=len(results) - succeeded
+    )
+
+
+async def _insert(session: AsyncSession, model: type, rows: Sequence[dict]) -> list:
+    """Вставляет строки, возвращая объекты в порядке строк."""
+    stmt = insert(model).returning(model, sort_by_parameter_order=True)
+    result = await session.execute(stmt, list(rows))
+    return list(result.scalars().all())
+
+
+async def _update(
+    session: AsyncSession, model: type, pk: str, items: Sequence[tuple[int, dict]]
+) -> dict[int, Any]:
+    """Обновляет объекты и возвращает найденные по ID."""
+    table, column = model.__table__, getattr(model, pk)
+    groups: dict[tuple[str, ...], list[dict]] = {}
+    for id, values in items:
+        params = {f"b_{name}": value for name, value in values.items()}
+        groups.setdefault(tuple(sorted(values)), []).append({"b_id": id, **params})
+    for names, params in groups.items():
+        stmt = (
+            update(table)
+            .where(table.c[pk] == bindparam("b_id"))
+            .values(
+                {
+                    **{name: bindparam(f"b_{name}") for name in names},
+                    "version": table.c.version + 1,
+                }
+            )
+        )
+        await session.execute(stmt, params)
+
+    stmt = (
+        select(model)
+        .where(column.in_([id for id, _ in items]))
+        .execution_options(populate_existing=True)
+    )
+    result = await session.execute(stmt)
+    return {getattr(obj, pk): obj for obj in result.scalars()}
+
+
+async def _delete(
+    session: AsyncSession,
+    model: type,
+    pk: str,
+    ids: Sequence[int],
+    before: Optional[BeforeDelete],
+) -> dict[int, Any]:
+    """Удаляет объекты и возвращает удалённые по ID."""
+    if before is not None:
+        await before(session, list(ids))
+    stmt = delete(model).where(getattr(model, pk).in_(ids)).returning(model)
+    result = await session.execute(stmt)
+    return {getattr(obj, pk): obj for obj in result.scalars()}
+
+
+async def _isolated(
+    session: AsyncSession,
+    operation: Callable[[], Awaitable[list | dict]],
+    id: Optional[int] = None,
+) -> BulkResult:
+    """Выполняет операцию над одним элементом в отдельной точке сохранения."""
+    try:
+        async with session.begin_nested():
+            objects = await operation()
+    except IntegrityError:
+        return CONFLICT
+    if id is None:
+        return BulkResult(status.HTTP_200_OK, objects[0])
+    return _found(objects, id)
+
+
+def _found(objects: dict[int, Any], id: int) -> BulkResult:
+    """Возвращает результат элемента по найденным объектам."""
+    if id in objects:
+        return BulkResult(status.HTTP_200_OK, objects[id])
+    return NOT_FOUND
@@ -0,0 +1,906 @@
+"""
+Модуль для кэширования ответов в Redis с согласованной инвалидацией.
+
+Каждая запись кэша зависит от набора пространств имён (например, `book:list`
+или `book:42`). У пространства имён есть поколение - ключ `gen:<пространство>`
+в Redis. Запись сохраняется вместе со штампом поколений, прочитанных до
+обращения к базе данных, и при чтении сверяется с текущими поколениями
+одним запросом MGET. Запись в сущность сбрасывает поколения всех зависимых
+пространств согласно графу `INVALIDATION_GRAPH`, поэтому устаревшие ключи
+не нужно искать перебором - они перестают совпадать со штампом и истекают
+по TTL.
+
+`Cache.get_or_set` защищает источник от лавины промахов: одновременные
+промахи в воркере объединяются, между воркерами пересчёт защищён блокировкой
+в Redis, а записи пересчитываются заранее и отдаются устаревшими, пока
+новое значение вычисляется в фоне.
+
+Декоратор `cached_response` подключает кэш к маршруту: ключ и зависимости
+задаются шаблонами от параметров маршрута, а попадание отдаёт сохранённые
+байты JSON без повторной сериализации. Ответ 404 тоже кэшируется - как
+короткоживущая «надгробная» запись, которую сбрасывает создание объекта.
+
+Записи в Redis кодируются модулем `src.cache_codec` (версия формата
+и сжатие крупных значений).
+
+Перед Redis стоит ограниченный кэш в памяти процесса (L1). Воркеры
+поддерживают его согласованность через канал Redis pub/sub, в который
+`Cache.invalidate` публикует сброшенные пространства имён.
+
+Обращения к маршрутам учитываются прогревателем `src.warmer`, который
+заполняет кэш при запуске и сразу после инвалидации.
+"""
+
+import json
+import math
+import inspect
+import hashlib
+import time
+import random
+import asyncio
+import logging
+from functools import wraps
+from collections import OrderedDict
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Iterable,
+    NamedTuple,
+    Optional,
+    Sequence,
+)
+
+from fastapi import HTTPException, Request, Response, status
+from pydantic import BaseModel as BaseSchema
+from redis.exceptions import RedisError
+
+from src.cache_codec import encode, decode, cache_stats
+from src.config import (
+    CACHE_TTL,
+    CACHE_STALE_TTL,
+    NEGATIVE_CACHE_TTL,
+    L1_CACHE_MAX_ITEMS,
+    L1_CACHE_TTL,
+    HTTP_CACHE_MAX_AGE,
+)
+from src.database import after_commit, detached_context
+from src.replicas import replicas
+from src.utils import RedisClient, get_redis_client
+from src.warmer import warmer, WARMER_HEADER
+
+logger = logging.getLogger(__name__)
+
+# Граф зависимостей: сущность -> действие -> сбрасываемые пространства имён.
+# Шаблон `{id}` подставляется для каждого затронутого идентификатора.
+INVALIDATION_GRAPH: dict[str, dict[str, tuple[str, ...]]] = {
+    # Создание сбрасывает и `{id}`, чтобы снять надгробную запись отсутствия
+    "author": {
+        "create": ("author:list", "author:{id}"),
+        "update": ("author:list", "author:{id}"),
+        # Удаление автора обнуляет author_id у его книг (ON DELETE SET NULL)
+        "delete": ("author:list", "author:{id}", "book:list", "book:detail"),
+    },
+    # Детали читателя собираются из общих записей книг (см. `src.entity_cache`),
+    # поэтому изменение книги не сбрасывает детали читателей
+    "book": {
+        "create": ("book:list", "book:{id}"),
+        "update": ("book:list", "book:{id}"),
+        "delete": ("book:list", "book:{id}"),
+    },
+    "reader": {
+        "create": ("reader:list", "reader:{id}", "reader:{id}:books"),
+        "update": ("reader:list", "reader:{id}"),
+        "delete": ("reader:list", "reader:{id}", "reader:{id}:books"),
+        # Выдача и возврат книги меняют множество книг читателя, его версию
+        # (ETag записи читателя) и списки читателей с вложенными книгами
+        # (`expand=books`)
+        "borrow": ("reader:{id}", "reader:{id}:books", "reader:list:books"),
+    },
+}
+
+# Время жизни поколений отдельных объектов. Должно превышать время жизни
+# любой записи кэша, чтобы истёкшее поколение не совпало со старым штампом.
+GENERATION_TTL = CACHE_TTL * 10
+
+# Разделитель полей заголовка и значения в записи кэша
+STAMP_SEPARATOR = b"|"
+
+# Параметры блокировки пересчёта записи между воркерами (в секундах)
+LOCK_TIMEOUT = 10
+LOCK_WAIT = 2
+LOCK_POLL_INTERVAL = 0.05
+
+# Коэффициент вероятностного раннего пересчёта (больше - раньше)
+XFETCH_BETA = 1.0
+
+# Канал pub/sub для рассылки инвалидаций между воркерами
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+
+def generation_key(namespace: str) -> str:
+    """Возвращает ключ Redis, хранящий поколение пространства имён."""
+    return f"gen:{namespace}"
+
+
+def new_generation() -> str:
+    """Создаёт новое, не повторяющееся значение поколения."""
+    return format(time.time_ns(), "x")
+
+
+def make_etag(key: str, version: str) -> str:
+    """Строит слабый ETag из ключа записи и версии её значения."""
+    digest = hashlib.blake2b(f"{key}:{version}".encode(), digest_size=8)
+    return f'W/"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Проверяет заголовок If-None-Match по правилам слабого сравнения."""
+    if not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag.removeprefix("W/") in tags
+
+
+class Stamp(NamedTuple):
+    """
+    Штамп поколений, снятый до чтения данных из источника.
+
+    Для записи из кэша процесса поколения не читаются (None): с таким
+    штампом запись не сохраняется в Redis и не получает ETag поколений.
+    """
+
+    generations: Optional[bytes]
+    depends: tuple[str, ...]
+    local: tuple[int, float]
+
+
+class CacheEntry(NamedTuple):
+    """
+    Запись кэша: значение, логический срок годности, время расчёта,
+    валидатор (ETag) значения и HTTP-статус ответа.
+
+    Запись со статусом 404 - надгробная: она запоминает отсутствие объекта.
+    """
+
+    value: bytes
+    expires_at: float
+    delta: float
+    etag: str = ""
+    status: int = status.HTTP_200_OK
+
+    @property
+    def is_tombstone(self) -> bool:
+        """Проверяет, запоминает ли запись отсутствие объекта."""
+        return self.status == status.HTTP_404_NOT_FOUND
+
+    def should_refresh(self) -> bool:
+        """
+        Проверяет, пора ли пересчитать запись.
+
+        Просроченная запись требует пересчёта всегда, свежая - с вероятностью,
+        растущей по мере приближения к сроку годности и пропорциональной
+        времени расчёта (вероятностный ранний пересчёт, XFetch).
+        """
+        now = time.time()
+        if now >= self.expires_at:
+            return True
+        jitter = -self.delta * XFETCH_BETA * math.log(1.0 - random.random())
+        return now + jitter >= self.expires_at
+
+
+class LocalCache:
+    """
+    Кэш в памяти процесса с вытеснением LRU и ограничением времени жизни.
+
+    Вместо поколений Redis использует локальную эпоху: сброс пространства
+    имён запоминает номер эпохи, и записи, снятые до него, считаются
+    устаревшими. Сбросы старше времени жизни записей забываются, поэтому
+    память ограничена и числом записей, и частотой инвалидаций.
+    """
+
+    def __init__(self, max_items: int, ttl: int):
+        """Инициализирует кэш с максимальным числом записей и TTL в секундах."""
+        self.max_items = max_items
+        self.ttl = ttl
+        # Кэш работает только при активной подписке на инвалидации
+        self.active = False
+        self.epoch = 0
+        self.cleared_epoch = 0
+        self.entries: OrderedDict[
+            str, tuple[float, int, tuple[str, ...], CacheEntry]
+        ] = OrderedDict()
+        self.bumps: OrderedDict[str, tuple[int, float]] = OrderedDict()
+
+    def snapshot(self) -> tuple[int, float]:
+        """Возвращает текущую эпоху и время, с которыми будет сохранена запись."""
+        return self.epoch, time.monotonic()
+
+    def is_stale(self, depends: Iterable[str], epoch: int) -> bool:
+        """Проверяет, сбрасывались ли зависимости после указанной эпохи."""
+        if epoch < self.cleared_epoch:
+            return True
+        return any(self.bumps.get(ns, (0, 0.0))[0] > epoch for ns in depends)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Получает запись, если она не истекла и не была инвалидирована."""
+        if not self.active:
+            return None
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, epoch, depends, cached = entry
+        if expires_at <= time.monotonic() or self.is_stale(depends, epoch):
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return cached
+
+    def set(self, key: str, entry: CacheEntry, stamp: Stamp) -> None:
+        """
+        Сохраняет запись, если её зависимости не сбрасывались после штампа.
+
+        Запись живёт не дольше TTL кэша процесса и своего срока годности.
+        """
+        if not self.active or self.max_items <= 0:
+            return
+        epoch, taken_at = stamp.local
+        if self.is_stale(stamp.depends, epoch):
+            return
+        expires_in = entry.expires_at - time.time()
+        expires_at = min(taken_at + self.ttl, time.monotonic() + expires_in)
+        self.entries[key] = (expires_at, epoch, stamp.depends, entry)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_items:
+            self.entries.popitem(last=False)
+
+    def bump(self, namespaces: Iterable[str]) -> None:
+        """Инвалидирует записи, зависящие от указанных пространств имён."""
+        self.epoch += 1
+        now = time.monotonic()
+        for namespace in namespaces:
+            self.bumps[namespace] = (self.epoch, now)
+            self.bumps.move_to_end(namespace)
+        while self.bumps:
+            _, (_, bumped_at) = next(iter(self.bumps.items()))
+            if bumped_at > now - self.ttl:
+                break
+            self.bumps.popitem(last=False)
+
+    def clear(self) -> None:
+        """Очищает кэш и отклоняет записи, снятые до очистки."""
+        self.epoch += 1
+        self.cleared_epoch = self.epoch
+        self.entries.clear()
+        self.bumps.clear()
+
+
+# Кэш в памяти текущего воркера
+local_cache = LocalCache(L1_CACHE_MAX_ITEMS, L1_CACHE_TTL)
+
+
+# Корутина, вычисляющая значение записи или пару (значение, ETag)
+Loader = Callable[[], Awaitable[str | bytes | tuple[str | bytes, str]]]
+
+# Вычисления значений, выполняемые в текущем воркере: (ключ, штамп) -> результат
+_inflight: dict[tuple[str, bytes], asyncio.Future] = {}
+
+# Фоновые задачи обновления кэша (ссылки не дают сборщику мусора их удалить)
+_background_tasks: set[asyncio.Task] = set()
+
+
+class Cache:
+    """Класс для работы с кэшем, учитывающим поколения зависимостей."""
+
+    def __init__(self, redis_client: Optional[RedisClient] = None):
+        """Инициализирует кэш поверх клиента Redis и кэша процесса."""
+        self.redis = redis_client or RedisClient()
+        self.local = local_cache
+
+    async def read(
+        self, key: str, depends: Iterable[str] = ()
+    ) -> tuple[Optional[CacheEntry], Stamp]:
+        """
+        Получает запись и текущий штамп поколений.
+
+        Сначала проверяется кэш процесса, затем Redis - одним запросом MGET
+        вместе с поколениями зависимостей. Запись с истёкшим логическим сроком
+        годности возвращается, пока она хранится в Redis, - решение о её
+        использовании принимает вызывающий код.
+
+        Returns:
+            tuple[Optional[CacheEntry], Stamp]: Запись (None, если её нет или
+            она инвалидирована) и штамп, с которым следует сохранять новое значение.
+        """
+        depends = tuple(depends)
+        local = self.local.snapshot()
+        entry = self.local.get(key)
+        if entry is not None:
+            return entry, Stamp(None, depends, local)
+
+        values = await self.redis.mget(
+            [key, *(generation_key(namespace) for namespace in depends)]
+        )
+        stamp = Stamp(
+            b".".join(generation or b"0" for generation in values[1:]),
+            depends,
+            local,
+        )
+        return self._unpack(key, values[0], stamp), stamp
+
+    async def read_many(
+        self, items: Sequence[tuple[str, tuple[str, ...]]]
+    ) -> list[tuple[Optional[CacheEntry], Stamp]]:
+        """
+        Получает несколько записей с их штампами поколений.
+
+        Записи, отсутствующие в кэше процесса, читаются из Redis одним
+        запросом MGET вместе с поколениями всех их зависимостей.
+
+        Args:
+            items (Sequence[tuple[str, tuple[str, ...]]]): Пары (ключ,
+                пространства имён, от которых зависит запись).
+
+        Returns:
+            list[tuple[Optional[CacheEntry], Stamp]]: Записи и штампы в порядке
+            запрошенных ключей.
+        """
+        local = self.local.snapshot()
+        results: list[Optional[tuple[Optional[CacheEntry], Stamp]]] = []
+        misses = []
+        for key, depends in items:
+            entry = self.local.get(key)
+            if entry is not None:
+                results.append((entry, Stamp(None, depends, local)))
+            else:
+                results.append(None)
+                misses.append(len(results) - 1)
+        if not misses:
+            return results
+
+        namespaces = list(
+            dict.fromkeys(ns for index in misses for ns in items[index][1])
+        )
+        values = await self.redis.mget(
+            [
+                *(items[index][0] for index in misses),
+                *(generation_key(namespace) for namespace in namespaces),
+            ]
+        )
+        generations = dict(zip(namespaces, values[len(misses) :]))
+        for index, raw in zip(misses, values):
+            key, depends = items[index]
+            stamp = Stamp(
+                b".".join(generations[namespace] or b"0" for namespace in depends),
+                depends,
+                local,
+            )
+            results[index] = (self._unpack(key, raw, stamp), stamp)
+        return results
+
+    async def _read_stamp(self, depends: tuple[str, ...]) -> Stamp:
+        """Снимает штамп текущих поколений зависимостей из Redis."""
+        local = self.local.snapshot()
+        values = (
+            await self.redis.mget([generation_key(ns) for ns in depends])
+            if depends
+            else []
+        )
+        return Stamp(
+            b".".join(generation or b"0" for generation in values), depends, local
+        )
+
+    def _unpack(
+        self, key: str, raw: Optional[bytes], stamp: Stamp
+    ) -> Optional[CacheEntry]:
+        """Декодирует запись из Redis и сверяет её штамп с текущими поколениями."""
+        body = decode(raw) if raw is not None else None
+        if body is None:
+            return None
+        cached_stamp, expires_at, delta, etag, code, value = body.split(
+            STAMP_SEPARATOR, 5
+        )
+        if cached_stamp != stamp.generations:
+            return None
+        entry = CacheEntry(
+            value, float(expires_at), float(delta), etag.decode(), int(code)
+        )
+        if entry.expires_at > time.time():
+            self.local.set(key, entry, stamp)
+        return entry
+
+    async def get(
+        self, key: str, depends: Iterable[str] = ()
+    ) -> tuple[Optional[bytes], Stamp]:
+        """
+        Получает значение и текущий штамп поколений.
+
+        Returns:
+            tuple[Optional[bytes], Stamp]: Значение (None, если записи нет, она
+            устарела, просрочена или надгробная) и штамп для сохранения
+            нового значения.
+        """
+        entry, stamp = await self.read(key, depends)
+        if entry is None or entry.is_tombstone or entry.expires_at <= time.time():
+            return None, stamp
+        return entry.value, stamp
+
+    async def set(
+        self,
+        key: str,
+        value: str | bytes,
+        stamp: Stamp,
+        expiration_time: int = CACHE_TTL,
+        delta: float = 0.0,
+        etag: str = "",
+        code: int = status.HTTP_200_OK,
+    ) -> CacheEntry:
+        """
+        Сохраняет значение со штампом поколений, полученным до чтения из БД.
+
+        Запись хранится в Redis на `CACHE_STALE_TTL` секунд дольше логического
+        срока годности, чтобы её можно было отдавать во время пересчёта.
+        Без явного ETag валидатором успешного ответа служит штамп поколений,
+        если все поколения уже заданы.
+        """
+        entry, data = self._pack(key, value, stamp, expiration_time, delta, etag, code)
+        if stamp.generations is not None:
+            await self.redis.set(key, data, expiration_time + CACHE_STALE_TTL)
+        self.local.set(key, entry, stamp)
+        return entry
+
+    async def set_many(
+        self,
+        items: Sequence[tuple[str, str | bytes, Stamp, str]],
+        expiration_time: int = CACHE_TTL,
+    ) -> list[CacheEntry]:
+        """
+        Сохраняет несколько значений одним конвейером.
+
+        Args:
+            items (Sequence[tuple[str, str | bytes, Stamp, str]]): Четвёрки
+                (ключ, значение, штамп, ETag).
+            expiration_time (int): Логический срок годности записей в секундах.
+
+        Returns:
+            list[CacheEntry]: Сохранённые записи в порядке ключей.
+        """
+        packed = [
+            (key, stamp, *self._pack(key, value, stamp, expiration_time, etag=etag))
+            for key, value, stamp, etag in items
+        ]
+        stored = {
+            key: data for key, stamp, _, data in packed if stamp.generations is not None
+        }
+        if stored:
+            await self.redis.mset(stored, expiration_time + CACHE_STALE_TTL)
+        for key, stamp, entry, _ in packed:
+            self.local.set(key, entry, stamp)
+        return [entry for _, _, entry, _ in packed]
+
+    def _pack(
+        self,
+        key: str,
+        value: str | bytes,
+        stamp: Stamp,
+        expiration_time: int,
+        delta: float = 0.0,
+        etag: str = "",
+        code: int = status.HTTP_200_OK,
+    ) -> tuple[CacheEntry, bytes]:
+        """
+        Строит запись и её закодированное представление для Redis.
+
+        ETag поколений строится, только если поколения прочитаны и все заданы.
+        """
+        if isinstance(value, str):
+            value = value.encode()
+        generations = stamp.generations
+        if (
+            not etag
+            and code == status.HTTP_200_OK
+            and generations is not None
+            and b"0" not in generations.split(b".")
+        ):
+            etag = make_etag(key, generations.decode())
+        entry = CacheEntry(value, time.time() + expiration_time, delta, etag, code)
+        header = STAMP_SEPARATOR.join(
+            (
+                generations or b"",
+                repr(entry.expires_at).encode(),
+                repr(delta).encode(),
+                etag.encode(),
+                str(code).encode(),
+            )
+        )
+        return entry, encode(header + STAMP_SEPARATOR + value)
+
+    async def get_or_set(
+        self,
+        key: str,
+        depends: Iterable[str],
+        loader: Loader,
+        expiration_time: int = CACHE_TTL,
+    ) -> CacheEntry:
+        """
+        Получает запись из кэша или вычисляет её с защитой от лавины промахов.
+
+        - Свежая запись возвращается сразу; близкая к истечению или просроченная
+          (но не инвалидированная) запись тоже возвращается, а пересчёт
+          запускается в фоне.
+        - Одновременные промахи в воркере ждут одно общее вычисление.
+        - Между воркерами вычисление защищено блокировкой в Redis: остальные
+          воркеры ждут появления значения, а не обращаются к БД.
+
+        Args:
+            key (str): Ключ записи.
+            depends (Iterable[str]): Пространства имён, от которых зависит запись.
+            loader (Loader): Корутина, вычисляющая значение (или значение
+                и ETag) из источника.
+            expiration_time (int): Логический срок годности записи в секундах.
+
+        Returns:
+            CacheEntry: Запись кэша.
+        """
+        entry, stamp = await self.read(key, depends)
+        if entry is not None:
+            cache_stats.negative_hits += entry.is_tombstone
+            if entry.should_refresh():
+                self._refresh_in_background(key, loader, stamp, expiration_time)
+            return entry
+
+        flight = (key, stamp.generations)
+        future = _inflight.get(flight)
+        if future is not None:
+            try:
+                entry = await asyncio.shield(future)
+                cache_stats.negative_hits += entry.is_tombstone
+                return entry
+            except asyncio.CancelledError:
+                # Ведущий запрос был отменён - вычисляем значение сами
+                if not future.cancelled():
+                    raise
+                return await self._load(key, loader, stamp, expiration_time)
+
+        future = asyncio.get_running_loop().create_future()
+        _inflight[flight] = future
+        try:
+            entry = await self._load(key, loader, stamp, expiration_time)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as error:
+            future.set_exception(error)
+            # Помечаем исключение полученным, если ожидающих запросов нет
+            future.exception()
+            raise
+        else:
+            future.set_result(entry)
+            return entry
+        finally:
+            del _inflight[flight]
+
+    async def _load(
+        self,
+        key: str,
+        loader: Loader,
+        stamp: Stamp,
+        expiration_time: int,
+    ) -> CacheEntry:
+        """Вычисляет запись под блокировкой Redis или дожидается чужого вычисления."""
+        lock_key, token = f"lock:{key}", new_generation()
+        if await self.redis.acquire_lock(lock_key, token, LOCK_TIMEOUT):
+            try:
+                return await self._compute(key, loader, stamp, expiration_time)
+            finally:
+                await self.redis.release_lock(lock_key, token)
+
+        deadline = time.monotonic() + LOCK_WAIT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(LOCK_POLL_INTERVAL)
+            entry, _ = await self.read(key, stamp.depends)
+            if entry is not None and entry.expires_at > time.time():
+                return entry
+        return await self._compute(key, loader, stamp, expiration_time)
+
+    async def _compute(
+        self,
+        key: str,
+        loader: Loader,
+        stamp: Stamp,
+        expiration_time: int,
+    ) -> CacheEntry:
+        """
+        Вычисляет значение и сохраняет его вместе со временем расчёта.
+
+        Если загрузчик сообщает об отсутствии объекта (HTTPException 404),
+        сохраняется надгробная запись с телом ошибки на `NEGATIVE_CACHE_TTL`.
+        """
+        started_at = time.monotonic()
+        try:
+            with replicas.fenced_reads(stamp.depends):
+                value, etag = await loader(), ""
+        except HTTPException as error:
+            if error.status_code != status.HTTP_404_NOT_FOUND:
+                raise
+            delta = time.monotonic() - started_at
+            return await self.set(
+                key,
+                json.dumps({"detail": error.detail}, ensure_ascii=False),
+                stamp,
+                min(expiration_time, NEGATIVE_CACHE_TTL),
+                delta,
+                code=error.status_code,
+            )
+        if isinstance(value, tuple):
+            value, etag = value
+        delta = time.monotonic() - started_at
+        return await self.set(key, value, stamp, expiration_time, delta, etag)
+
+    def _refresh_in_background(
+        self,
+        key: str,
+        loader: Loader,
+        stamp: Stamp,
+        expiration_time: int,
+    ) -> None:
+        """Запускает фоновый пересчёт записи, если он ещё не выполняется."""
+        if (key, stamp.generations) in _inflight:
+            return
+        # Загрузчик запроса не должен использовать его единицу работы
+        task = asyncio.create_task(
+            self._refresh(key, loader, stamp, expiration_time),
+            context=detached_context(),
+        )
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+    async def _refresh(
+        self,
+        key: str,
+        loader: Loader,
+        stamp: Stamp,
+        expiration_time: int,
+    ) -> None:
+        """Пересчитывает запись, если ни один воркер не делает этого сейчас."""
+        if stamp.generations is None:
+            # Запись из кэша процесса: сохраняем новую с текущими поколениями
+            try:
+                stamp = await self._read_stamp(stamp.depends)
+            except Exception:
+                logger.exception(f"Failed to refresh cache entry {key}")
+                return
+        flight = (key, stamp.generations)
+        if flight in _inflight:
+            return
+        lock_key, token = f"lock:{key}", new_generation()
+        future = asyncio.get_running_loop().create_future()
+        _inflight[flight] = future
+        entry = None
+        try:
+            if await self.redis.acquire_lock(lock_key, token, LOCK_TIMEOUT):
+                try:
+                    entry = await self._compute(key, loader, stamp, expiration_time)
+                finally:
+                    await self.redis.release_lock(lock_key, token)
+        except Exception:
+            logger.exception(f"Failed to refresh cache entry {key}")
+        finally:
+            del _inflight[flight]
+            if entry is None:
+                future.cancel()
+            else:
+                future.set_result(entry)
+
+    async def invalidate(self, entity: str, action: str, *ids: int) -> None:
+        """
+        Сбрасывает поколения пространств имён, зависящих от записи в сущность,
+        и оповещает остальные воркеры через pub/sub.
+
+        Внутри единицы работы запроса сброс выполняется после её фиксации.
+
+        Args:
+            entity (str): Имя сущности из `INVALIDATION_GRAPH`.
+            action (str): Выполненное действие (create, update, delete, ...).
+            *ids (int): Идентификаторы затронутых объектов.
+        """
+        await after_commit(lambda: self._invalidate(entity, action, ids))
+
+    async def _invalidate(self, entity: str, action: str, ids: Sequence[int]) -> None:
+        """Сбрасывает поколения и оповещает воркеры (см. `invalidate`)."""
+        generation = new_generation()
+        namespaces = []
+        async with self.redis.pipeline() as pipe:
+            for namespace in INVALIDATION_GRAPH[entity][action]:
+                if "{id}" not in namespace:
+                    namespaces.append(namespace)
+                    pipe.set(generation_key(namespace), generation)
+                    continue
+                for id in ids:
+                    namespaces.append(namespace.format(id=id))
+                    pipe.set(
+                        generation_key(namespaces[-1]),
+                        generation,
+                        ex=GENERATION_TTL,
+                    )
+            pipe.publish(INVALIDATION_CHANNEL, json.dumps(namespaces))
+            await pipe.execute()
+        self.local.bump(namespaces)
+        replicas.fence(namespaces)
+        warmer.refill(namespaces)
+
+
+async def listen_invalidations() -> None:
+    """
+    Применяет к кэшу процесса инвалидации, опубликованные другими воркерами.
+
+    Кэш процесса включается только после подписки на канал. При разрыве он
+    отключается, а при переподключении очищается, так как сообщения,
+    отправленные во время разрыва, могли быть потеряны.
+    """
+    while True:
+        try:
+            async with get_redis_client().pubsub() as pubsub:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                local_cache.clear()
+                local_cache.active = True
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        namespaces = json.loads(message["data"])
+                        local_cache.bump(namespaces)
+                        replicas.fence(namespaces)
+        except (RedisError, OSError) as error:
+            logger.warning(f"Cache invalidation channel is unavailable: {error}")
+            local_cache.active = False
+            local_cache.clear()
+            await asyncio.sleep(1)
+
+
+def cached_response(
+    key: str | Callable[..., str],
+    depends: Iterable[str] | Callable[..., Iterable[str]] = (),
+    expiration_time: int = CACHE_TTL,
+    version: Optional[Callable[..., Awaitable[str]]] = None,
+    bypass: Optional[Callable[..., bool]] = None,
+) -> Callable:
+    """
+    Декоратор маршрута, кэширующий сериализованный JSON-ответ.
+
+    Шаблоны ключа и зависимостей заполняются параметрами маршрута, поэтому
+    в ключ входят все параметры, от которых зависит ответ. Попадание в кэш
+    возвращает сохранённые байты как есть, без разбора, повторной валидации
+    по `response_model` и сериализации. Маршрут может вернуть схему или
+    готовую строку JSON (например, собранную в БД, см. `src.json_rows`).
+
+    Ответ содержит заголовки `ETag` и `Cache-Control`, а запрос с совпавшим
+    `If-None-Match` получает пустой ответ 304.
+
+    Ответ 404 сохраняется как надгробная запись и отдаётся повторно, не
+    обращаясь к БД; такие попадания считаются в `cache_stats.negative_hits`.
+
+    Args:
+        key (str | Callable): Шаблон ключа, например `"book:{book_id}"`, или
+            функция параметров маршрута, возвращающая его.
+        depends (Iterable[str] | Callable): Шаблоны пространств имён, от которых
+            зависит ответ, или функция параметров маршрута, возвращающая их
+            (если зависимости определяются параметрами, например `expand`).
+        expiration_time (int): Логический срок годности записи в секундах.
+        version (Optional[Callable]): Корутина, получающая версию ответа по
+            параметрам маршрута. Если задана, ETag строится из версии, и
+            условный запрос без записи в кэше проверяется по ней, не загружая
+            объект. Иначе ETag строится из штампа поколений.
+        bypass (Optional[Callable]): Функция параметров маршрута. Если она
+            возвращает True, ответ не кэшируется целиком: маршрут сам
+            возвращает запись `CacheEntry` (например, собранную из записей
+            объектов), и ответ строится из неё.
+
+    Returns:
+        Callable: Декоратор маршрута.
+    """
+    if not callable(depends):
+        depends = tuple(depends)
+
+    def decorator(func: Callable[..., Awaitable[BaseSchema | str]]) -> Callable:
+        @wraps(func)
+        async def wrapper(
+            *args: Any, cache_request: Request, **kwargs: Any
+        ) -> Response:
+            cache = Cache()
+            cache_key = (key(*args, **kwargs) if callable(key) else key).format(
+                **kwargs
+            )
+            templates = depends(*args, **kwargs) if callable(depends) else depends
+            namespaces = tuple(namespace.format(**kwargs) for namespace in templates)
+            record_hit(cache_request)
+            if bypass is not None and bypass(*args, **kwargs):
+                return entry_response(
+                    await func(*args, **kwargs),
+                    cache_request.headers.get("if-none-match"),
+                )
+
+            if_none_match = cache_request.headers.get("if-none-match")
+            if if_none_match:
+                entry, _ = await cache.read(cache_key, namespaces)
+                if entry is not None:
+                    etag = entry.etag
+                elif version is not None:
+                    try:
+                        etag = make_etag(cache_key, await version(**kwargs))
+                    except HTTPException as error:
+                        # Отсутствие объекта запоминается ниже надгробной записью
+                        if error.status_code != status.HTTP_404_NOT_FOUND:
+                            raise
+                        etag = ""
+                else:
+                    etag = ""
+                if etag_matches(if_none_match, etag):
+                    return not_modified_response(etag)
+
+            async def load() -> str | tuple[str, str]:
+                if version is None:
+                    return serialize(await func(*args, **kwargs))
+                etag = make_etag(cache_key, await version(**kwargs))
+                return serialize(await func(*args, **kwargs)), etag
+
+            entry = await cache.get_or_set(cache_key, namespaces, load, expiration_time)
+            return entry_response(entry, if_none_match)
+
+        # Добавляем запрос в сигнатуру, чтобы FastAPI передал его в обёртку
+        signature = inspect.signature(func)
+        request = inspect.Parameter(
+            "cache_request", inspect.Parameter.KEYWORD_ONLY, annotation=Request
+        )
+        wrapper.__signature__ = signature.replace(
+            parameters=[*signature.parameters.values(), request]
+        )
+        return wrapper
+
+    return decorator
+
+
+def serialize(response: BaseSchema | str) -> str:
+    """Сериализует ответ маршрута, если он ещё не является строкой JSON."""
+    return response if isinstance(response, str) else response.model_dump_json()
+
+
+def record_hit(request: Request) -> None:
+    """Учитывает обращение к адресу в статистике прогревателя кэша."""
+    if WARMER_HEADER not in request.headers:
+        url = request.url
+        warmer.record_hit(f"{url.path}?{url.query}" if url.query else url.path)
+
+
+def entry_response(entry: CacheEntry, if_none_match: Optional[str]) -> Response:
+    """
+    Строит ответ из записи кэша: сохранённые байты JSON с заголовками
+    кэширования, пустой ответ 304 при совпавшем `If-None-Match` или
+    сохранённую ошибку для надгробной записи.
+    """
+    if entry.is_tombstone:
+        return Response(
+            content=entry.value,
+            status_code=entry.status,
+            media_type="application/json",
+        )
+    if if_none_match and etag_matches(if_none_match, entry.etag):
+        return not_modified_response(entry.etag)
+    return Response(
+        content=entry.value,
+        media_type="application/json",
+        headers=cache_headers(entry.etag),
+    )
+
+
+def cache_headers(etag: str) -> dict[str, str]:
+    """Возвращает заголовки HTTP-кэширования для ответа с указанным ETag."""
+    headers = {"Cache-Control": f"max-age={HTTP_CACHE_MAX_AGE}, must-revalidate"}
+    if etag:
+        headers["ETag"] = etag
+    return headers
+
+
+def not_modified_response(etag: str) -> Response:
+    """Возвращает пустой ответ 304 Not Modified."""
+    return Response(status_code=304, headers=cache_headers(etag))
@@ -0,0 +1,136 @@
+"""
+Модуль кодеков для записей кэша в Redis.
+
+Запись хранится в формате: байт версии формата, байт кодека и тело,
+сжатое этим кодеком. Тела меньше `CACHE_COMPRESSION_THRESHOLD` байт
+не сжимаются. Записи с неизвестной версией формата или кодеком считаются
+промахом, поэтому формат можно менять без очистки Redis.
+
+Если установлен пакет `zstandard` (дополнительная зависимость `zstd`:
+`poetry install -E zstd`), используется zstd, иначе - zlib из стандартной
+библиотеки.
+"""
+
+import zlib
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from src.config import CACHE_COMPRESSION_THRESHOLD
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Текущая версия формата записи (2 - в заголовок записи добавлен HTTP-статус)
+FORMAT_VERSION = 2
+
+
+class Codec(ABC):
+    """Абстрактный класс кодека тела записи."""
+
+    id: int
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        """Сжимает данные."""
+        pass
+
+    @abstractmethod
+    def decompress(self, data: bytes) -> bytes:
+        """Распаковывает данные."""
+        pass
+
+
+class IdentityCodec(Codec):
+    """Кодек без сжатия."""
+
+    id = 0
+
+    def compress(self, data: bytes) -> bytes:
+        return data
+
+    def decompress(self, data: bytes) -> bytes:
+        return data
+
+
+class ZlibCodec(Codec):
+    """Кодек сжатия zlib."""
+
+    id = 1
+
+    def compress(self, data: bytes) -> bytes:
+        return zlib.compress(data, 6)
+
+    def decompress(self, data: bytes) -> bytes:
+        return zlib.decompress(data)
+
+
+class ZstdCodec(Codec):
+    """Кодек сжатия zstd."""
+
+    id = 2
+
+    def __init__(self):
+        self.compressor = zstandard.ZstdCompressor(level=3)
+        self.decompressor = zstandard.ZstdDecompressor()
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self.decompressor.decompress(data)
+
+
+# Доступные для чтения кодеки по их идентификаторам
+CODECS: dict[int, Codec] = {codec.id: codec for codec in (IdentityCodec(), ZlibCodec())}
+if zstandard is not None:
+    CODECS[ZstdCodec.id] = ZstdCodec()
+
+# Кодек, которым сжимаются новые записи
+compression_codec = CODECS.get(ZstdCodec.id, CODECS[ZlibCodec.id])
+
+
+class CacheStats:
+    """Счётчики работы кэша в текущем воркере."""
+
+    def __init__(self):
+        self.entries_written = 0
+        self.entries_compressed = 0
+        self.bytes_raw = 0
+        self.bytes_stored = 0
+        self.negative_hits = 0
+
+    @property
+    def bytes_saved(self) -> int:
+        """Сколько байт сэкономило сжатие."""
+        return self.bytes_raw - self.bytes_stored
+
+    def as_dict(self) -> dict[str, int]:
+        """Возвращает значения счётчиков."""
+        return {**vars(self), "bytes_saved": self.bytes_saved}
+
+
+# Счётчики кэша текущего воркера
+cache_stats = CacheStats()
+
+
+def encode(body: bytes) -> bytes:
+    """Кодирует тело записи, сжимая его, если оно превышает порог."""
+    codec = CODECS[IdentityCodec.id]
+    if len(body) >= CACHE_COMPRESSION_THRESHOLD:
+        codec = compression_codec
+    data = bytes((FORMAT_VERSION, codec.id)) + codec.compress(body)
+
+    cache_stats.entries_written += 1
+    cache_stats.entries_compressed += codec.id != IdentityCodec.id
+    cache_stats.bytes_raw += len(body)
+    cache_stats.bytes_stored += len(data)
+    return data
+
+
+def decode(data: bytes) -> Optional[bytes]:
+    """Декодирует запись. Возвращает None для неизвестного формата или кодека."""
+    if len(data) < 2 or data[0] != FORMAT_VERSION or data[1] not in CODECS:
+        return None
+    return CODECS[data[1]].decompress(data[2:])
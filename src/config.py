@@ -2,6 +2,8 @@
 Модуль для хранения настроек.
 """
 
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -16,8 +18,42 @@ class Settings(BaseSettings):
     DB_PASS: str
     DB_NAME: str
 
+    DB_REPLICA_URLS: list[str] = []
+    REPLICA_MAX_LAG: float = 5
+    REPLICA_HEALTH_INTERVAL: int = 5
+
     REDIS_HOST: str
     REDIS_PORT: int
+    REDIS_MAX_CONNECTIONS: int = 50
+
+    CACHE_TTL: int = 300
+    CACHE_STALE_TTL: int = 30
+    NEGATIVE_CACHE_TTL: int = 30
+    CACHE_COMPRESSION_THRESHOLD: int = 1024
+
+    AUTHOR_COUNT_STRATEGY: Literal["exact", "estimated", "none"] = "exact"
+    BOOK_COUNT_STRATEGY: Literal["exact", "estimated", "none"] = "exact"
+    READER_COUNT_STRATEGY: Literal["exact", "estimated", "none"] = "exact"
+    COUNT_ESTIMATE_THRESHOLD: int = 100000
+    FILTERED_COUNT_LIMIT: int = 10000
+
+    BULK_BATCH_SIZE: int = 500
+    BULK_MAX_ITEMS: int = 5000
+
+    EXPORT_BATCH_SIZE: int = 1000
+
+    POINT_READ_BATCH_WINDOW: float = 0.002
+    POINT_READ_BATCH_SIZE: int = 100
+
+    HTTP_CACHE_MAX_AGE: int = 0
+    L1_CACHE_MAX_ITEMS: int = 10000
+    L1_CACHE_TTL: int = 30
+
+    WARMER_ENABLED: bool = True
+    WARMER_LIST_PAGES: int = 3
+    WARMER_HOT_ITEMS: int = 100
+    WARMER_CONCURRENCY: int = 2
+    WARMER_FLUSH_INTERVAL: int = 10
 
     @property
     def database_url(self):
@@ -32,6 +68,39 @@ class Settings(BaseSettings):
 settings = Settings()
 
 DATABASE_URL = settings.database_url
+DB_REPLICA_URLS = settings.DB_REPLICA_URLS
+REPLICA_MAX_LAG = settings.REPLICA_MAX_LAG
+REPLICA_HEALTH_INTERVAL = settings.REPLICA_HEALTH_INTERVAL
 
 REDIS_HOST = settings.REDIS_HOST
 REDIS_PORT = settings.REDIS_PORT
+REDIS_MAX_CONNECTIONS = settings.REDIS_MAX_CONNECTIONS
+
+CACHE_TTL = settings.CACHE_TTL
+CACHE_STALE_TTL = settings.CACHE_STALE_TTL
+NEGATIVE_CACHE_TTL = settings.NEGATIVE_CACHE_TTL
+CACHE_COMPRESSION_THRESHOLD = settings.CACHE_COMPRESSION_THRESHOLD
+
+AUTHOR_COUNT_STRATEGY = settings.AUTHOR_COUNT_STRATEGY
+BOOK_COUNT_STRATEGY = settings.BOOK_COUNT_STRATEGY
+READER_COUNT_STRATEGY = settings.READER_COUNT_STRATEGY
+COUNT_ESTIMATE_THRESHOLD = settings.COUNT_ESTIMATE_THRESHOLD
+FILTERED_COUNT_LIMIT = settings.FILTERED_COUNT_LIMIT
+
+BULK_BATCH_SIZE = settings.BULK_BATCH_SIZE
+BULK_MAX_ITEMS = settings.BULK_MAX_ITEMS
+
+EXPORT_BATCH_SIZE = settings.EXPORT_BATCH_SIZE
+
+POINT_READ_BATCH_WINDOW = settings.POINT_READ_BATCH_WINDOW
+POINT_READ_BATCH_SIZE = settings.POINT_READ_BATCH_SIZE
+
+HTTP_CACHE_MAX_AGE = settings.HTTP_CACHE_MAX_AGE
+L1_CACHE_MAX_ITEMS = settings.L1_CACHE_MAX_ITEMS
+L1_CACHE_TTL = settings.L1_CACHE_TTL
+
+WARMER_ENABLED = settings.WARMER_ENABLED
+WARMER_LIST_PAGES = settings.WARMER_LIST_PAGES
+WARMER_HOT_ITEMS = settings.WARMER_HOT_ITEMS
+WARMER_CONCURRENCY = settings.WARMER_CONCURRENCY
+WARMER_FLUSH_INTERVAL = settings.WARMER_FLUSH_INTERVAL
@@ -5,7 +5,7 @@
 """
 
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, AsyncIterator, Optional
 
 from pydantic import BaseModel as BaseSchema
 
@@ -24,8 +24,44 @@ class BaseController(ABC):
         pass
 
     @abstractmethod
-    async def read_objects(self, page: int, limit: int) -> list[Any]:
-        """Получает список записей с пагинацией."""
+    async def read_version(self, id: int) -> str:
+        """Получает версию записи по ID."""
+        pass
+
+    @abstractmethod
+    async def read_objects(
+        self,
+        page: int,
+        limit: int,
+        filters: Any = None,
+        sort: str = "id",
+        expand: Any = None,
+    ) -> str:
+        """Получает список записей с фильтрами, сортировкой и пагинацией в виде JSON."""
+        pass
+
+    @abstractmethod
+    async def read_objects_by_cursor(
+        self,
+        cursor: str,
+        limit: int,
+        filters: Any = None,
+        sort: str = "id",
+        expand: Any = None,
+    ) -> str:
+        """Получает список записей с фильтрами и пагинацией по курсору в виде JSON."""
+        pass
+
+    @abstractmethod
+    async def read_objects_by_ids(self, ids: list[int], expand: Any = None) -> Any:
+        """Получает записи по списку ID, сообщая об отсутствующих."""
+        pass
+
+    @abstractmethod
+    def export_objects(
+        self, format: str, after: Optional[int], filters: Any = None
+    ) -> AsyncIterator[str]:
+        """Выгружает все записи с фильтрами в порядке ID потоком пачек строк."""
         pass
 
     @abstractmethod
@@ -37,3 +73,18 @@ class BaseController(ABC):
     async def delete_object(self, id: int) -> Any:
         """Удаляет запись по ID."""
         pass
+
+    @abstractmethod
+    async def create_objects(self, schemas: list[BaseSchema]) -> Any:
+        """Создаёт записи по списку схем."""
+        pass
+
+    @abstractmethod
+    async def update_objects(self, schemas: list[BaseSchema]) -> Any:
+        """Обновляет записи по списку схем с ID."""
+        pass
+
+    @abstractmethod
+    async def delete_objects(self, ids: list[int]) -> Any:
+        """Удаляет записи по списку ID."""
+        pass
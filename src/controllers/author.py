@@ -3,46 +3,223 @@
 Наследуется от BaseController и обеспечивает CRUD-операции для модели Author.
 """
 
+from typing import AsyncIterator, Optional
+
+from src.bulk import bulk_response
+from src.cache import Cache, CacheEntry
 from src.database import Author
 from src.exceptions import handle_no_result_found
 from src.controllers.abc_controller import BaseController
+from src.entity_cache import (
+    EntityCache,
+    Expansion,
+    AUTHOR_KEY,
+    AUTHOR_DEPENDS,
+    BOOK_KEY,
+    BOOK_DEPENDS,
+)
+from src.export import ExportFormat
+from src.json_rows import RowsExpander
+from src.pagination import decode_cursor
+from src.schemas.bulk import BulkResponse
 from src.models.author import AuthorModel
+from src.models.book import BookModel
 from src.schemas.author import (
+    AuthorFilters,
+    AuthorSort,
+    AuthorExpand,
     AuthorCreate,
     AuthorUpdate,
-    PaginatedAuthorsResponse,
+    AuthorBulkUpdate,
     AuthorResponse,
 )
+from src.schemas.book import AuthorBooksSort, BookResponse
 
 
 class AuthorController(BaseController):
     """Контроллер для работы с авторами через CRUD-операции."""
 
     def __init__(self):
-        """Инициализирует контроллер с моделью AuthorModel."""
+        """Инициализирует контроллер с моделью AuthorModel и кэшем."""
         self.model = AuthorModel()
+        self.book_model = BookModel()
+        self.cache = Cache()
+        self.entities = EntityCache(
+            AUTHOR_KEY,
+            AUTHOR_DEPENDS,
+            self.model,
+            AuthorResponse,
+            "author_id",
+            self.cache,
+        )
+        self.expansions = {
+            "books": Expansion(
+                "author_id",
+                "books",
+                EntityCache(
+                    BOOK_KEY,
+                    BOOK_DEPENDS,
+                    self.book_model,
+                    BookResponse,
+                    "book_id",
+                    self.cache,
+                ),
+                self.model.read_book_ids_many,
+            ),
+        }
 
     async def create_object(self, schema: AuthorCreate) -> Author:
         """Создаёт нового автора в базе данных."""
         values = schema.model_dump()
-        return await self.model.create_object(values)
+        author = await self.model.create_object(values)
+        await self.cache.invalidate("author", "create", author.author_id)
+        await self.model.counter.adjust(1)
+        return author
+
+    @handle_no_result_found
+    async def read_object(
+        self, author_id: int, expand: Optional[AuthorExpand] = None
+    ) -> AuthorResponse | str:
+        """Получает автора по ID, с книгами - в виде JSON."""
+        author = AuthorResponse.model_validate(await self.model.read_object(author_id))
+        if not expand:
+            return author
+        (row,) = await self.expansions[expand].expand([author.model_dump_json()])
+        return row
 
     @handle_no_result_found
-    async def read_object(self, author_id: int) -> AuthorResponse:
-        """Получает автора по ID."""
-        return AuthorResponse.model_validate(await self.model.read_object(author_id))
+    async def read_version(
+        self, author_id: int, expand: Optional[AuthorExpand] = None
+    ) -> str:
+        """Получает версию автора (с книгами - и его книг) по ID."""
+        return await self.model.read_version(author_id, with_books=bool(expand))
 
-    async def read_objects(self, page: int, limit: int) -> PaginatedAuthorsResponse:
-        """Получает список авторов с пагинацией."""
-        return await self.model.read_objects(page, limit)
+    async def read_objects(
+        self,
+        page: int,
+        limit: int,
+        filters: Optional[AuthorFilters] = None,
+        sort: AuthorSort = "id",
+        expand: Optional[AuthorExpand] = None,
+    ) -> str:
+        """Получает список авторов с фильтрами, сортировкой и пагинацией в виде JSON."""
+        return await self.model.read_objects(
+            page, limit, filters, sort, self._expander(expand)
+        )
+
+    async def read_objects_by_cursor(
+        self,
+        cursor: str,
+        limit: int,
+        filters: Optional[AuthorFilters] = None,
+        sort: AuthorSort = "id",
+        expand: Optional[AuthorExpand] = None,
+    ) -> str:
+        """
+        Получает список авторов с фильтрами и пагинацией по курсору
+        в порядке сортировки в виде JSON.
+        """
+        return await self.model.read_objects_by_cursor(
+            decode_cursor(cursor, sort, self.model.sorts[sort]),
+            limit,
+            filters,
+            sort,
+            self._expander(expand),
+        )
+
+    @handle_no_result_found
+    async def read_books(
+        self,
+        author_id: int,
+        cursor: str,
+        limit: int,
+        sort: AuthorBooksSort = "publication_year",
+    ) -> str:
+        """Получает книги автора с пагинацией по курсору в виде JSON."""
+        return await self.book_model.read_objects_by_author(
+            author_id,
+            decode_cursor(cursor, sort, self.book_model.author_sorts[sort]),
+            limit,
+            sort,
+        )
+
+    async def read_objects_by_ids(
+        self, ids: list[int], expand: Optional[AuthorExpand] = None
+    ) -> CacheEntry:
+        """Получает авторов по списку ID из кэша, загружая отсутствующих одним запросом."""
+        return await self.entities.read_batch(
+            ids, self.expansions[expand] if expand else None
+        )
+
+    def export_objects(
+        self,
+        format: ExportFormat,
+        after: Optional[int],
+        filters: Optional[AuthorFilters] = None,
+    ) -> AsyncIterator[str]:
+        """Выгружает всех авторов с фильтрами в порядке ID потоком пачек строк."""
+        return self.model.export_objects(format, after, filters)
+
+    async def create_objects(
+        self, schemas: list[AuthorCreate]
+    ) -> BulkResponse[AuthorResponse]:
+        """Создаёт авторов, сбрасывает их кэш и увеличивает счётчик записей."""
+        results = await self.model.create_objects(
+            [schema.model_dump() for schema in schemas]
+        )
+        ids = [result.object.author_id for result in results if result.object]
+        if ids:
+            await self.cache.invalidate("author", "create", *ids)
+            await self.model.counter.adjust(len(ids))
+        return bulk_response(results, AuthorResponse)
+
+    async def update_objects(
+        self, schemas: list[AuthorBulkUpdate]
+    ) -> BulkResponse[AuthorResponse]:
+        """Обновляет авторов и сбрасывает кэш обновлённых."""
+        results = await self.model.update_objects(
+            [
+                (
+                    schema.author_id,
+                    schema.model_dump(exclude={"author_id"}, exclude_none=True),
+                )
+                for schema in schemas
+            ]
+        )
+        ids = [result.object.author_id for result in results if result.object]
+        if ids:
+            await self.cache.invalidate("author", "update", *ids)
+        return bulk_response(results, AuthorResponse)
+
+    async def delete_objects(self, ids: list[int]) -> BulkResponse[AuthorResponse]:
+        """Удаляет авторов, сбрасывает их кэш и уменьшает счётчик записей."""
+        results = await self.model.delete_objects(ids)
+        ids = list(
+            dict.fromkeys(
+                result.object.author_id for result in results if result.object
+            )
+        )
+        if ids:
+            await self.cache.invalidate("author", "delete", *ids)
+            await self.model.counter.adjust(-len(ids))
+        return bulk_response(results, AuthorResponse)
 
     @handle_no_result_found
     async def update_object(self, author_id: int, schema: AuthorUpdate) -> Author:
         """Обновляет данные автора по ID."""
         values = schema.model_dump(exclude_none=True)
-        return await self.model.update_object(author_id, values)
+        author = await self.model.update_object(author_id, values)
+        await self.cache.invalidate("author", "update", author_id)
+        return author
 
     @handle_no_result_found
     async def delete_object(self, author_id: int) -> Author:
         """Удаляет автора по ID."""
-        return await self.model.delete_object(author_id)
+        author = await self.model.delete_object(author_id)
+        await self.cache.invalidate("author", "delete", author_id)
+        await self.model.counter.adjust(-1)
+        return author
+
+    def _expander(self, expand: Optional[AuthorExpand]) -> Optional[RowsExpander]:
+        """Возвращает вложение связи в строки списка, если оно запрошено."""
+        return self.expansions[expand].expand if expand else None
@@ -3,30 +3,75 @@
 Наследуется от BaseController и обеспечивает CRUD-операции для модели Book.
 """
 
+from typing import AsyncIterator, Optional
+
+from src.bulk import bulk_response
+from src.cache import Cache, CacheEntry
 from src.database import Book
 from src.exceptions import handle_no_result_found, handle_integrity_error
 from src.controllers.abc_controller import BaseController
+from src.entity_cache import (
+    EntityCache,
+    Expansion,
+    AUTHOR_KEY,
+    AUTHOR_DEPENDS,
+    BOOK_KEY,
+    BOOK_DEPENDS,
+)
+from src.export import ExportFormat
+from src.json_rows import RowsExpander
+from src.pagination import decode_cursor
+from src.schemas.bulk import BulkResponse
+from src.models.author import AuthorModel
 from src.models.book import BookModel
+from src.models.reader import ReaderModel
 from src.schemas.book import (
+    BookFilters,
+    BookSort,
+    BookExpand,
+    BookCategory,
     BookCreate,
     BookUpdate,
-    PaginatedBooksResponse,
+    BookBulkUpdate,
     BookResponse,
 )
+from src.schemas.author import AuthorResponse
 
 
 class BookController(BaseController):
     """Контроллер для работы с книгами через CRUD-операции."""
 
     def __init__(self):
-        """Инициализирует контроллер с моделью BookModel."""
+        """Инициализирует контроллер с моделью BookModel и кэшем."""
         self.model = BookModel()
+        self.reader_model = ReaderModel()
+        self.cache = Cache()
+        self.entities = EntityCache(
+            BOOK_KEY, BOOK_DEPENDS, self.model, BookResponse, "book_id", self.cache
+        )
+        self.expansions = {
+            "author": Expansion(
+                "author_id",
+                "author",
+                EntityCache(
+                    AUTHOR_KEY,
+                    AUTHOR_DEPENDS,
+                    AuthorModel(),
+                    AuthorResponse,
+                    "author_id",
+                    self.cache,
+                ),
+            ),
+        }
 
     @handle_integrity_error
     async def create_object(self, schema: BookCreate) -> Book:
         """Создаёт новую книгу в базе данных."""
         values = schema.model_dump()
-        return await self.model.create_object(values)
+        book = await self.model.create_object(values)
+        await self.cache.invalidate("book", "create", book.book_id)
+        await self.model.counter.adjust(1)
+        return book
 
     @handle_integrity_error
     @handle_no_result_found
@@ -34,18 +79,140 @@ class BookController(BaseController):
         """Получает книгу по ID."""
         return BookResponse.model_validate(await self.model.read_object(book_id))
 
-    async def read_objects(self, page: int, limit: int) -> PaginatedBooksResponse:
-        """Получает список книг с пагинацией."""
-        return await self.model.read_objects(page, limit)
+    @handle_no_result_found
+    async def read_version(self, book_id: int) -> str:
+        """Получает версию книги по ID."""
+        return await self.model.read_version(book_id)
+
+    async def read_objects(
+        self,
+        page: int,
+        limit: int,
+        filters: Optional[BookFilters] = None,
+        sort: BookSort = "id",
+        expand: Optional[BookExpand] = None,
+    ) -> str:
+        """Получает список книг с фильтрами, сортировкой и пагинацией в виде JSON."""
+        return await self.model.read_objects(
+            page, limit, filters, sort, self._expander(expand)
+        )
+
+    async def read_objects_by_cursor(
+        self,
+        cursor: str,
+        limit: int,
+        filters: Optional[BookFilters] = None,
+        sort: BookSort = "id",
+        expand: Optional[BookExpand] = None,
+    ) -> str:
+        """
+        Получает список книг с фильтрами и пагинацией по курсору
+        в порядке сортировки в виде JSON.
+        """
+        return await self.model.read_objects_by_cursor(
+            decode_cursor(cursor, sort, self.model.sorts[sort]),
+            limit,
+            filters,
+            sort,
+            self._expander(expand),
+        )
+
+    async def read_objects_by_ids(
+        self, ids: list[int], expand: Optional[BookExpand] = None
+    ) -> CacheEntry:
+        """Получает книги по списку ID из кэша, загружая отсутствующие одним запросом."""
+        return await self.entities.read_batch(
+            ids, self.expansions[expand] if expand else None
+        )
+
+    @handle_no_result_found
+    async def read_readers(self, book_id: int, cursor: str, limit: int) -> str:
+        """Получает читателей, взявших книгу, с пагинацией по курсору в виде JSON."""
+        return await self.reader_model.read_objects_by_book(
+            book_id, decode_cursor(cursor, "id", self.reader_model.book_sort), limit
+        )
+
+    async def search_objects(
+        self,
+        q: str,
+        category: Optional[BookCategory],
+        author_id: Optional[int],
+        page: int,
+        limit: int,
+    ) -> str:
+        """Ищет книги по названию с пагинацией в виде JSON."""
+        return await self.model.search_objects(
+            q, category.value if category else None, author_id, page, limit
+        )
+
+    def export_objects(
+        self,
+        format: ExportFormat,
+        after: Optional[int],
+        filters: Optional[BookFilters] = None,
+    ) -> AsyncIterator[str]:
+        """Выгружает все книги с фильтрами в порядке ID потоком пачек строк."""
+        return self.model.export_objects(format, after, filters)
+
+    async def create_objects(
+        self, schemas: list[BookCreate]
+    ) -> BulkResponse[BookResponse]:
+        """Создаёт книги, сбрасывает их кэш и увеличивает счётчик записей."""
+        results = await self.model.create_objects(
+            [schema.model_dump() for schema in schemas]
+        )
+        ids = [result.object.book_id for result in results if result.object]
+        if ids:
+            await self.cache.invalidate("book", "create", *ids)
+            await self.model.counter.adjust(len(ids))
+        return bulk_response(results, BookResponse)
+
+    async def update_objects(
+        self, schemas: list[BookBulkUpdate]
+    ) -> BulkResponse[BookResponse]:
+        """Обновляет книги и сбрасывает кэш обновлённых."""
+        results = await self.model.update_objects(
+            [
+                (
+                    schema.book_id,
+                    schema.model_dump(exclude={"book_id"}, exclude_none=True),
+                )
+                for schema in schemas
+            ]
+        )
+        ids = [result.object.book_id for result in results if result.object]
+        if ids:
+            await self.cache.invalidate("book", "update", *ids)
+        return bulk_response(results, BookResponse)
+
+    async def delete_objects(self, ids: list[int]) -> BulkResponse[BookResponse]:
+        """Удаляет книги, сбрасывает их кэш и уменьшает счётчик записей."""
+        results = await self.model.delete_objects(ids)
+        ids = list(
+            dict.fromkeys(result.object.book_id for result in results if result.object)
+        )
+        if ids:
+            await self.cache.invalidate("book", "delete", *ids)
+            await self.model.counter.adjust(-len(ids))
+        return bulk_response(results, BookResponse)
 
     @handle_integrity_error
     @handle_no_result_found
     async def update_object(self, book_id: int, schema: BookUpdate) -> Book:
         """Обновляет данные книги по ID."""
         values = schema.model_dump(exclude_none=True)
-        return await self.model.update_object(book_id, values)
+        book = await self.model.update_object(book_id, values)
+        await self.cache.invalidate("book", "update", book_id)
+        return book
 
     @handle_no_result_found
     async def delete_object(self, book_id: int) -> Book:
         """Удаляет книгу по ID."""
-        return await self.model.delete_object(book_id)
+        book = await self.model.delete_object(book_id)
+        await self.cache.invalidate("book", "delete", book_id)
+        await self.model.counter.adjust(-1)
+        return book
+
+    def _expander(self, expand: Optional[BookExpand]) -> Optional[RowsExpander]:
+        """Возвращает вложение связи в строки списка, если оно запрошено."""
+        return self.expansions[expand].expand if expand else None
@@ -3,18 +3,42 @@
 Наследуется от BaseController и обеспечивает CRUD-операции для модели Reader.
 """
 
+from typing import AsyncIterator, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import Row
+
+from src.bulk import bulk_response
+from src.cache import Cache, CacheEntry
 from src.database import Reader
 from src.exceptions import (
     handle_no_result_found,
     handle_integrity_error,
 )
 from src.controllers.abc_controller import BaseController
+from src.export import ExportFormat
+from src.json_rows import RowsExpander
+from src.pagination import decode_cursor
+from src.schemas.bulk import BulkItemResult, BulkResponse
+from src.entity_cache import (
+    EntityCache,
+    Expansion,
+    ReaderDetailCache,
+    READER_KEY,
+    READER_DEPENDS,
+)
+from src.models.book import BookModel
 from src.models.reader import ReaderModel
 from src.schemas.reader import (
+    ReaderFilters,
+    ReaderSort,
+    ReaderExpand,
     ReaderCreate,
     ReaderUpdate,
-    PaginatedReadersResponse,
+    ReaderBulkUpdate,
+    ReaderSimpleResponse,
     ReaderResponse,
+    ReaderBooksResponse,
 )
 
 
@@ -22,14 +46,36 @@ class ReaderController(BaseController):
     """Контроллер для работы с читателями через CRUD-операции."""
 
     def __init__(self):
-        """Инициализирует контроллер с моделью ReaderModel."""
+        """Инициализирует контроллер с моделью ReaderModel и кэшем."""
         self.model = ReaderModel()
+        self.book_model = BookModel()
+        self.cache = Cache()
+        self.details = ReaderDetailCache(self.model, self.book_model, self.cache)
+        self.entities = EntityCache(
+            READER_KEY,
+            READER_DEPENDS,
+            self.model,
+            ReaderSimpleResponse,
+            "reader_id",
+            self.cache,
+        )
+        self.expansions = {
+            "books": Expansion(
+                "reader_id",
+                "books",
+                self.details.books,
+                self.details.read_book_ids_many,
+            ),
+        }
 
     @handle_integrity_error
     async def create_object(self, schema: ReaderCreate) -> Reader:
         """Создаёт нового читателя в базе данных."""
         values = schema.model_dump()
-        return await self.model.create_object(values)
+        reader = await self.model.create_object(values)
+        await self.cache.invalidate("reader", "create", reader.reader_id)
+        await self.model.counter.adjust(1)
+        return reader
 
     @handle_integrity_error
     @handle_no_result_found
@@ -37,30 +83,224 @@ class ReaderController(BaseController):
         """Получает читателя по ID."""
         return ReaderResponse.model_validate(await self.model.read_object(reader_id))
 
-    async def read_objects(self, page: int, limit: int) -> PaginatedReadersResponse:
-        """Получает список читателей с пагинацией."""
-        return await self.model.read_objects(page, limit)
+    async def read_detail(
+        self, reader_id: int, books_limit: Optional[int] = None
+    ) -> CacheEntry:
+        """Получает детали читателя из нормализованного кэша."""
+        return await self.details.read(reader_id, books_limit)
+
+    @handle_no_result_found
+    async def read_books(self, reader_id: int, cursor: str, limit: int) -> str:
+        """Получает книги, взятые читателем, с пагинацией по курсору в виде JSON."""
+        return await self.book_model.read_objects_by_reader(
+            reader_id, decode_cursor(cursor, "id", self.book_model.reader_sort), limit
+        )
+
+    @handle_no_result_found
+    async def read_version(
+        self, reader_id: int, books_limit: Optional[int] = None
+    ) -> str:
+        """Получает ETag деталей читателя по версиям записей, не собирая ответ."""
+        return await self.details.read_etag(reader_id, books_limit)
+
+    async def read_objects(
+        self,
+        page: int,
+        limit: int,
+        filters: Optional[ReaderFilters] = None,
+        sort: ReaderSort = "id",
+        expand: Optional[ReaderExpand] = None,
+    ) -> str:
+        """Получает список читателей с фильтрами, сортировкой и пагинацией в виде JSON."""
+        return await self.model.read_objects(
+            page, limit, filters, sort, self._expander(expand)
+        )
+
+    async def read_objects_by_cursor(
+        self,
+        cursor: str,
+        limit: int,
+        filters: Optional[ReaderFilters] = None,
+        sort: ReaderSort = "id",
+        expand: Optional[ReaderExpand] = None,
+    ) -> str:
+        """
+        Получает список читателей с фильтрами и пагинацией по курсору
+        в порядке сортировки в виде JSON.
+        """
+        return await self.model.read_objects_by_cursor(
+            decode_cursor(cursor, sort, self.model.sorts[sort]),
+            limit,
+            filters,
+            sort,
+            self._expander(expand),
+        )
+
+    async def read_objects_by_ids(
+        self, ids: list[int], expand: Optional[ReaderExpand] = None
+    ) -> CacheEntry:
+        """Получает читателей по списку ID из кэша, загружая отсутствующих одним запросом."""
+        return await self.entities.read_batch(
+            ids, self.expansions[expand] if expand else None
+        )
+
+    def export_objects(
+        self,
+        format: ExportFormat,
+        after: Optional[int],
+        filters: Optional[ReaderFilters] = None,
+    ) -> AsyncIterator[str]:
+        """Выгружает всех читателей с фильтрами в порядке ID потоком пачек строк."""
+        return self.model.export_objects(format, after, filters)
+
+    async def create_objects(
+        self, schemas: list[ReaderCreate]
+    ) -> BulkResponse[ReaderSimpleResponse]:
+        """Создаёт читателей, сбрасывает их кэш и увеличивает счётчик записей."""
+        results = await self.model.create_objects(
+            [schema.model_dump() for schema in schemas]
+        )
+        ids = [result.object.reader_id for result in results if result.object]
+        if ids:
+            await self.cache.invalidate("reader", "create", *ids)
+            await self.model.counter.adjust(len(ids))
+        return bulk_response(results, ReaderSimpleResponse)
+
+    async def update_objects(
+        self, schemas: list[ReaderBulkUpdate]
+    ) -> BulkResponse[ReaderSimpleResponse]:
+        """Обновляет читателей и сбрасывает кэш обновлённых."""
+        results = await self.model.update_objects(
+            [
+                (
+                    schema.reader_id,
+                    schema.model_dump(exclude={"reader_id"}, exclude_none=True),
+                )
+                for schema in schemas
+            ]
+        )
+        ids = [result.object.reader_id for result in results if result.object]
+        if ids:
+            await self.cache.invalidate("reader", "update", *ids)
+        return bulk_response(results, ReaderSimpleResponse)
+
+    async def delete_objects(
+        self, ids: list[int]
+    ) -> BulkResponse[ReaderSimpleResponse]:
+        """Удаляет читателей, сбрасывает их кэш и множества книг, уменьшает счётчик."""
+        results = await self.model.delete_objects(ids)
+        ids = list(
+            dict.fromkeys(
+                result.object.reader_id for result in results if result.object
+            )
+        )
+        if ids:
+            await self.cache.invalidate("reader", "delete", *ids)
+            await self.model.counter.adjust(-len(ids))
+            await self.details.forget_books(*ids)
+        return bulk_response(results, ReaderSimpleResponse)
 
     @handle_integrity_error
     @handle_no_result_found
     async def update_object(self, reader_id: int, schema: ReaderUpdate) -> Reader:
         """Обновляет данные читателя по ID."""
         values = schema.model_dump(exclude_none=True)
-        return await self.model.update_object(reader_id, values)
+        reader = await self.model.update_object(reader_id, values)
+        await self.cache.invalidate("reader", "update", reader_id)
+        return reader
 
     @handle_no_result_found
     async def delete_object(self, reader_id: int) -> Reader:
         """Удаляет читателя по ID."""
-        return await self.model.delete_object(reader_id)
+        reader = await self.model.delete_object(reader_id)
+        await self.cache.invalidate("reader", "delete", reader_id)
+        await self.model.counter.adjust(-1)
+        await self.details.forget_books(reader_id)
+        return reader
 
-    @handle_integrity_error
-    @handle_no_result_found
-    async def add_book_to_reader(self, reader_id: int, book_id: int) -> Reader:
+    async def add_book_to_reader(self, reader_id: int, book_id: int) -> ReaderResponse:
         """Добавляет книгу к читателю."""
-        return await self.model.add_book_to_reader(reader_id, book_id)
+        response = await self.add_books_to_reader(reader_id, [book_id])
+        if response.failed:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT, detail="Запрещена операция."
+            )
+        return response.reader
+
+    async def remove_book_from_reader(
+        self, reader_id: int, book_id: int
+    ) -> ReaderResponse:
+        """Удаляет книгу у читателя."""
+        response = await self.remove_books_from_reader(reader_id, [book_id])
+        return response.reader
 
     @handle_integrity_error
     @handle_no_result_found
-    async def remove_book_from_reader(self, reader_id: int, book_id: int) -> Reader:
-        """Удаляет книгу у читателя."""
-        return await self.model.remove_book_from_reader(reader_id, book_id)
+    async def add_books_to_reader(
+        self, reader_id: int, book_ids: list[int]
+    ) -> ReaderBooksResponse:
+        """
+        Выдаёт читателю книги одним запросом, сообщая результат по каждой книге.
+
+        Книга, удалённая параллельно после снимка запроса, нарушает внешний
+        ключ выдачи - запрос отклоняется с кодом 409.
+        """
+        row = await self.model.add_books_to_reader(
+            reader_id, list(dict.fromkeys(book_ids))
+        )
+        return await self._books_response(
+            reader_id, book_ids, row, "Книга уже выдана читателю."
+        )
+
+    @handle_no_result_found
+    async def remove_books_from_reader(
+        self, reader_id: int, book_ids: list[int]
+    ) -> ReaderBooksResponse:
+        """Возвращает книги читателя одним запросом, сообщая результат по каждой книге."""
+        row = await self.model.remove_books_from_reader(
+            reader_id, list(dict.fromkeys(book_ids))
+        )
+        return await self._books_response(
+            reader_id, book_ids, row, "Книга не выдана читателю."
+        )
+
+    async def _books_response(
+        self, reader_id: int, book_ids: list[int], row: Row, conflict: str
+    ) -> ReaderBooksResponse:
+        """Строит ответ выдачи или возврата книг и сбрасывает кэш читателя."""
+        statuses = dict(zip(dict.fromkeys(book_ids), row.statuses))
+        details = {
+            status.HTTP_404_NOT_FOUND: "Книга не найдена.",
+            status.HTTP_409_CONFLICT: conflict,
+        }
+        results, seen = [], set()
+        for index, book_id in enumerate(book_ids):
+            if book_id in seen:
+                code, detail = status.HTTP_409_CONFLICT, "Книга указана повторно."
+            else:
+                code = statuses[book_id]
+                detail = details.get(code)
+            seen.add(book_id)
+            results.append(
+                BulkItemResult(
+                    index=index,
+                    status=code,
+                    data=book_id if code == status.HTTP_200_OK else None,
+                    detail=detail,
+                )
+            )
+
+        succeeded = sum(result.status == status.HTTP_200_OK for result in results)
+        if succeeded:
+            await self.cache.invalidate("reader", "borrow", reader_id)
+            await self.details.forget_books(reader_id)
+        return ReaderBooksResponse(
+            reader=ReaderResponse.model_validate(row),
+            results=results,
+            succeeded=succeeded,
+            failed=len(results) - succeeded,
+        )
+
+    def _expander(self, expand: Optional[ReaderExpand]) -> Optional[RowsExpander]:
+        """Возвращает вложение связи в строки списка, если оно запрошено."""
+        return self.expansions[expand].expand if expand else None
@@ -0,0 +1,187 @@
+"""
+Модуль для подсчёта общего числа записей в списках с пагинацией.
+
+Стратегия подсчёта задаётся для каждого ресурса в настройках:
+- `exact` - точное число, кэшируемое в Redis. При записи оно изменяется
+  на месте (`adjust`), а при промахе вычисляется оконной функцией
+  `count(*) over()` в том же запросе, что и страница;
+- `estimated` - оценка `pg_class.reltuples` в том же запросе, что и страница.
+  Для таблиц меньше `COUNT_ESTIMATE_THRESHOLD` используется точное число;
+- `none` - число не считается, и итоги в ответе опускаются.
+
+Для списков с фильтрами страница читается отдельным запросом, чтобы
+её по-прежнему можно было прочитать по индексу до `LIMIT`, а число
+подходящих записей не кэшируется и определяется по той же стратегии:
+- `exact` - точное число, если подходящих записей не больше
+  `FILTERED_COUNT_LIMIT`, иначе итоги опускаются;
+- `estimated` - оценка планировщика (`EXPLAIN`) для запроса с фильтрами.
+  При оценке меньше `COUNT_ESTIMATE_THRESHOLD` записи считаются точно
+  с тем же ограничением.
+"""
+
+from typing import Any, Literal, Optional
+
+from sqlalchemy import BigInteger, Select, cast, column, func, literal, select, table
+from sqlalchemy.dialects.postgresql import REGCLASS
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from src.config import CACHE_TTL, COUNT_ESTIMATE_THRESHOLD, FILTERED_COUNT_LIMIT
+from src.database import after_commit
+from src.utils import RedisClient
+
+# Стратегия подсчёта общего числа записей
+CountStrategy = Literal["exact", "estimated", "none"]
+
+
+class RecordCounter:
+    """Класс для подсчёта записей таблицы по выбранной стратегии."""
+
+    def __init__(self, tablename: str, strategy: CountStrategy):
+        """Инициализирует счётчик таблицы с указанной стратегией."""
+        self.tablename = tablename
+        self.strategy = strategy
+        self.key = f"count:{tablename}"
+        self.redis = RedisClient()
+
+    async def fetch_page(
+        self, session: AsyncSession, stmt: Select, filtered: bool = False
+    ) -> tuple[list[Any], Optional[int]]:
+        """
+        Выполняет запрос страницы и получает общее число записей.
+
+        Args:
+            session (AsyncSession): Сессия базы данных.
+            stmt (Select): Запрос страницы, выбирающий одну сущность или
+                один столбец (например, строку JSON).
+            filtered (bool): Запрос содержит фильтры, и число записей таблицы
+                к нему неприменимо.
+
+        Returns:
+            tuple[list[Any], Optional[int]]: Записи страницы и общее число
+            записей (None для стратегии `none`).
+        """
+        if self.strategy == "none":
+            result = await session.execute(stmt)
+            return list(result.scalars().all()), None
+
+        if filtered:
+            return await self._fetch_filtered(session, stmt)
+
+        if self.strategy == "exact":
+            cached = await self.redis.get(self.key)
+            if cached is not None:
+                result = await session.execute(stmt)
+                return list(result.scalars().all()), int(cached)
+            stmt = stmt.add_columns(func.count().over())
+        else:
+            stmt = stmt.add_columns(self._estimate())
+
+        result = await session.execute(stmt)
+        rows = result.all()
+        objects = [row[0] for row in rows]
+        if self.strategy == "exact":
+            if rows:
+                total = rows[0][1]
+                await self.redis.set(self.key, total, CACHE_TTL)
+            else:
+                total = await self._exact(session)
+            return objects, total
+
+        estimate = (
+            rows[0][1] if rows else await session.scalar(select(self._estimate()))
+        )
+        if estimate < COUNT_ESTIMATE_THRESHOLD:
+            return objects, await self._exact(session)
+        return objects, estimate
+
+    async def adjust(self, amount: int) -> None:
+        """
+        Изменяет кэшированное точное число записей после их создания или удаления.
+
+        Внутри единицы работы запроса число изменяется после её фиксации.
+        """
+        if self.strategy != "none" and amount:
+            await after_commit(lambda: self.redis.increment_existing(self.key, amount))
+
+    async def _fetch_filtered(
+        self, session: AsyncSession, stmt: Select
+    ) -> tuple[list[Any], Optional[int]]:
+        """
+        Выполняет запрос страницы с фильтрами и определяет число подходящих
+        записей отдельным запросом.
+
+        Returns:
+            tuple[list[Any], Optional[int]]: Записи страницы и число
+            подходящих записей (None, если их больше предела подсчёта).
+        """
+        result = await session.execute(stmt)
+        objects = list(result.scalars().all())
+        matches = stmt.order_by(None).offset(None).limit(None)
+        if self.strategy == "estimated":
+            (plan,) = await session.scalar(Explain(matches))
+            estimate = plan["Plan"]["Plan Rows"]
+            if estimate >= COUNT_ESTIMATE_THRESHOLD:
+                return objects, estimate
+            return objects, await count_matches(
+                session, matches, COUNT_ESTIMATE_THRESHOLD
+            )
+        return objects, await count_matches(session, matches, FILTERED_COUNT_LIMIT)
+
+    async def _exact(self, session: AsyncSession) -> int:
+        """Получает точное число записей из Redis или считает его в БД."""
+        cached = await self.redis.get(self.key)
+        if cached is not None:
+            return int(cached)
+        total = await session.scalar(
+            select(func.count()).select_from(table(self.tablename))
+        )
+        await self.redis.set(self.key, total, CACHE_TTL)
+        return total
+
+    def _estimate(self):
+        """Строит подзапрос оценки числа записей по статистике планировщика."""
+        return (
+            select(cast(column("reltuples"), BigInteger))
+            .select_from(table("pg_class"))
+            .where(column("oid") == cast(literal(self.tablename), REGCLASS))
+            .scalar_subquery()
+        )
+
+
+async def count_matches(
+    session: AsyncSession, stmt: Select, limit: int
+) -> Optional[int]:
+    """
+    Считает записи запроса, читая не больше `limit + 1` из них.
+
+    Args:
+        session (AsyncSession): Сессия базы данных.
+        stmt (Select): Запрос записей без сортировки и пагинации.
+        limit (int): Предел подсчёта.
+
+    Returns:
+        Optional[int]: Число записей или None, если их больше предела.
+    """
+    rows = stmt.with_only_columns(literal(1), maintain_column_froms=True)
+    total = await session.scalar(
+        select(func.count()).select_from(rows.limit(limit + 1).subquery())
+    )
+    return total if total <= limit else None
+
+
+class Explain(Executable, ClauseElement):
+    """Запрос плана выполнения (`EXPLAIN (FORMAT JSON)`) с параметрами запроса."""
+
+    inherit_cache = False
+
+    def __init__(self, stmt: Select):
+        """Инициализирует запрос плана указанного запроса."""
+        self.stmt = stmt
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler: Any, **kwargs: Any) -> str:
+    """Компилирует запрос плана вместе с параметрами исходного запроса."""
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.stmt, **kwargs)
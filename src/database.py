@@ -16,38 +16,160 @@
 
 import re
 import enum
-from typing import Optional
+from typing import Awaitable, Callable, Optional
 from contextlib import asynccontextmanager
-
-from sqlalchemy import ForeignKey, Table, Column, Integer, String, Date
+from contextvars import Context, ContextVar, copy_context
+
+from sqlalchemy import (
+    CheckConstraint,
+    ColumnElement,
+    DDL,
+    ForeignKey,
+    Table,
+    Column,
+    Computed,
+    Index,
+    Integer,
+    String,
+    Date,
+    event,
+    func,
+    literal_column,
+    text,
+)
 from sqlalchemy.orm import (
     Mapped,
     DeclarativeBase,
+    Session,
     relationship,
     mapped_column,
     validates,
 )
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
-from sqlalchemy.dialects.postgresql import ENUM
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.dialects.postgresql import ENUM, TSVECTOR
 
 from src.config import DATABASE_URL
+from src.replicas import replicas, is_read
+from src.search import SEARCH_CONFIG
 
 # Создание асинхронного движка базы данных
 engine = create_async_engine(DATABASE_URL)
 
+
+class RoutingSession(Session):
+    """
+    Сессия, направляющая чтение в реплики, а запись - в основную БД.
+
+    После первой записи сессия и читает из основной БД, чтобы видеть
+    собственные изменения.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._flushing or not is_read(clause):
+            self.info["primary"] = True
+        if not self.info.get("primary"):
+            replica = replicas.reader()
+            if replica is not None:
+                return replica
+        return engine.sync_engine
+
+
 # Конструктор для создания сессии подключения к базе данных
-async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
+async_session_maker = async_sessionmaker(
+    engine, sync_session_class=RoutingSession, expire_on_commit=False
+)
+
+
+class UnitOfWork:
+    """
+    Единица работы: одна сессия и одна транзакция на все операции запроса.
+
+    Пока единица работы открыта, модели получают её сессию из
+    `get_async_session`, а `commit` только отправляет изменения в БД.
+    Транзакция фиксируется один раз при выходе (или откатывается при ошибке),
+    после чего выполняются действия, отложенные через `after_commit`.
+    """
+
+    def __init__(self):
+        """Создаёт единицу работы. Соединение берётся из пула при первом запросе."""
+        self.session = async_session_maker()
+        self.callbacks: list[Callable[[], Awaitable[None]]] = []
+
+    async def __aenter__(self) -> "UnitOfWork":
+        self.token = current_unit.set(self)
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback) -> None:
+        current_unit.reset(self.token)
+        try:
+            if exc_type is None:
+                await self.session.commit()
+            else:
+                await self.session.rollback()
+        finally:
+            await self.session.close()
+        if exc_type is None:
+            for callback in self.callbacks:
+                await callback()
+
+
+# Единица работы текущего запроса
+current_unit: ContextVar[Optional[UnitOfWork]] = ContextVar(
+    "current_unit", default=None
+)
 
 
 @asynccontextmanager
 async def get_async_session():
     """
     Получение сессии для подключения к базе данных.
+
+    Внутри единицы работы возвращается её сессия, иначе (например,
+    в скриптах) - новая сессия на одну операцию.
     """
+    unit = current_unit.get()
+    if unit is not None:
+        yield unit.session
+        return
     async with async_session_maker() as session:
         yield session
 
 
+async def commit(session: AsyncSession) -> None:
+    """
+    Фиксирует изменения сессии операции.
+
+    Сессию единицы работы фиксирует сама единица работы, поэтому её
+    изменения здесь только отправляются в БД.
+    """
+    unit = current_unit.get()
+    if unit is not None and unit.session is session:
+        await session.flush()
+    else:
+        await session.commit()
+
+
+async def after_commit(callback: Callable[[], Awaitable[None]]) -> None:
+    """
+    Выполняет действие после фиксации единицы работы или сразу вне её.
+
+    Так сброс кэша не опережает фиксацию: иначе параллельный запрос
+    заполнил бы кэш данными до изменения под новым поколением.
+    """
+    unit = current_unit.get()
+    if unit is None:
+        await callback()
+    else:
+        unit.callbacks.append(callback)
+
+
+def detached_context() -> Context:
+    """Контекст фоновой задачи, не использующей единицу работы запроса."""
+    context = copy_context()
+    context.run(current_unit.set, None)
+    return context
+
+
 class Nationality(str, enum.Enum):
     russian = "Russian"
     american = "American"
@@ -57,12 +179,9 @@ class Nationality(str, enum.Enum):
 
 
 NationalityEnum = ENUM(
-    Nationality.russian,
-    Nationality.american,
-    Nationality.british,
-    Nationality.french,
-    Nationality.german,
+    Nationality,
     name="nationality",
+    values_callable=lambda enum: [member.value for member in enum],
     create_type=True,
 )
 
@@ -76,12 +195,9 @@ class BookCategory(str, enum.Enum):
 
 
 BookCategoryEnum = ENUM(
-    BookCategory.fiction,
-    BookCategory.non_fiction,
-    BookCategory.science,
-    BookCategory.history,
-    BookCategory.fantasy,
+    BookCategory,
     name="book_category",
+    values_callable=lambda enum: [member.value for member in enum],
     create_type=True,
 )
 
@@ -90,11 +206,27 @@ class Base(DeclarativeBase):
     pass
 
 
+# Расширение для триграммных индексов (см. `src.search`), создаётся вместе со схемой
+event.listen(
+    Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+)
+
+
 book_readers = Table(
     "book_readers",
     Base.metadata,
-    Column("book_id", ForeignKey("books.book_id"), primary_key=True),
-    Column("reader_id", ForeignKey("readers.reader_id"), primary_key=True),
+    Column(
+        "book_id",
+        ForeignKey("books.book_id", name="fk_book", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column(
+        "reader_id",
+        ForeignKey("readers.reader_id", name="fk_reader", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    # Книги читателя (первичный ключ начинается с book_id)
+    Index("ix_book_readers_reader_id", "reader_id", "book_id"),
     info={
         "doc": """Таблица для связи книг и читателей.
 
@@ -109,6 +241,9 @@ book_readers = Table(
             - Первичный ключ: (book_id, reader_id).
             - Внешний ключ book_id с каскадным удалением.
             - Внешний ключ reader_id с каскадным удалением.
+
+        Indexes:
+            - (reader_id, book_id) - книги читателя (только по индексу).
         """
     },
 )
@@ -125,18 +260,33 @@ class Author(Base):
         first_name (str): Имя автора (максимум 50 символов, не null).
         last_name (str): Фамилия автора (максимум 50 символов, не null).
         nationality (Nationality): Национальность автора (enum: Russian, American, British, French, German, не null).
+        version (int): Версия записи, увеличивается при каждом изменении (не null).
         books (list[Book]): Список книг, написанных автором (один-ко-многим).
 
     Relationships:
         - Один ко многим с таблицей `books` через `author_id`.
+
+    Indexes (фильтры и сортировки списка):
+        - (nationality, last_name, author_id) - национальность с фамилией
+          или с сортировкой по фамилии.
+        - (nationality, author_id) - национальность с сортировкой по ID.
+        - (last_name, author_id) - фамилия или сортировка по фамилии.
     """
 
     __tablename__ = "authors"
+    __table_args__ = (
+        Index(
+            "ix_authors_nationality_last_name", "nationality", "last_name", "author_id"
+        ),
+        Index("ix_authors_nationality", "nationality", "author_id"),
+        Index("ix_authors_last_name", "last_name", "author_id"),
+    )
 
     author_id: Mapped[int] = mapped_column(primary_key=True)
     first_name: Mapped[str] = mapped_column(String(50), nullable=False)
     last_name: Mapped[str] = mapped_column(String(50), nullable=False)
     nationality: Mapped[Nationality] = mapped_column(NationalityEnum, nullable=False)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, server_default="1")
     books: Mapped[list["Book"]] = relationship(back_populates="author")
 
 
@@ -152,22 +302,60 @@ class Book(Base):
         publication_year (Date): Год публикации книги (не null).
         category (BookCategory): Категория книги (enum: Fiction, Non-fiction, Science, History, Fantasy, не null).
         author_id (Optional[int]): Идентификатор автора (внешний ключ, ссылается на `authors.author_id`, может быть null).
+        version (int): Версия записи, увеличивается при каждом изменении (не null).
+        title_tsv (tsvector): Слова названия для полнотекстового поиска (вычисляемый,
+            не загружается вместе с книгой).
         author (Author): Автор книги (связь один-к-одному).
         readers (list[Reader]): Список читателей, взявших книгу (многие-ко-многим через `book_readers`).
 
     Relationships:
         - Один ко многим с таблицей `authors` через `author_id`.
         - Многие ко многим с таблицей `readers` через `book_readers`.
+
+    Indexes:
+        - GIN по `title_tsv` для полнотекстового поиска.
+        - GIN по `title` (`gin_trgm_ops`) для поиска по сходству и подстроке.
+        - (category, book_id) - категория с сортировкой по ID.
+        - (category, publication_year, book_id) - категория с диапазоном
+          или сортировкой по году.
+        - (author_id, publication_year, book_id) - автор с диапазоном или
+          сортировкой по году (и внешний ключ на авторов).
+        - (publication_year, book_id) - диапазон или сортировка по году.
+        - `title` (`text_pattern_ops`) - начало названия.
     """
 
     __tablename__ = "books"
+    __table_args__ = (
+        Index("ix_books_category", "category", "book_id"),
+        Index("ix_books_category_year", "category", "publication_year", "book_id"),
+        Index("ix_books_author_year", "author_id", "publication_year", "book_id"),
+        Index("ix_books_year", "publication_year", "book_id"),
+        Index(
+            "ix_books_title_pattern",
+            "title",
+            postgresql_ops={"title": "text_pattern_ops"},
+        ),
+        Index("ix_books_title_tsv", "title_tsv", postgresql_using="gin"),
+        Index(
+            "ix_books_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+    )
 
     book_id: Mapped[int] = mapped_column(primary_key=True)
     title: Mapped[str] = mapped_column(String(50), unique=True, nullable=False)
     publication_year: Mapped[Date] = mapped_column(Date, nullable=False)
     category: Mapped[BookCategory] = mapped_column(BookCategoryEnum, nullable=False)
     author_id: Mapped[Optional[int]] = mapped_column(
-        Integer, ForeignKey("authors.author_id")
+        Integer, ForeignKey("authors.author_id", name="fk_author", ondelete="SET NULL")
+    )
+    version: Mapped[int] = mapped_column(Integer, nullable=False, server_default="1")
+    title_tsv: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(f"to_tsvector('{SEARCH_CONFIG}', title)", persisted=True),
+        deferred=True,
     )
     author: Mapped["Author"] = relationship(back_populates="books")
     readers: Mapped[list["Reader"]] = relationship(
@@ -175,6 +363,22 @@ class Book(Base):
     )
 
 
+# Домен email в нижнем регистре (выражение индексов читателей)
+EMAIL_DOMAIN = "lower(split_part(email, '@', 2))"
+
+
+def email_domain(email: ColumnElement) -> ColumnElement:
+    """
+    Строит выражение домена email, совпадающее с выражением индексов.
+
+    Константы подставляются в SQL, а не параметрами, чтобы выражение
+    совпало с индексом и в обобщённом плане подготовленного запроса.
+    """
+    return func.lower(
+        func.split_part(email, literal_column("'@'"), literal_column("2"))
+    )
+
+
 class Reader(Base):
     """Таблица читателей библиотеки.
 
@@ -186,21 +390,35 @@ class Reader(Base):
         first_name (str): Имя читателя (максимум 50 символов, не null).
         last_name (str): Фамилия читателя (максимум 50 символов, не null).
         email (str): Email читателя (максимум 255 символов, уникальный, не null, с проверкой формата).
+        version (int): Версия записи, увеличивается при каждом изменении и выдаче/возврате книг (не null).
         books (list[Book]): Список книг, взятых читателем (многие-ко-многим через `book_readers`).
 
     Relationships:
         - Многие ко многим с таблицей `books` через `book_readers`.
 
+    Indexes (фильтры и сортировки списка):
+        - (домен email, reader_id) - домен email с сортировкой по ID.
+        - (домен email, email) - домен email с сортировкой по email.
+
     Methods:
         validate_email: Проверяет корректность формата email.
     """
 
     __tablename__ = "readers"
+    __table_args__ = (
+        CheckConstraint(
+            r"email ~* '^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$'",
+            name="valid_email",
+        ),
+        Index("ix_readers_email_domain", text(EMAIL_DOMAIN), "reader_id"),
+        Index("ix_readers_email_domain_email", text(EMAIL_DOMAIN), "email"),
+    )
 
     reader_id: Mapped[int] = mapped_column(primary_key=True)
     first_name: Mapped[str] = mapped_column(String(50))
     last_name: Mapped[str] = mapped_column(String(50))
     email: Mapped[str] = mapped_column(String(255), unique=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, server_default="1")
     books: Mapped[list["Book"]] = relationship(
         secondary=book_readers, back_populates="readers"
     )
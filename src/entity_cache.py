@@ -0,0 +1,506 @@
+"""
+Модуль нормализованного кэша сущностей.
+
+`EntityCache` читает записи отдельных объектов (`book:{id}`, `author:{id}`,
+`reader:{id}`) пачкой: одним запросом MGET, загружая отсутствующие объекты
+одним запросом IN и сохраняя их одним конвейером. Это те же записи, что
+у маршрутов получения объекта по ID.
+
+Детали читателя не хранятся в кэше целиком. Вместо этого кэшируются:
+- поля читателя - запись `reader:{id}`;
+- ID взятых книг - множество Redis `reader:{id}:books`;
+- книги - общие записи `book:{id}`, те же, что у маршрута книги.
+
+Ответ собирается при чтении склейкой сохранённых байтов JSON, поэтому
+память растёт с числом сущностей, а не пар читатель-книга, а изменение
+книги сбрасывает одну её запись вместо деталей всех читателей.
+
+Множество книг защищено поколением `reader:{id}:books`: выдача и возврат
+книги сбрасывают поколение и удаляют множество, а заполнение из БД
+записывает его, только если поколение не изменилось за время загрузки.
+
+`Expansion` вкладывает связанные объекты в строки JSON ответа (параметр
+`expand`) из тех же записей: ключи связей собираются со всей страницы без
+повторов, и объекты каждой связи читаются одним пакетом `EntityCache`.
+"""
+
+import json
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Iterable, Optional, Sequence
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel as BaseSchema
+
+from src.cache import Cache, CacheEntry, generation_key, make_etag
+from src.cache_codec import cache_stats
+from src.config import CACHE_TTL
+from src.database import after_commit
+from src.exceptions import handle_no_result_found
+from src.json_rows import dump_json
+from src.models.book import BookModel
+from src.models.reader import ReaderModel
+from src.pagination import encode_cursor
+from src.replicas import replicas
+from src.schemas.book import BookResponse
+from src.schemas.reader import ReaderSimpleResponse
+
+# Ключи и зависимости записей (должны совпадать с маршрутами получения по ID)
+AUTHOR_KEY = "author:{id}"
+AUTHOR_DEPENDS = ("author:{id}",)
+BOOK_KEY = "book:{id}"
+BOOK_DEPENDS = ("book:{id}", "book:detail")
+READER_KEY = "reader:{id}"
+READER_DEPENDS = ("reader:{id}",)
+
+# Наибольшее число ID в одном запросе пачки
+MAX_BATCH_IDS = 100
+
+# Ключ множества ID взятых книг, он же - пространство имён его поколения
+READER_BOOKS_KEY = "reader:{id}:books"
+
+# Элемент заполненного множества (ID книг начинаются с 1), чтобы отличать
+# читателя без книг от незаполненного множества
+FILLED_MARKER = b"0"
+
+
+def parse_ids(ids: str) -> list[int]:
+    """
+    Разбирает список ID через запятую.
+
+    Raises:
+        HTTPException: Список пуст, слишком длинный или содержит не числа.
+    """
+    try:
+        parsed = [int(id) for id in ids.split(",") if id.strip()]
+    except ValueError:
+        parsed = []
+    if not parsed or len(parsed) > MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Ожидается от 1 до {MAX_BATCH_IDS} ID через запятую.",
+        )
+    return parsed
+
+
+class EntityCache:
+    """Класс для чтения записей отдельных объектов сущности пачкой."""
+
+    def __init__(
+        self,
+        key: str,
+        depends: Iterable[str],
+        model: Any,
+        schema: type[BaseSchema],
+        pk: str,
+        cache: Optional[Cache] = None,
+    ):
+        """
+        Инициализирует кэш сущности.
+
+        Args:
+            key (str): Шаблон ключа записи объекта с `{id}`.
+            depends (Iterable[str]): Шаблоны пространств имён записи.
+            model (Any): Модель с методом `read_objects_by_ids`.
+            schema (type[BaseSchema]): Схема ответа для объекта.
+            pk (str): Имя атрибута первичного ключа.
+            cache (Optional[Cache]): Кэш, по умолчанию - новый.
+        """
+        self.key = key
+        self.depends = tuple(depends)
+        self.model = model
+        self.schema = schema
+        self.pk = pk
+        self.cache = cache or Cache()
+
+    async def read_many(self, ids: Sequence[int]) -> dict[int, CacheEntry]:
+        """
+        Получает записи объектов по ID, загружая отсутствующие из БД.
+
+        Свежая надгробная запись считается подтверждением отсутствия объекта.
+
+        Returns:
+            dict[int, CacheEntry]: Записи найденных объектов по ID.
+        """
+        ids = list(dict.fromkeys(ids))
+        results = await self.cache.read_many(
+            [
+                (
+                    self.key.format(id=id),
+                    tuple(namespace.format(id=id) for namespace in self.depends),
+                )
+                for id in ids
+            ]
+        )
+        now = time.time()
+        found, missing = {}, {}
+        for id, (entry, stamp) in zip(ids, results):
+            if entry is None or entry.expires_at <= now:
+                missing[id] = stamp
+            elif entry.is_tombstone:
+                cache_stats.negative_hits += 1
+            else:
+                found[id] = entry
+        if not missing:
+            return found
+
+        depends = {ns for stamp in missing.values() for ns in stamp.depends}
+        with replicas.fenced_reads(depends):
+            objects = await self.model.read_objects_by_ids(list(missing))
+        entries = await self.cache.set_many(
+            [
+                (
+                    self.key.format(id=getattr(obj, self.pk)),
+                    self.schema.model_validate(obj).model_dump_json(),
+                    missing[getattr(obj, self.pk)],
+                    make_etag(
+                        self.key.format(id=getattr(obj, self.pk)), str(obj.version)
+                    ),
+                )
+                for obj in objects
+            ]
+        )
+        found.update(zip((getattr(obj, self.pk) for obj in objects), entries))
+        return found
+
+    async def read_batch(
+        self, ids: Sequence[int], expansion: Optional["Expansion"] = None
+    ) -> CacheEntry:
+        """
+        Собирает ответ на запрос объектов по списку ID.
+
+        Args:
+            ids (Sequence[int]): ID объектов.
+            expansion (Optional[Expansion]): Связь, объекты которой вкладываются
+                в объекты ответа.
+
+        Returns:
+            CacheEntry: Ответ `{"data": [...], "missing": [...]}` с объектами
+            в порядке запроса и ETag, построенным из ETag объектов.
+        """
+        ids = list(dict.fromkeys(ids))
+        found = await self.read_many(ids)
+        entries = [found[id] for id in ids if id in found]
+        missing = [id for id in ids if id not in found]
+        rows = [entry.value for entry in entries]
+        etags = [entry.etag for entry in entries]
+        if expansion is not None:
+            expanded, nested = await expansion.expand_tagged(
+                [row.decode() for row in rows]
+            )
+            rows = [row.encode() for row in expanded]
+            etags.extend(nested)
+        value = b"".join(
+            (
+                b'{"data":[',
+                b",".join(rows),
+                b'],"missing":',
+                json.dumps(missing).encode(),
+                b"}",
+            )
+        )
+        etag = make_etag(self.key.format(id=",".join(map(str, ids))), ".".join(etags))
+        expires_at = min((entry.expires_at for entry in entries), default=time.time())
+        return CacheEntry(value, expires_at, 0.0, etag)
+
+
+class Expansion:
+    """
+    Класс для вложения объектов одной связи в строки JSON ответа.
+
+    Связь «к одному» (книга -> автор) вкладывается объектом или null,
+    связь «ко многим» (автор -> книги, читатель -> книги) - списком
+    объектов в порядке ID.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        field: str,
+        entities: EntityCache,
+        links: Optional[Callable[[list[int]], Awaitable[dict[int, list[int]]]]] = None,
+    ):
+        """
+        Инициализирует связь.
+
+        Args:
+            key (str): Поле строки с ключом связи (например, `author_id`).
+            field (str): Поле вложенных объектов (например, `author`).
+            entities (EntityCache): Кэш объектов связи.
+            links (Optional[Callable]): Корутина, получающая ID объектов связи
+                по ключам строк одним запросом. Если не задана, связь - «к одному»,
+                и ключ строки - ID её объекта.
+        """
+        self.key = key
+        self.field = field
+        self.entities = entities
+        self.links = links
+
+    async def expand(self, rows: list[str]) -> list[str]:
+        """Вкладывает объекты связи в строки JSON."""
+        expanded, _ = await self.expand_tagged(rows)
+        return expanded
+
+    async def expand_tagged(self, rows: list[str]) -> tuple[list[str], list[str]]:
+        """
+        Вкладывает объекты связи в строки JSON.
+
+        Каждая строка и каждый вложенный объект разбираются один раз,
+        а строка с вложенным полем сериализуется заново.
+
+        Returns:
+            tuple[list[str], list[str]]: Строки с вложенными объектами и ETag
+            вложенных записей.
+        """
+        objects = [json.loads(row) for row in rows]
+        keys = [obj[self.key] for obj in objects]
+        unique = list(dict.fromkeys(key for key in keys if key is not None))
+        if self.links is None:
+            linked = {key: [key] for key in unique}
+        else:
+            linked = await self.links(unique) if unique else {}
+        found = await self.entities.read_many(
+            [id for key in unique for id in linked.get(key, ())]
+        )
+
+        nested = {id: json.loads(entry.value) for id, entry in found.items()}
+        expanded, etags = [], []
+        for obj, key in zip(objects, keys):
+            ids = [id for id in linked.get(key, ()) if id in found]
+            etags.extend(found[id].etag for id in ids)
+            values = [nested[id] for id in ids]
+            if self.links is None:
+                obj[self.field] = values[0] if values else None
+            else:
+                obj[self.field] = values
+            expanded.append(dump_json(obj))
+        return expanded, etags
+
+
+class ReaderDetailCache:
+    """Класс для сборки деталей читателя из нормализованных записей кэша."""
+
+    def __init__(
+        self,
+        reader_model: ReaderModel,
+        book_model: BookModel,
+        cache: Optional[Cache] = None,
+    ):
+        """Инициализирует кэш поверх моделей читателя и книги."""
+        self.readers = reader_model
+        self.cache = cache or Cache()
+        self.redis = self.cache.redis
+        self.books = EntityCache(
+            BOOK_KEY, BOOK_DEPENDS, book_model, BookResponse, "book_id", self.cache
+        )
+
+    async def read(
+        self, reader_id: int, books_limit: Optional[int] = None
+    ) -> CacheEntry:
+        """
+        Собирает детали читателя.
+
+        Поля читателя и множество книг читаются параллельно, записи книг -
+        одним запросом MGET. Отсутствующие части загружаются из БД (книги -
+        одним запросом IN) и сохраняются в кэш.
+
+        Args:
+            reader_id (int): ID читателя.
+            books_limit (Optional[int]): Наибольшее число книг в ответе.
+                Если книг больше, ответ содержит курсор остальных
+                (`books_next_cursor`, см. `GET /readers/{id}/books`).
+                0 - только поля читателя, без книг.
+
+        Returns:
+            CacheEntry: Собранный ответ с ETag, построенным из ETag его частей,
+            или надгробная запись, если читателя нет.
+        """
+        reader_key = READER_KEY.format(id=reader_id)
+        books_key = READER_BOOKS_KEY.format(id=reader_id)
+        read_reader = self.cache.get_or_set(
+            reader_key,
+            (namespace.format(id=reader_id) for namespace in READER_DEPENDS),
+            lambda: self._load_reader(reader_id),
+        )
+        if books_limit == 0:
+            return await read_reader
+        reader, (members, generation) = await asyncio.gather(
+            read_reader, self._read_book_ids(books_key)
+        )
+        if reader.is_tombstone:
+            return reader
+
+        if FILLED_MARKER in members:
+            book_ids = sorted(int(member) for member in members - {FILLED_MARKER})
+        else:
+            book_ids = await self._fill_book_ids(reader_id, books_key, generation)
+        book_ids, next_cursor = self._limit_books(book_ids, books_limit)
+        books = await self._read_books(books_key, book_ids)
+
+        detail = json.loads(reader.value)
+        detail["books"] = [json.loads(book.value) for book in books]
+        if books_limit is not None:
+            detail["books_next_cursor"] = next_cursor
+        etag = self._make_etag(
+            reader_id,
+            books_limit,
+            [reader.etag, *(book.etag for book in books)],
+            next_cursor,
+        )
+        return CacheEntry(dump_json(detail).encode(), reader.expires_at, 0.0, etag)
+
+    async def read_etag(self, reader_id: int, books_limit: Optional[int] = None) -> str:
+        """
+        Получает ETag деталей читателя по версиям записей в БД, не собирая
+        ответ (для условного запроса).
+
+        ETag записей кэша строятся из версий тех же записей, поэтому
+        совпадает с ETag, который вернул бы `read`.
+
+        Raises:
+            NoResultFound: Читателя нет.
+        """
+        reader_etag = make_etag(
+            READER_KEY.format(id=reader_id), await self.readers.read_version(reader_id)
+        )
+        if books_limit == 0:
+            return reader_etag
+        versions = dict(await self.readers.read_book_versions(reader_id))
+        book_ids, next_cursor = self._limit_books(list(versions), books_limit)
+        book_etags = (
+            make_etag(BOOK_KEY.format(id=book_id), str(versions[book_id]))
+            for book_id in book_ids
+        )
+        return self._make_etag(
+            reader_id, books_limit, [reader_etag, *book_etags], next_cursor
+        )
+
+    async def read_book_ids_many(self, reader_ids: list[int]) -> dict[int, list[int]]:
+        """
+        Получает ID книг читателей из их множеств одним конвейером.
+
+        Незаполненные множества загружаются из БД одним запросом и сохраняются.
+
+        Returns:
+            dict[int, list[int]]: ID книг в порядке возрастания по ID читателей.
+        """
+        keys = [READER_BOOKS_KEY.format(id=reader_id) for reader_id in reader_ids]
+        async with self.redis.pipeline() as pipe:
+            for books_key in keys:
+                pipe.smembers(books_key)
+                pipe.get(generation_key(books_key))
+            replies = await pipe.execute()
+
+        book_ids, missing = {}, {}
+        for reader_id, books_key, members, generation in zip(
+            reader_ids, keys, replies[::2], replies[1::2]
+        ):
+            if FILLED_MARKER in members:
+                book_ids[reader_id] = sorted(
+                    int(member) for member in members - {FILLED_MARKER}
+                )
+            else:
+                missing[reader_id] = (books_key, generation)
+        if not missing:
+            return book_ids
+
+        with replicas.fenced_reads(key for key, _ in missing.values()):
+            loaded = await self.readers.read_book_ids_many(list(missing))
+        await asyncio.gather(
+            *(
+                self.redis.replace_set(
+                    books_key,
+                    [FILLED_MARKER, *loaded.get(reader_id, ())],
+                    CACHE_TTL,
+                    generation_key(books_key),
+                    generation,
+                )
+                for reader_id, (books_key, generation) in missing.items()
+            )
+        )
+        book_ids.update((reader_id, loaded.get(reader_id, [])) for reader_id in missing)
+        return book_ids
+
+    async def forget_books(self, *reader_ids: int) -> None:
+        """
+        Удаляет множества книг читателей после выдачи или возврата книг.
+
+        Внутри единицы работы запроса множества удаляются после её фиксации.
+        """
+        await after_commit(
+            lambda: self.redis.delete(
+                *(READER_BOOKS_KEY.format(id=reader_id) for reader_id in reader_ids)
+            )
+        )
+
+    @staticmethod
+    def _limit_books(
+        book_ids: list[int], books_limit: Optional[int]
+    ) -> tuple[list[int], Optional[str]]:
+        """Ограничивает список книг, возвращая курсор остальных книг."""
+        if books_limit is None or len(book_ids) <= books_limit:
+            return book_ids, None
+        book_ids = book_ids[:books_limit]
+        return book_ids, encode_cursor("id", (book_ids[-1],))
+
+    @staticmethod
+    def _make_etag(
+        reader_id: int,
+        books_limit: Optional[int],
+        tags: list[str],
+        next_cursor: Optional[str],
+    ) -> str:
+        """Строит ETag деталей читателя из ETag их частей."""
+        key = READER_KEY.format(id=reader_id)
+        if books_limit is not None:
+            key = f"{key}:books_limit:{books_limit}"
+            tags = [*tags, str(next_cursor)]
+        return make_etag(key, ".".join(tags))
+
+    @handle_no_result_found
+    async def _load_reader(self, reader_id: int) -> tuple[str, str]:
+        """Загружает поля читателя и ETag по его версии."""
+        reader = await self.readers.read_scalars(reader_id)
+        return (
+            ReaderSimpleResponse.model_validate(reader).model_dump_json(),
+            make_etag(READER_KEY.format(id=reader_id), str(reader.version)),
+        )
+
+    async def _read_book_ids(
+        self, books_key: str
+    ) -> tuple[set[bytes], Optional[bytes]]:
+        """Читает множество книг и его поколение одним конвейером."""
+        async with self.redis.pipeline() as pipe:
+            pipe.smembers(books_key)
+            pipe.get(generation_key(books_key))
+            members, generation = await pipe.execute()
+        return members, generation
+
+    async def _fill_book_ids(
+        self, reader_id: int, books_key: str, generation: Optional[bytes]
+    ) -> list[int]:
+        """Загружает ID книг читателя из БД и сохраняет их множеством."""
+        with replicas.fenced_reads([books_key]):
+            book_ids = await self.readers.read_book_ids(reader_id)
+        await self.redis.replace_set(
+            books_key,
+            [FILLED_MARKER, *book_ids],
+            CACHE_TTL,
+            generation_key(books_key),
+            generation,
+        )
+        return sorted(book_ids)
+
+    async def _read_books(
+        self, books_key: str, book_ids: list[int]
+    ) -> list[CacheEntry]:
+        """
+        Получает записи книг, загружая отсутствующие из БД.
+
+        Книги, которых больше нет в БД, удаляются из множества читателя.
+        """
+        found = await self.books.read_many(book_ids)
+        removed = [book_id for book_id in book_ids if book_id not in found]
+        if removed:
+            await self.redis.client.srem(books_key, *removed)
+        return [found[book_id] for book_id in book_ids if book_id in found]
@@ -0,0 +1,94 @@
+"""
+Модуль для потоковой выгрузки таблиц целиком (NDJSON и CSV).
+
+Строки читаются одним запросом через курсор на стороне сервера
+(`yield_per`) в порядке первичного ключа и отправляются клиенту
+пачками по мере чтения, поэтому память не зависит от размера таблицы,
+а выгрузка не тратит время на запросы отдельных страниц.
+
+Выгрузка идёт в отдельной сессии (при наличии реплик - из реплики):
+сессия единицы работы запроса закрывается раньше, чем начинается
+передача тела ответа. Прерванную выгрузку можно продолжить с ID
+последней полученной записи (`after`), а строки ограничить теми же
+фильтрами, что и у списков.
+"""
+
+import io
+import csv
+from typing import AsyncIterator, Literal, Optional, Sequence
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import ColumnElement, Subquery, Text, cast, select
+
+from src.config import EXPORT_BATCH_SIZE
+from src.database import async_session_maker
+from src.json_rows import select_json
+
+# Формат выгрузки
+ExportFormat = Literal["ndjson", "csv"]
+
+# Типы содержимого форматов выгрузки
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+async def stream_rows(
+    rows: Subquery,
+    key: ColumnElement,
+    format: ExportFormat,
+    after: Optional[int] = None,
+    where: Sequence[ColumnElement] = (),
+) -> AsyncIterator[str]:
+    """
+    Читает строки подзапроса через курсор на стороне сервера.
+
+    Args:
+        rows (Subquery): Подзапрос столбцов ответа (см. `response_rows`).
+        key (ColumnElement): Столбец первичного ключа подзапроса.
+        format (ExportFormat): Формат выгрузки.
+        after (Optional[int]): Выгружать только записи с ключом больше указанного.
+        where (Sequence[ColumnElement]): Условия фильтров списка по столбцам
+            подзапроса.
+
+    Yields:
+        str: Пачки строк в формате выгрузки (для CSV первой идёт строка заголовка).
+    """
+    if format == "ndjson":
+        stmt = select_json(rows)
+    else:
+        # Даты и перечисления приводятся к тексту в БД так же, как в JSON
+        stmt = select(*(cast(column, Text) for column in rows.c))
+        yield _csv_lines([rows.c.keys()])
+    if after is not None:
+        stmt = stmt.where(key > after)
+    stmt = (
+        stmt.where(*where).order_by(key).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+
+    async with async_session_maker() as session:
+        result = await session.stream(stmt)
+        async for partition in result.partitions():
+            if format == "ndjson":
+                yield "".join(f"{row[0]}\n" for row in partition)
+            else:
+                yield _csv_lines(partition)
+
+
+def export_response(
+    chunks: AsyncIterator[str], name: str, format: ExportFormat
+) -> StreamingResponse:
+    """Создаёт потоковый ответ с выгрузкой в виде файла `{name}.{format}`."""
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{format}"'},
+    )
+
+
+def _csv_lines(rows) -> str:
+    """Форматирует строки как строки CSV."""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
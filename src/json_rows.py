@@ -0,0 +1,63 @@
+"""
+Модуль для чтения списков в виде готового JSON.
+
+Списки читаются запросом Core только по столбцам схемы ответа, а каждая
+строка сериализуется в PostgreSQL (`row_to_json`). Для строк в Python не
+создаются ни объекты ORM, ни схемы Pydantic: ответ собирается склейкой
+строк JSON в поле `data` сериализованной обёртки списка.
+
+Строки `row_to_json` совпадают с сериализацией схем ответа побайтно:
+поля идут в порядке схемы, даты - в ISO 8601, перечисления - значениями.
+
+Перед сборкой ответа строки можно дополнить связанными объектами
+(см. `src.entity_cache.Expansion`): дополняемая строка разбирается один раз
+и сериализуется заново функцией `dump_json` в том же компактном виде.
+"""
+
+import json
+from typing import Any, Awaitable, Callable, Sequence
+
+from pydantic import BaseModel as BaseSchema
+from sqlalchemy import Select, Subquery, Text, func, select
+
+# Начало сериализованной обёртки списка с пустым полем `data`
+EMPTY_DATA = '{"data":[]'
+
+# Дополнение строк JSON страницы перед сборкой ответа
+RowsExpander = Callable[[list[str]], Awaitable[list[str]]]
+
+
+def response_rows(model: type, schema: type[BaseSchema]) -> Subquery:
+    """
+    Строит подзапрос столбцов модели, входящих в схему ответа.
+
+    Фильтры и сортировка задаются по столбцам подзапроса (`rows.c`).
+    PostgreSQL разворачивает подзапрос, поэтому индексы таблицы используются.
+    """
+    columns = (getattr(model, name) for name in schema.model_fields)
+    return select(*columns).subquery(f"{model.__tablename__}_rows")
+
+
+def select_json(rows: Subquery, *columns: Any) -> Select:
+    """Строит запрос строк подзапроса в виде текста JSON и дополнительных столбцов."""
+    return select(func.row_to_json(rows.table_valued()).cast(Text), *columns)
+
+
+def dump_json(value: Any) -> str:
+    """Сериализует значение в компактный JSON, как `row_to_json` и схемы ответа."""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def splice_rows(envelope: BaseSchema, rows: Sequence[str]) -> str:
+    """
+    Сериализует обёртку списка, подставляя строки JSON в её поле `data`.
+
+    Args:
+        envelope (BaseSchema): Обёртка списка с пустым полем `data` (первым).
+        rows (Sequence[str]): Строки JSON элементов списка.
+
+    Returns:
+        str: JSON ответа.
+    """
+    body = envelope.model_dump_json()
+    return '{"data":[' + ",".join(rows) + "]" + body[len(EMPTY_DATA) :]
@@ -2,15 +2,46 @@
 Основной модуль приложения FastAPI.
 """
 
+import time
+import math
+import asyncio
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI, Request, status
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
+from src.cache import listen_invalidations
+from src.config import REPLICA_MAX_LAG
+from src.database import engine
+from src.replicas import replicas, primary_until, PRIMARY_COOKIE
 from src.routes.routes_api import router
+from src.utils import close_redis_pool
+from src.warmer import warmer
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Жизненный цикл приложения: подписывает воркер на инвалидации кэша,
+    запускает проверку реплик и прогрев кэша и освобождает пулы соединений
+    при остановке.
+    """
+    listener = asyncio.create_task(listen_invalidations())
+    monitor = asyncio.create_task(replicas.monitor())
+    await warmer.start(app)
+    yield
+    await warmer.stop()
+    listener.cancel()
+    monitor.cancel()
+    await close_redis_pool()
+    await replicas.dispose()
+    await engine.dispose()
+
 
 # Экземпляр приложения
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Подключение путей для api
 app.include_router(router)
@@ -24,6 +55,36 @@ app.add_middleware(
 )
 
 
+# Методы запросов, не изменяющих данные
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+# Чтение своих записей при чтении из реплик
+@app.middleware("http")
+async def read_your_writes(request: Request, call_next):
+    """
+    Направляет чтение клиента в основную БД на время допустимого отставания
+    реплик после его запроса на запись.
+
+    Cookie задаёт клиент, поэтому закрепление не длится дольше
+    `REPLICA_MAX_LAG` секунд от текущего запроса.
+    """
+    try:
+        until = float(request.cookies.get(PRIMARY_COOKIE, 0))
+    except ValueError:
+        until = 0.0
+    primary_until.set(min(until, time.time() + REPLICA_MAX_LAG))
+    response = await call_next(request)
+    if replicas.replicas and request.method not in SAFE_METHODS:
+        response.set_cookie(
+            PRIMARY_COOKIE,
+            str(time.time() + REPLICA_MAX_LAG),
+            max_age=math.ceil(REPLICA_MAX_LAG),
+            httponly=True,
+        )
+    return response
+
+
 # Обработка ошибок соединения с базой данных
 @app.exception_handler(ConnectionRefusedError)
 async def error_connection_refused_error(request: Request, exc: Exception):
@@ -0,0 +1,271 @@
+"""
+Модуль версионированных миграций схемы базы данных.
+
+Схема описывается один раз - моделями `src.database` (`Base.metadata`):
+- пустая БД создаётся из метаданных целиком (`create_all`) в одной
+  транзакции и отмечается последней версией;
+- существующая БД обновляется невыполненными миграциями по порядку.
+  DDL индексов, столбцов и ограничений миграции берут из тех же метаданных,
+  поэтому схема обновлённой и новой БД совпадает.
+
+Выполненные версии хранятся в таблице `MIGRATIONS_TABLE`. Миграции
+выполняются под рекомендательной блокировкой, поэтому одновременный запуск
+с нескольких машин безопасен, а их шаги идемпотентны: прерванную миграцию
+можно просто запустить снова.
+
+Индексы строятся через CREATE INDEX CONCURRENTLY (вне транзакции), не блокируя
+запись в таблицу. Индекс, оставшийся после сбоя недостроенным (INVALID),
+удаляется и строится заново. Ограничения заменяются с NOT VALID и проверяются
+отдельной командой, которая тоже не блокирует запись.
+
+Запуск: `python -m src.migrations` (также выполняется скриптом `sql/fill_data.py`).
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, NamedTuple
+
+from sqlalchemy import Table, inspect, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from sqlalchemy.schema import AddConstraint, CreateColumn, CreateIndex
+
+from src.database import Base, engine
+
+logger = logging.getLogger(__name__)
+
+# Таблица выполненных миграций
+MIGRATIONS_TABLE = "schema_migrations"
+
+# Ключ рекомендательной блокировки на время миграций
+MIGRATIONS_LOCK = 4242001
+
+# Шаг миграции: выполняется в соединении без транзакции (AUTOCOMMIT)
+Step = Callable[[AsyncConnection], Awaitable[None]]
+
+
+class Migration(NamedTuple):
+    """Миграция: версия, описание и шаги."""
+
+    version: int
+    description: str
+    steps: tuple[Step, ...]
+
+
+def _table(name: str) -> Table:
+    """Получает таблицу из метаданных моделей."""
+    return Base.metadata.tables[name]
+
+
+def execute(sql: str) -> Step:
+    """Шаг, выполняющий команду SQL."""
+
+    async def step(connection: AsyncConnection) -> None:
+        await connection.exec_driver_sql(sql)
+
+    return step
+
+
+def add_column(table: str, name: str) -> Step:
+    """Шаг, добавляющий столбец таблицы по его описанию в метаданных."""
+
+    async def step(connection: AsyncConnection) -> None:
+        column = CreateColumn(_table(table).c[name]).compile(dialect=connection.dialect)
+        await connection.exec_driver_sql(
+            f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column}"
+        )
+
+    return step
+
+
+def create_index(table: str, name: str) -> Step:
+    """
+    Шаг, строящий индекс из метаданных без блокировки записи.
+
+    Недостроенный после сбоя индекс удаляется и строится заново.
+    """
+
+    async def step(connection: AsyncConnection) -> None:
+        (index,) = (index for index in _table(table).indexes if index.name == name)
+        invalid = await connection.scalar(
+            text(
+                "SELECT NOT indisvalid FROM pg_index "
+                "WHERE indexrelid = to_regclass(:name)"
+            ),
+            {"name": name},
+        )
+        if invalid:
+            await connection.exec_driver_sql(
+                f"DROP INDEX CONCURRENTLY IF EXISTS {name}"
+            )
+        ddl = str(
+            CreateIndex(index, if_not_exists=True).compile(dialect=connection.dialect)
+        )
+        await connection.exec_driver_sql(ddl.replace("INDEX", "INDEX CONCURRENTLY", 1))
+
+    return step
+
+
+def replace_constraint(table: str, name: str, *legacy_names: str) -> Step:
+    """
+    Шаг, заменяющий ограничение таблицы на описанное в метаданных.
+
+    Args:
+        table (str): Имя таблицы.
+        name (str): Имя ограничения в метаданных.
+        legacy_names (str): Прежние имена того же ограничения, например
+            имена по умолчанию из БД, созданных до миграций.
+    """
+
+    async def step(connection: AsyncConnection) -> None:
+        (constraint,) = (
+            constraint
+            for constraint in _table(table).constraints
+            if constraint.name == name
+        )
+        drops = ", ".join(
+            f"DROP CONSTRAINT IF EXISTS {old}" for old in (*legacy_names, name)
+        )
+        add = str(AddConstraint(constraint).compile(dialect=connection.dialect))
+        add = add.removeprefix(f"ALTER TABLE {table} ")
+        # Одна команда: старое ограничение не снимается без нового
+        await connection.exec_driver_sql(
+            f"ALTER TABLE {table} {drops}, {add} NOT VALID"
+        )
+        await connection.exec_driver_sql(
+            f"ALTER TABLE {table} VALIDATE CONSTRAINT {name}"
+        )
+
+    return step
+
+
+# Миграции по порядку версий. Новые миграции добавляются в конец
+MIGRATIONS = (
+    # Схема БД, созданной до миграций (sql/fill_data.py)
+    Migration(1, "Исходная схема", ()),
+    Migration(
+        2,
+        "Полнотекстовый и триграммный поиск по названиям книг",
+        (
+            execute("CREATE EXTENSION IF NOT EXISTS pg_trgm"),
+            # Вычисляемый столбец заполняется перезаписью таблицы
+            add_column("books", "title_tsv"),
+            create_index("books", "ix_books_title_tsv"),
+            create_index("books", "ix_books_title_trgm"),
+        ),
+    ),
+    Migration(
+        3,
+        "Индексы фильтров и сортировок списков",
+        (
+            create_index("authors", "ix_authors_nationality_last_name"),
+            create_index("authors", "ix_authors_nationality"),
+            create_index("authors", "ix_authors_last_name"),
+            create_index("books", "ix_books_category"),
+            create_index("books", "ix_books_category_year"),
+            # Начинается с author_id: книги автора и внешний ключ на авторов
+            create_index("books", "ix_books_author_year"),
+            create_index("books", "ix_books_year"),
+            create_index("books", "ix_books_title_pattern"),
+            create_index("readers", "ix_readers_email_domain"),
+            create_index("readers", "ix_readers_email_domain_email"),
+        ),
+    ),
+    Migration(
+        4,
+        "Индекс книг читателя и единое поведение ON DELETE",
+        (
+            create_index("book_readers", "ix_book_readers_reader_id"),
+            replace_constraint("books", "fk_author", "books_author_id_fkey"),
+            replace_constraint("book_readers", "fk_book", "book_readers_book_id_fkey"),
+            replace_constraint(
+                "book_readers", "fk_reader", "book_readers_reader_id_fkey"
+            ),
+            replace_constraint("readers", "valid_email"),
+        ),
+    ),
+    Migration(
+        5,
+        "Версии записей (ETag и оптимистичные обновления)",
+        (
+            # Столбцы со значением по умолчанию добавляются без перезаписи таблиц
+            add_column("authors", "version"),
+            add_column("books", "version"),
+            add_column("readers", "version"),
+        ),
+    ),
+)
+
+
+async def migrate(engine: AsyncEngine = engine) -> None:
+    """Создаёт схему в пустой БД или выполняет невыполненные миграции."""
+    async with engine.connect() as connection:
+        connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+        await connection.execute(
+            text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATIONS_LOCK}
+        )
+        try:
+            await _migrate(engine, connection)
+        finally:
+            await connection.execute(
+                text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATIONS_LOCK}
+            )
+
+
+async def run() -> None:
+    """Выполняет миграции и закрывает пул соединений (запуск из скриптов)."""
+    try:
+        await migrate()
+    finally:
+        await engine.dispose()
+
+
+async def _migrate(engine: AsyncEngine, connection: AsyncConnection) -> None:
+    """Выполняет миграции под блокировкой."""
+    await connection.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} ("
+            "version INT PRIMARY KEY, "
+            "description TEXT NOT NULL, "
+            "applied_at TIMESTAMPTZ NOT NULL DEFAULT now())"
+        )
+    )
+    applied = set(
+        await connection.scalars(text(f"SELECT version FROM {MIGRATIONS_TABLE}"))
+    )
+
+    if not applied:
+        tables = await connection.run_sync(lambda sync: inspect(sync).get_table_names())
+        if "books" not in tables:
+            async with engine.begin() as transaction:
+                await transaction.run_sync(Base.metadata.create_all)
+                for migration in MIGRATIONS:
+                    await _record(transaction, migration)
+            logger.info(f"Created schema at version {MIGRATIONS[-1].version}")
+            return
+
+    for migration in MIGRATIONS:
+        if migration.version in applied:
+            continue
+        logger.info(f"Applying migration {migration.version}: {migration.description}")
+        for step in migration.steps:
+            await step(connection)
+        await _record(connection, migration)
+    logger.info(f"Schema is at version {MIGRATIONS[-1].version}")
+
+
+async def _record(connection: AsyncConnection, migration: Migration) -> None:
+    """Отмечает миграцию выполненной."""
+    await connection.execute(
+        text(
+            f"INSERT INTO {MIGRATIONS_TABLE} (version, description) "
+            "VALUES (:version, :description) ON CONFLICT DO NOTHING"
+        ),
+        {"version": migration.version, "description": migration.description},
+    )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    asyncio.run(run())
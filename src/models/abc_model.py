@@ -4,7 +4,7 @@
 """
 
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, AsyncIterator, Optional
 
 
 class BaseModel(ABC):
@@ -21,8 +21,44 @@ class BaseModel(ABC):
         pass
 
     @abstractmethod
-    async def read_objects(self, page: int, limit: int) -> list[Any]:
-        """Получает список записей с пагинацией."""
+    async def read_objects_by_ids(self, ids: list[int]) -> list[Any]:
+        """Получает записи по списку ID одним запросом."""
+        pass
+
+    @abstractmethod
+    async def read_version(self, id: int) -> str:
+        """Получает версию записи по ID."""
+        pass
+
+    @abstractmethod
+    async def read_objects(
+        self,
+        page: int,
+        limit: int,
+        filters: Any = None,
+        sort: str = "id",
+        expand: Any = None,
+    ) -> str:
+        """Получает список записей с фильтрами, сортировкой и пагинацией в виде JSON."""
+        pass
+
+    @abstractmethod
+    async def read_objects_by_cursor(
+        self,
+        cursor: Any,
+        limit: int,
+        filters: Any = None,
+        sort: str = "id",
+        expand: Any = None,
+    ) -> str:
+        """Получает список записей с фильтрами и пагинацией по курсору в виде JSON."""
+        pass
+
+    @abstractmethod
+    def export_objects(
+        self, format: str, after: Optional[int], filters: Any = None
+    ) -> AsyncIterator[str]:
+        """Выгружает все записи с фильтрами в порядке ID потоком пачек строк."""
         pass
 
     @abstractmethod
@@ -34,3 +70,18 @@ class BaseModel(ABC):
     async def delete_object(self, id: int) -> Any:
         """Удаляет запись по ID."""
         pass
+
+    @abstractmethod
+    async def create_objects(self, data: list[dict]) -> list[Any]:
+        """Создаёт записи пачками в одной транзакции."""
+        pass
+
+    @abstractmethod
+    async def update_objects(self, data: list[tuple[int, dict]]) -> list[Any]:
+        """Обновляет записи по ID пачками в одной транзакции."""
+        pass
+
+    @abstractmethod
+    async def delete_objects(self, ids: list[int]) -> list[Any]:
+        """Удаляет записи по ID пачками в одной транзакции."""
+        pass
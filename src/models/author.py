@@ -3,70 +3,260 @@
 Наследуется от BaseModel и обеспечивает CRUD-операции с использованием SQLAlchemy.
 """
 
-from sqlalchemy import insert, select, update, delete, func
+from sqlalchemy import ColumnElement, insert, literal, select, update, delete, func
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from math import ceil
 
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import AsyncIterator, Optional
+
+from src.config import AUTHOR_COUNT_STRATEGY
+from src.batching import BatchLoader
+from src.bulk import BulkResult, bulk_insert, bulk_update, bulk_delete
+from src.counts import RecordCounter
+from src.export import ExportFormat, stream_rows
 from src.models.abc_model import BaseModel
-from src.database import get_async_session, Author
-from src.schemas.author import PaginatedAuthorsResponse
+from src.database import get_async_session, commit, Author, Book
+from src.json_rows import RowsExpander, response_rows, select_json, splice_rows
+from src.pagination import Cursor, SortKey, fetch_keyset_page
+from src.schemas.author import (
+    PaginatedAuthorsResponse,
+    CursorAuthorsResponse,
+    AuthorFilters,
+    AuthorSort,
+    AuthorResponse,
+)
 
 
 class AuthorModel(BaseModel):
     """Модель для работы с авторами в базе данных через CRUD-операции."""
 
+    # Подсчёт общего числа записей для списков с пагинацией
+    counter = RecordCounter(Author.__tablename__, AUTHOR_COUNT_STRATEGY)
+
+    # Чтение авторов по ID пакетами между параллельными запросами
+    loader = BatchLoader(Author, Author.author_id)
+
+    # Столбцы ответа для списков, сериализуемых в БД
+    rows = response_rows(Author, AuthorResponse)
+
+    # Сортировки списков по именам (последний столбец ключа уникален)
+    sorts = {
+        "id": SortKey((rows.c.author_id,)),
+        "last_name": SortKey((rows.c.last_name, rows.c.author_id)),
+    }
+
     async def create_object(self, data: dict) -> Author:
         """Создаёт нового автора в базе данных."""
         async with get_async_session() as session:
             stmt = insert(Author).values(data).returning(Author)
             result = await session.execute(stmt)
-            await session.commit()
+            await commit(session)
             return result.scalar_one()
 
     async def read_object(self, id: int) -> Author:
         """Получает автора по ID."""
+        if self.loader.can_batch():
+            return await self.loader.load(id)
         async with get_async_session() as session:
             stmt = select(Author).where(Author.author_id == id)
             result = await session.execute(stmt)
             return result.scalar_one()
 
-    async def read_objects(self, page: int, limit: int) -> PaginatedAuthorsResponse:
-        """Получает список авторов с пагинацией."""
+    async def read_objects_by_ids(self, ids: list[int]) -> list[Author]:
+        """Получает авторов по списку ID одним запросом."""
         async with get_async_session() as session:
-            stmt = select(func.count()).select_from(Author)
+            stmt = select(Author).where(Author.author_id.in_(ids))
+            result = await session.execute(stmt)
+            return list(result.scalars().all())
+
+    async def read_book_ids_many(self, ids: list[int]) -> dict[int, list[int]]:
+        """Получает ID книг авторов в порядке возрастания одним запросом."""
+        async with get_async_session() as session:
+            stmt = (
+                select(
+                    Book.author_id,
+                    func.array_agg(aggregate_order_by(Book.book_id, Book.book_id)),
+                )
+                .where(Book.author_id.in_(ids))
+                .group_by(Book.author_id)
+            )
             result = await session.execute(stmt)
-            total_records = result.scalar()
+            return dict(result.tuples().all())
 
-            total_pages = ceil(total_records / limit) if total_records > 0 else 1
+    async def read_version(self, id: int, with_books: bool = False) -> str:
+        """
+        Получает версию автора по ID.
 
-            stmt = select(Author).offset((page - 1) * limit).limit(limit)
+        Версия автора с книгами включает отпечаток его книг - хеш списка
+        пар ID и версии в порядке ID, который меняется при любом изменении
+        набора книг или их версий.
+        """
+        if not with_books and self.loader.can_batch():
+            return str((await self.loader.load(id)).version)
+        async with get_async_session() as session:
+            if not with_books:
+                stmt = select(Author.version).where(Author.author_id == id)
+                result = await session.execute(stmt)
+                return str(result.scalar_one())
+
+            stmt = (
+                select(
+                    Author.version,
+                    func.md5(
+                        func.coalesce(
+                            func.string_agg(
+                                func.concat(Book.book_id, ":", Book.version),
+                                aggregate_order_by(literal(","), Book.book_id),
+                            ),
+                            "",
+                        )
+                    ),
+                )
+                .select_from(Author)
+                .outerjoin(Book, Book.author_id == Author.author_id)
+                .where(Author.author_id == id)
+                .group_by(Author.author_id)
+            )
             result = await session.execute(stmt)
-            authors = result.scalars().all()
-
-            return PaginatedAuthorsResponse(
-                data=authors,
-                page=page,
-                limit=limit,
-                total_pages=total_pages,
-                total_records=total_records,
+            return ".".join(map(str, result.one()))
+
+    async def read_objects(
+        self,
+        page: int,
+        limit: int,
+        filters: Optional[AuthorFilters] = None,
+        sort: AuthorSort = "id",
+        expand: Optional[RowsExpander] = None,
+    ) -> str:
+        """Получает список авторов с фильтрами, сортировкой и пагинацией в виде JSON."""
+        where = self._where(filters)
+        async with get_async_session() as session:
+            stmt = (
+                select_json(self.rows)
+                .where(*where)
+                .order_by(*self.sorts[sort].clauses())
+                .offset((page - 1) * limit)
+                .limit(limit)
+            )
+            authors, total_records = await self.counter.fetch_page(
+                session, stmt, filtered=bool(where)
             )
 
+            total_pages = None
+            if total_records is not None:
+                total_pages = ceil(total_records / limit) if total_records > 0 else 1
+
+            return splice_rows(
+                PaginatedAuthorsResponse(
+                    data=[],
+                    page=page,
+                    limit=limit,
+                    total_pages=total_pages,
+                    total_records=total_records,
+                ),
+                await expand(authors) if expand else authors,
+            )
+
+    async def read_objects_by_cursor(
+        self,
+        cursor: Optional[Cursor],
+        limit: int,
+        filters: Optional[AuthorFilters] = None,
+        sort: AuthorSort = "id",
+        expand: Optional[RowsExpander] = None,
+    ) -> str:
+        """
+        Получает список авторов с фильтрами и пагинацией по курсору
+        в порядке сортировки в виде JSON.
+        """
+        async with get_async_session() as session:
+            page, next_cursor = await fetch_keyset_page(
+                session,
+                select_json(self.rows).where(*self._where(filters)),
+                self.sorts[sort],
+                sort,
+                cursor,
+                limit,
+            )
+            return splice_rows(
+                CursorAuthorsResponse(data=[], limit=limit, next_cursor=next_cursor),
+                await expand(page) if expand else page,
+            )
+
+    def export_objects(
+        self,
+        format: ExportFormat,
+        after: Optional[int],
+        filters: Optional[AuthorFilters] = None,
+    ) -> AsyncIterator[str]:
+        """Выгружает всех авторов с фильтрами в порядке ID потоком пачек строк."""
+        return stream_rows(
+            self.rows, self.rows.c.author_id, format, after, self._where(filters)
+        )
+
+    def _where(self, filters: Optional[AuthorFilters]) -> list[ColumnElement]:
+        """Строит условия фильтров списка по столбцам ответа."""
+        where = []
+        if filters is None:
+            return where
+        if filters.nationality is not None:
+            where.append(self.rows.c.nationality == filters.nationality.value)
+        if filters.last_name is not None:
+            where.append(self.rows.c.last_name == filters.last_name)
+        return where
+
+    async def create_objects(self, data: list[dict]) -> list[BulkResult]:
+        """Вставляет авторов в БД пачками в одной транзакции."""
+        async with get_async_session() as session:
+            results = await bulk_insert(session, Author, data)
+            await commit(session)
+            return results
+
+    async def update_objects(self, data: list[tuple[int, dict]]) -> list[BulkResult]:
+        """Обновляет авторов в БД по ID пачками в одной транзакции."""
+        async with get_async_session() as session:
+            results = await bulk_update(session, Author, "author_id", data)
+            await commit(session)
+            return results
+
+    async def delete_objects(self, ids: list[int]) -> list[BulkResult]:
+        """Удаляет авторов из БД по ID пачками в одной транзакции."""
+        async with get_async_session() as session:
+            results = await bulk_delete(
+                session, Author, "author_id", ids, before=self._unlink_books
+            )
+            await commit(session)
+            return results
+
     async def update_object(self, id: int, data: dict) -> Author:
         """Обновляет данные автора по ID."""
         async with get_async_session() as session:
             stmt = (
                 update(Author)
                 .where(Author.author_id == id)
-                .values(data)
+                .values({**data, "version": Author.version + 1})
                 .returning(Author)
             )
             result = await session.execute(stmt)
-            await session.commit()
+            await commit(session)
             return result.scalar_one()
 
     async def delete_object(self, id: int) -> Author:
         """Удаляет автора по ID."""
         async with get_async_session() as session:
+            await self._unlink_books(session, [id])
+
             stmt = delete(Author).where(Author.author_id == id).returning(Author)
             result = await session.execute(stmt)
-            await session.commit()
+            await commit(session)
             return result.scalar_one()
+
+    async def _unlink_books(self, session: AsyncSession, ids: list[int]) -> None:
+        """Отвязывает книги авторов по их ID, увеличивая версии книг."""
+        stmt = (
+            update(Book)
+            .where(Book.author_id.in_(ids))
+            .values(author_id=None, version=Book.version + 1)
+        )
+        await session.execute(stmt)
@@ -3,59 +3,356 @@
 Наследуется от BaseModel и обеспечивает CRUD-операции с использованием SQLAlchemy.
 """
 
-from sqlalchemy import insert, select, update, delete, func
+from sqlalchemy import ColumnElement, insert, select, update, delete, func
+from datetime import date
 from math import ceil
+from typing import AsyncIterator, Optional
 
+from src.config import BOOK_COUNT_STRATEGY, FILTERED_COUNT_LIMIT
+from src.batching import BatchLoader
+from src.bulk import BulkResult, bulk_insert, bulk_update, bulk_delete
+from src.counts import RecordCounter, count_matches
+from src.export import ExportFormat, stream_rows
 from src.models.abc_model import BaseModel
-from src.database import get_async_session, Book
-from src.schemas.book import PaginatedBooksResponse
+from src.database import get_async_session, commit, Author, Book, Reader, book_readers
+from src.json_rows import RowsExpander, response_rows, select_json, splice_rows
+from src.pagination import Cursor, SortKey, fetch_keyset_page
+from src.search import title_search
+from src.schemas.book import (
+    PaginatedBooksResponse,
+    CursorBooksResponse,
+    BookFilters,
+    BookSort,
+    AuthorBooksSort,
+    BookResponse,
+)
 
 
 class BookModel(BaseModel):
     """Модель для работы с книгами в базе данных через CRUD-операции."""
 
+    # Подсчёт общего числа записей для списков с пагинацией
+    counter = RecordCounter(Book.__tablename__, BOOK_COUNT_STRATEGY)
+
+    # Чтение книг по ID пакетами между параллельными запросами
+    loader = BatchLoader(Book, Book.book_id)
+
+    # Столбцы ответа для списков, сериализуемых в БД
+    rows = response_rows(Book, BookResponse)
+
+    # Сортировки списков по именам (последний столбец ключа уникален)
+    sorts = {
+        "id": SortKey((rows.c.book_id,)),
+        "title": SortKey((rows.c.title,)),
+        "publication_year": SortKey((rows.c.publication_year, rows.c.book_id)),
+        "-publication_year": SortKey(
+            (rows.c.publication_year, rows.c.book_id), descending=True
+        ),
+    }
+
+    # Сортировки книг автора (по индексу автора и года публикации)
+    author_sorts = {
+        "publication_year": sorts["publication_year"],
+        "-publication_year": sorts["-publication_year"],
+    }
+
+    # Сортировка книг читателя (по индексу книг читателя)
+    reader_sort = SortKey((book_readers.c.book_id,))
+
     async def create_object(self, data: dict) -> Book:
         """Создаёт новую книгу в базе данных."""
         async with get_async_session() as session:
             stmt = insert(Book).values(data).returning(Book)
             result = await session.execute(stmt)
-            await session.commit()
+            await commit(session)
             return result.scalar_one()
 
     async def read_object(self, id: int) -> Book:
         """Получает книгу по ID."""
+        if self.loader.can_batch():
+            return await self.loader.load(id)
         async with get_async_session() as session:
             stmt = select(Book).where(Book.book_id == id)
             result = await session.execute(stmt)
             return result.scalar_one()
 
-    async def read_objects(self, page: int, limit: int) -> PaginatedBooksResponse:
-        """Получает список книг с пагинацией."""
+    async def read_objects_by_ids(self, ids: list[int]) -> list[Book]:
+        """Получает книги по списку ID одним запросом."""
         async with get_async_session() as session:
-            stmt = select(func.count()).select_from(Book)
+            stmt = select(Book).where(Book.book_id.in_(ids))
             result = await session.execute(stmt)
-            total_records = result.scalar()
+            return list(result.scalars().all())
+
+    async def read_version(self, id: int) -> str:
+        """Получает версию книги по ID."""
+        if self.loader.can_batch():
+            return str((await self.loader.load(id)).version)
+        async with get_async_session() as session:
+            stmt = select(Book.version).where(Book.book_id == id)
+            result = await session.execute(stmt)
+            return str(result.scalar_one())
+
+    async def read_objects(
+        self,
+        page: int,
+        limit: int,
+        filters: Optional[BookFilters] = None,
+        sort: BookSort = "id",
+        expand: Optional[RowsExpander] = None,
+    ) -> str:
+        """Получает список книг с фильтрами, сортировкой и пагинацией в виде JSON."""
+        where = self._where(filters)
+        async with get_async_session() as session:
+            stmt = (
+                select_json(self.rows)
+                .where(*where)
+                .order_by(*self.sorts[sort].clauses())
+                .offset((page - 1) * limit)
+                .limit(limit)
+            )
+            books, total_records = await self.counter.fetch_page(
+                session, stmt, filtered=bool(where)
+            )
+
+            total_pages = None
+            if total_records is not None:
+                total_pages = ceil(total_records / limit) if total_records > 0 else 1
+
+            return splice_rows(
+                PaginatedBooksResponse(
+                    data=[],
+                    page=page,
+                    limit=limit,
+                    total_pages=total_pages,
+                    total_records=total_records,
+                ),
+                await expand(books) if expand else books,
+            )
+
+    async def read_objects_by_cursor(
+        self,
+        cursor: Optional[Cursor],
+        limit: int,
+        filters: Optional[BookFilters] = None,
+        sort: BookSort = "id",
+        expand: Optional[RowsExpander] = None,
+    ) -> str:
+        """
+        Получает список книг с фильтрами и пагинацией по курсору
+        в порядке сортировки в виде JSON.
+        """
+        async with get_async_session() as session:
+            page, next_cursor = await fetch_keyset_page(
+                session,
+                select_json(self.rows).where(*self._where(filters)),
+                self.sorts[sort],
+                sort,
+                cursor,
+                limit,
+            )
+            return splice_rows(
+                CursorBooksResponse(data=[], limit=limit, next_cursor=next_cursor),
+                await expand(page) if expand else page,
+            )
+
+    async def read_objects_by_author(
+        self,
+        author_id: int,
+        cursor: Optional[Cursor],
+        limit: int,
+        sort: AuthorBooksSort = "publication_year",
+    ) -> str:
+        """
+        Получает книги автора с пагинацией по курсору в порядке сортировки
+        в виде JSON.
+
+        Raises:
+            NoResultFound: Автора нет.
+        """
+        async with get_async_session() as session:
+            page, next_cursor = await fetch_keyset_page(
+                session,
+                select_json(self.rows).where(self.rows.c.author_id == author_id),
+                self.author_sorts[sort],
+                sort,
+                cursor,
+                limit,
+            )
+            if not page and cursor is None:
+                # Автор без книг отличается от отсутствующего автора
+                stmt = select(Author.author_id).where(Author.author_id == author_id)
+                (await session.execute(stmt)).scalar_one()
+
+            return splice_rows(
+                CursorBooksResponse(data=[], limit=limit, next_cursor=next_cursor),
+                page,
+            )
+
+    async def read_objects_by_reader(
+        self, reader_id: int, cursor: Optional[Cursor], limit: int
+    ) -> str:
+        """
+        Получает книги, взятые читателем, с пагинацией по курсору в порядке ID
+        в виде JSON.
+
+        Raises:
+            NoResultFound: Читателя нет.
+        """
+        async with get_async_session() as session:
+            page, next_cursor = await fetch_keyset_page(
+                session,
+                select_json(self.rows)
+                .join(book_readers, book_readers.c.book_id == self.rows.c.book_id)
+                .where(book_readers.c.reader_id == reader_id),
+                self.reader_sort,
+                "id",
+                cursor,
+                limit,
+            )
+            if not page and cursor is None:
+                stmt = select(Reader.reader_id).where(Reader.reader_id == reader_id)
+                (await session.execute(stmt)).scalar_one()
+
+            return splice_rows(
+                CursorBooksResponse(data=[], limit=limit, next_cursor=next_cursor),
+                page,
+            )
 
-            total_pages = ceil(total_records / limit) if total_records > 0 else 1
+    async def search_objects(
+        self,
+        q: str,
+        category: Optional[str],
+        author_id: Optional[int],
+        page: int,
+        limit: int,
+    ) -> str:
+        """
+        Ищет книги по названию с пагинацией в виде JSON.
 
-            stmt = select(Book).offset((page - 1) * limit).limit(limit)
+        Книги упорядочены по убыванию релевантности. Общее число найденных
+        книг известно по неполной странице, иначе считается отдельным
+        запросом не дальше `FILTERED_COUNT_LIMIT` записей; если найдено
+        больше, итоги в ответе опускаются.
+
+        Args:
+            q (str): Нормализованный поисковый запрос.
+            category (Optional[str]): Категория книг.
+            author_id (Optional[int]): ID автора книг.
+            page (int): Номер страницы.
+            limit (int): Количество книг на странице.
+        """
+        condition, rank = title_search(Book.title, Book.title_tsv, q)
+        filters = [condition]
+        if category is not None:
+            filters.append(Book.category == category)
+        if author_id is not None:
+            filters.append(Book.author_id == author_id)
+
+        async with get_async_session() as session:
+            ranked = rank.label("rank")
+            matches = (
+                select(Book.book_id, ranked)
+                .where(*filters)
+                .order_by(ranked.desc(), Book.book_id)
+                .offset((page - 1) * limit)
+                .limit(limit)
+                .subquery("matches")
+            )
+            stmt = (
+                select_json(self.rows)
+                .join(matches, matches.c.book_id == self.rows.c.book_id)
+                .order_by(matches.c.rank.desc(), matches.c.book_id)
+            )
             result = await session.execute(stmt)
-            books = result.scalars().all()
-
-            return PaginatedBooksResponse(
-                data=books,
-                page=page,
-                limit=limit,
-                total_pages=total_pages,
-                total_records=total_records,
+            books = list(result.scalars().all())
+
+            # Неполная страница (или пустая первая) определяет число найденных
+            if len(books) < limit and (books or page == 1):
+                total_records = (page - 1) * limit + len(books)
+            else:
+                total_records = await count_matches(
+                    session,
+                    select(Book.book_id).where(*filters),
+                    FILTERED_COUNT_LIMIT,
+                )
+
+            total_pages = None
+            if total_records is not None:
+                total_pages = ceil(total_records / limit) if total_records > 0 else 1
+
+            return splice_rows(
+                PaginatedBooksResponse(
+                    data=[],
+                    page=page,
+                    limit=limit,
+                    total_pages=total_pages,
+                    total_records=total_records,
+                ),
+                books,
+            )
+
+    def export_objects(
+        self,
+        format: ExportFormat,
+        after: Optional[int],
+        filters: Optional[BookFilters] = None,
+    ) -> AsyncIterator[str]:
+        """Выгружает все книги с фильтрами в порядке ID потоком пачек строк."""
+        return stream_rows(
+            self.rows, self.rows.c.book_id, format, after, self._where(filters)
+        )
+
+    def _where(self, filters: Optional[BookFilters]) -> list[ColumnElement]:
+        """Строит условия фильтров списка по столбцам ответа."""
+        where = []
+        if filters is None:
+            return where
+        if filters.category is not None:
+            where.append(self.rows.c.category == filters.category.value)
+        if filters.author_id is not None:
+            where.append(self.rows.c.author_id == filters.author_id)
+        if filters.year_from is not None:
+            where.append(self.rows.c.publication_year >= date(filters.year_from, 1, 1))
+        if filters.year_to is not None:
+            where.append(self.rows.c.publication_year <= date(filters.year_to, 12, 31))
+        if filters.title_prefix is not None:
+            where.append(
+                self.rows.c.title.startswith(filters.title_prefix, autoescape=True)
             )
+        return where
+
+    async def create_objects(self, data: list[dict]) -> list[BulkResult]:
+        """Вставляет книги в БД пачками в одной транзакции."""
+        async with get_async_session() as session:
+            results = await bulk_insert(session, Book, data)
+            await commit(session)
+            return results
+
+    async def update_objects(self, data: list[tuple[int, dict]]) -> list[BulkResult]:
+        """Обновляет книги в БД по ID пачками в одной транзакции."""
+        async with get_async_session() as session:
+            results = await bulk_update(session, Book, "book_id", data)
+            await commit(session)
+            return results
+
+    async def delete_objects(self, ids: list[int]) -> list[BulkResult]:
+        """Удаляет книги из БД по ID пачками в одной транзакции."""
+        async with get_async_session() as session:
+            results = await bulk_delete(session, Book, "book_id", ids)
+            await commit(session)
+            return results
 
     async def update_object(self, id: int, data: dict) -> Book:
         """Обновляет данные книги по ID."""
         async with get_async_session() as session:
-            stmt = update(Book).where(Book.book_id == id).values(data).returning(Book)
+            stmt = (
+                update(Book)
+                .where(Book.book_id == id)
+                .values({**data, "version": Book.version + 1})
+                .returning(Book)
+            )
             result = await session.execute(stmt)
-            await session.commit()
+            await commit(session)
             return result.scalar_one()
 
     async def delete_object(self, id: int) -> Book:
@@ -63,5 +360,5 @@ class BookModel(BaseModel):
         async with get_async_session() as session:
             stmt = delete(Book).where(Book.book_id == id).returning(Book)
             result = await session.execute(stmt)
-            await session.commit()
+            await commit(session)
             return result.scalar_one()
@@ -3,25 +3,86 @@
 Наследуется от BaseModel и обеспечивает CRUD-операции с использованием SQLAlchemy.
 """
 
-from sqlalchemy import insert, select, update, delete, func
+from sqlalchemy import (
+    ColumnElement,
+    insert,
+    select,
+    update,
+    delete,
+    func,
+    case,
+    exists,
+    literal,
+    literal_column,
+    type_coerce,
+    Integer,
+    JSON,
+    Row,
+    Select,
+    CompoundSelect,
+)
 from math import ceil
+from typing import AsyncIterator, Optional
 
+from fastapi import status
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import selectinload
+from sqlalchemy.sql.selectable import CTE
 
+from src.config import READER_COUNT_STRATEGY
+from src.batching import BatchLoader
+from src.bulk import BulkResult, bulk_insert, bulk_update, bulk_delete
+from src.counts import RecordCounter
+from src.export import ExportFormat, stream_rows
 from src.models.abc_model import BaseModel
-from src.database import get_async_session, Reader, book_readers
-from src.schemas.reader import PaginatedReadersResponse
+from src.database import (
+    get_async_session,
+    commit,
+    email_domain,
+    Reader,
+    Book,
+    book_readers,
+)
+from src.json_rows import RowsExpander, response_rows, select_json, splice_rows
+from src.pagination import Cursor, SortKey, fetch_keyset_page
+from src.schemas.book import BookResponse
+from src.schemas.reader import (
+    PaginatedReadersResponse,
+    CursorReadersResponse,
+    ReaderFilters,
+    ReaderSort,
+    ReaderSimpleResponse,
+)
 
 
 class ReaderModel(BaseModel):
     """Модель для работы с читателями в базе данных через CRUD-операции."""
 
+    # Подсчёт общего числа записей для списков с пагинацией
+    counter = RecordCounter(Reader.__tablename__, READER_COUNT_STRATEGY)
+
+    # Чтение читателей по ID (без книг) пакетами между параллельными запросами
+    loader = BatchLoader(Reader, Reader.reader_id)
+
+    # Столбцы ответа для списков, сериализуемых в БД
+    rows = response_rows(Reader, ReaderSimpleResponse)
+
+    # Сортировки списков по именам (последний столбец ключа уникален)
+    sorts = {
+        "id": SortKey((rows.c.reader_id,)),
+        "email": SortKey((rows.c.email,)),
+    }
+
+    # Сортировка читателей книги (по первичному ключу связей книг и читателей)
+    book_sort = SortKey((book_readers.c.reader_id,))
+
     async def create_object(self, data: dict) -> Reader:
         """Создаёт нового читателя в базе данных."""
         async with get_async_session() as session:
             stmt = insert(Reader).values(data).returning(Reader)
             result = await session.execute(stmt)
-            await session.commit()
+            await commit(session)
             return result.scalar_one()
 
     async def read_object(self, id: int) -> Reader:
@@ -35,39 +96,221 @@ class ReaderModel(BaseModel):
             result = await session.execute(stmt)
             return result.scalar_one()
 
-    async def read_objects(self, page: int, limit: int) -> PaginatedReadersResponse:
-        """Получает список читателей с пагинацией."""
+    async def read_scalars(self, id: int) -> Reader:
+        """Получает читателя по ID без взятых книг."""
+        if self.loader.can_batch():
+            return await self.loader.load(id)
+        async with get_async_session() as session:
+            stmt = select(Reader).where(Reader.reader_id == id)
+            result = await session.execute(stmt)
+            return result.scalar_one()
+
+    async def read_objects_by_ids(self, ids: list[int]) -> list[Reader]:
+        """Получает читателей по списку ID одним запросом, без взятых книг."""
         async with get_async_session() as session:
-            stmt = select(func.count()).select_from(Reader)
+            stmt = select(Reader).where(Reader.reader_id.in_(ids))
             result = await session.execute(stmt)
-            total_records = result.scalar()
+            return list(result.scalars().all())
+
+    async def read_book_ids(self, id: int) -> list[int]:
+        """Получает ID книг, взятых читателем."""
+        async with get_async_session() as session:
+            stmt = select(book_readers.c.book_id).where(book_readers.c.reader_id == id)
+            result = await session.execute(stmt)
+            return list(result.scalars().all())
+
+    async def read_book_ids_many(self, ids: list[int]) -> dict[int, list[int]]:
+        """Получает ID книг, взятых читателями, в порядке возрастания одним запросом."""
+        async with get_async_session() as session:
+            stmt = (
+                select(
+                    book_readers.c.reader_id,
+                    func.array_agg(
+                        aggregate_order_by(
+                            book_readers.c.book_id, book_readers.c.book_id
+                        )
+                    ),
+                )
+                .where(book_readers.c.reader_id.in_(ids))
+                .group_by(book_readers.c.reader_id)
+            )
+            result = await session.execute(stmt)
+            return dict(result.tuples().all())
+
+    async def read_version(self, id: int) -> str:
+        """
+        Получает версию читателя по ID.
 
-            total_pages = ceil(total_records / limit) if total_records > 0 else 1
+        Версия увеличивается и при выдаче или возврате книг, поэтому меняется
+        вместе с набором взятых книг.
+        """
+        if self.loader.can_batch():
+            return str((await self.loader.load(id)).version)
+        async with get_async_session() as session:
+            stmt = select(Reader.version).where(Reader.reader_id == id)
+            result = await session.execute(stmt)
+            return str(result.scalar_one())
 
-            stmt = select(Reader).offset((page - 1) * limit).limit(limit)
+    async def read_book_versions(self, id: int) -> list[tuple[int, int]]:
+        """Получает ID и версии книг, взятых читателем, в порядке ID."""
+        async with get_async_session() as session:
+            stmt = (
+                select(Book.book_id, Book.version)
+                .join(book_readers, book_readers.c.book_id == Book.book_id)
+                .where(book_readers.c.reader_id == id)
+                .order_by(Book.book_id)
+            )
             result = await session.execute(stmt)
-            readers = result.scalars().all()
+            return list(result.tuples())
+
+    async def read_objects(
+        self,
+        page: int,
+        limit: int,
+        filters: Optional[ReaderFilters] = None,
+        sort: ReaderSort = "id",
+        expand: Optional[RowsExpander] = None,
+    ) -> str:
+        """Получает список читателей с фильтрами, сортировкой и пагинацией в виде JSON."""
+        where = self._where(filters)
+        async with get_async_session() as session:
+            stmt = (
+                select_json(self.rows)
+                .where(*where)
+                .order_by(*self.sorts[sort].clauses())
+                .offset((page - 1) * limit)
+                .limit(limit)
+            )
+            readers, total_records = await self.counter.fetch_page(
+                session, stmt, filtered=bool(where)
+            )
+
+            total_pages = None
+            if total_records is not None:
+                total_pages = ceil(total_records / limit) if total_records > 0 else 1
 
-            return PaginatedReadersResponse(
-                data=readers,
-                page=page,
-                limit=limit,
-                total_pages=total_pages,
-                total_records=total_records,
+            return splice_rows(
+                PaginatedReadersResponse(
+                    data=[],
+                    page=page,
+                    limit=limit,
+                    total_pages=total_pages,
+                    total_records=total_records,
+                ),
+                await expand(readers) if expand else readers,
             )
 
+    async def read_objects_by_cursor(
+        self,
+        cursor: Optional[Cursor],
+        limit: int,
+        filters: Optional[ReaderFilters] = None,
+        sort: ReaderSort = "id",
+        expand: Optional[RowsExpander] = None,
+    ) -> str:
+        """
+        Получает список читателей с фильтрами и пагинацией по курсору
+        в порядке сортировки в виде JSON.
+        """
+        async with get_async_session() as session:
+            page, next_cursor = await fetch_keyset_page(
+                session,
+                select_json(self.rows).where(*self._where(filters)),
+                self.sorts[sort],
+                sort,
+                cursor,
+                limit,
+            )
+            return splice_rows(
+                CursorReadersResponse(data=[], limit=limit, next_cursor=next_cursor),
+                await expand(page) if expand else page,
+            )
+
+    async def read_objects_by_book(
+        self, book_id: int, cursor: Optional[Cursor], limit: int
+    ) -> str:
+        """
+        Получает читателей, взявших книгу, с пагинацией по курсору в порядке ID
+        в виде JSON.
+
+        Raises:
+            NoResultFound: Книги нет.
+        """
+        async with get_async_session() as session:
+            page, next_cursor = await fetch_keyset_page(
+                session,
+                select_json(self.rows)
+                .join(book_readers, book_readers.c.reader_id == self.rows.c.reader_id)
+                .where(book_readers.c.book_id == book_id),
+                self.book_sort,
+                "id",
+                cursor,
+                limit,
+            )
+            if not page and cursor is None:
+                stmt = select(Book.book_id).where(Book.book_id == book_id)
+                (await session.execute(stmt)).scalar_one()
+
+            return splice_rows(
+                CursorReadersResponse(data=[], limit=limit, next_cursor=next_cursor),
+                page,
+            )
+
+    def export_objects(
+        self,
+        format: ExportFormat,
+        after: Optional[int],
+        filters: Optional[ReaderFilters] = None,
+    ) -> AsyncIterator[str]:
+        """Выгружает всех читателей с фильтрами в порядке ID потоком пачек строк."""
+        return stream_rows(
+            self.rows, self.rows.c.reader_id, format, after, self._where(filters)
+        )
+
+    def _where(self, filters: Optional[ReaderFilters]) -> list[ColumnElement]:
+        """Строит условия фильтров списка по столбцам ответа."""
+        where = []
+        if filters is None:
+            return where
+        if filters.email_domain is not None:
+            where.append(
+                email_domain(self.rows.c.email) == filters.email_domain.lower()
+            )
+        return where
+
+    async def create_objects(self, data: list[dict]) -> list[BulkResult]:
+        """Вставляет читателей в БД пачками в одной транзакции."""
+        async with get_async_session() as session:
+            results = await bulk_insert(session, Reader, data)
+            await commit(session)
+            return results
+
+    async def update_objects(self, data: list[tuple[int, dict]]) -> list[BulkResult]:
+        """Обновляет читателей в БД по ID пачками в одной транзакции."""
+        async with get_async_session() as session:
+            results = await bulk_update(session, Reader, "reader_id", data)
+            await commit(session)
+            return results
+
+    async def delete_objects(self, ids: list[int]) -> list[BulkResult]:
+        """Удаляет читателей из БД по ID пачками в одной транзакции."""
+        async with get_async_session() as session:
+            results = await bulk_delete(session, Reader, "reader_id", ids)
+            await commit(session)
+            return results
+
     async def update_object(self, id: int, data: dict) -> Reader:
         """Обновляет данные читателя по ID."""
         async with get_async_session() as session:
             stmt = (
                 update(Reader)
                 .where(Reader.reader_id == id)
-                .values(data)
+                .values({**data, "version": Reader.version + 1})
                 .options(selectinload(Reader.books))
                 .returning(Reader)
             )
             result = await session.execute(stmt)
-            await session.commit()
+            await commit(session)
             return result.scalar_one()
 
     async def delete_object(self, id: int) -> Reader:
@@ -75,37 +318,138 @@ class ReaderModel(BaseModel):
         async with get_async_session() as session:
             stmt = delete(Reader).where(Reader.reader_id == id).returning(Reader)
             result = await session.execute(stmt)
-            await session.commit()
+            await commit(session)
             return result.scalar_one()
 
-    async def add_book_to_reader(self, reader_id: int, book_id: int) -> Reader:
-        """Добавляет книгу к читателю."""
-        async with get_async_session() as session:
-            stmt = insert(book_readers).values(book_id=book_id, reader_id=reader_id)
-            result = await session.execute(stmt)
-            await session.commit()
+    async def add_books_to_reader(self, reader_id: int, book_ids: list[int]) -> Row:
+        """
+        Выдаёт читателю книги одним запросом.
 
-            stmt = (
-                select(Reader)
-                .where(Reader.reader_id == reader_id)
-                .options(selectinload(Reader.books))
+        Returns:
+            Row: Читатель с книгами после выдачи и статусы книг в порядке
+            `book_ids` (200 - выдана, 404 - нет книги, 409 - уже выдана).
+        """
+        requested = self._requested(book_ids)
+        changed = (
+            pg_insert(book_readers)
+            .from_select(
+                ["book_id", "reader_id"],
+                select(Book.book_id, literal(reader_id))
+                .where(Book.book_id.in_(select(requested.c.book_id)))
+                .where(exists().where(Reader.reader_id == reader_id)),
             )
-            result = await session.execute(stmt)
-            return result.scalar_one()
+            .on_conflict_do_nothing()
+            .returning(book_readers.c.book_id)
+            .cte("changed")
+        )
+        held = self._held(reader_id).union(select(changed.c.book_id))
+        return await self._change_books(reader_id, requested, changed, held)
 
-    async def remove_book_from_reader(self, reader_id: int, book_id: int) -> Reader:
-        """Удаляет книгу от читателя."""
-        async with get_async_session() as session:
-            stmt = delete(book_readers).where(
-                book_readers.c.book_id == book_id, book_readers.c.reader_id == reader_id
+    async def remove_books_from_reader(
+        self, reader_id: int, book_ids: list[int]
+    ) -> Row:
+        """
+        Возвращает книги читателя одним запросом.
+
+        Returns:
+            Row: Читатель с книгами после возврата и статусы книг в порядке
+            `book_ids` (200 - возвращена, 404 - нет книги, 409 - не выдана).
+        """
+        requested = self._requested(book_ids)
+        changed = (
+            delete(book_readers)
+            .where(
+                book_readers.c.reader_id == reader_id,
+                book_readers.c.book_id.in_(select(requested.c.book_id)),
             )
-            result = await session.execute(stmt)
-            await session.commit()
+            .returning(book_readers.c.book_id)
+            .cte("changed")
+        )
+        held = self._held(reader_id).except_(select(changed.c.book_id))
+        return await self._change_books(reader_id, requested, changed, held)
 
-            stmt = (
-                select(Reader)
+    async def _change_books(
+        self, reader_id: int, requested: CTE, changed: CTE, held: CompoundSelect
+    ) -> Row:
+        """
+        Применяет изменение книг читателя и читает результат тем же запросом.
+
+        Изменяющие подзапросы WITH видят снимок БД до изменения, поэтому
+        книги читателя после изменения вычисляются из снимка и изменённых
+        строк (`held`), а версия - из подзапроса, увеличившего её.
+        """
+        async with get_async_session() as session:
+            bumped = (
+                update(Reader)
                 .where(Reader.reader_id == reader_id)
-                .options(selectinload(Reader.books))
+                .where(exists(select(changed.c.book_id)))
+                .values(version=Reader.version + 1)
+                .returning(Reader.version)
+                .cte("bumped")
             )
-            result = await session.execute(stmt)
-            return result.scalar_one()
+            rows = response_rows(Book, BookResponse)
+            books = (
+                select(
+                    func.coalesce(
+                        func.json_agg(
+                            aggregate_order_by(rows.table_valued(), rows.c.book_id)
+                        ),
+                        literal_column("'[]'::json"),
+                    )
+                )
+                .where(rows.c.book_id.in_(held))
+                .scalar_subquery()
+            )
+            statuses = (
+                select(
+                    func.array_agg(
+                        aggregate_order_by(
+                            case(
+                                (
+                                    changed.c.book_id.is_not(None),
+                                    status.HTTP_200_OK,
+                                ),
+                                (Book.book_id.is_(None), status.HTTP_404_NOT_FOUND),
+                                else_=status.HTTP_409_CONFLICT,
+                            ),
+                            requested.c.ord,
+                        )
+                    )
+                )
+                .select_from(
+                    requested.outerjoin(
+                        changed, changed.c.book_id == requested.c.book_id
+                    ).outerjoin(Book, Book.book_id == requested.c.book_id)
+                )
+                .scalar_subquery()
+            )
+            stmt = select(
+                Reader.reader_id,
+                Reader.first_name,
+                Reader.last_name,
+                Reader.email,
+                func.coalesce(
+                    select(bumped.c.version).scalar_subquery(), Reader.version
+                ).label("version"),
+                type_coerce(books, JSON).label("books"),
+                type_coerce(statuses, ARRAY(Integer)).label("statuses"),
+            ).where(Reader.reader_id == reader_id)
+            # Запрос изменяет данные в подзапросах WITH
+            result = await session.execute(stmt.execution_options(primary=True))
+            await commit(session)
+            return result.one()
+
+    def _requested(self, book_ids: list[int]) -> CTE:
+        """Строит подзапрос ID книг запроса с их порядковыми номерами."""
+        ids = (
+            func.unnest(literal(book_ids, ARRAY(Integer)))
+            .table_valued("book_id", with_ordinality="ord")
+            .render_derived()
+        )
+        return select(ids.c.book_id, ids.c.ord).cte("requested")
+
+    def _held(self, reader_id: int) -> Select:
+        """Строит запрос ID книг, взятых читателем, по снимку до изменения."""
+        return select(book_readers.c.book_id).where(
+            book_readers.c.reader_id == reader_id
+        )
@@ -0,0 +1,171 @@
+"""
+Модуль для постраничной навигации по курсору (keyset).
+
+Курсор - непрозрачная строка base64 с именем сортировки и значениями ключа
+сортировки последней записи страницы. Следующая страница выбирается условием
+`(ключ) > (значения курсора)` (или `<` для обратной сортировки) по индексу,
+поэтому её получение не зависит от глубины, в отличие от OFFSET.
+"""
+
+import json
+import base64
+import binascii
+from datetime import date
+from typing import Any, NamedTuple, Optional, Sequence
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, literal, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+
+class Cursor(NamedTuple):
+    """Разобранный курсор: имя сортировки и значения ключа последней записи."""
+
+    sort: str
+    values: tuple[Any, ...]
+
+
+class SortKey(NamedTuple):
+    """
+    Ключ сортировки списка.
+
+    Последний столбец должен быть уникальным, чтобы порядок записей был
+    полным. Все столбцы сортируются в одном направлении, поэтому условие
+    курсора - сравнение строк, которое проходит по составному индексу.
+    """
+
+    columns: tuple[ColumnElement, ...]
+    descending: bool = False
+
+    def clauses(self) -> list[ColumnElement]:
+        """Строит выражения ORDER BY ключа."""
+        return [
+            column.desc() if self.descending else column.asc()
+            for column in self.columns
+        ]
+
+
+def encode_cursor(sort: str, values: Sequence[Any]) -> str:
+    """Кодирует курсор в непрозрачную строку. Даты кодируются в ISO 8601."""
+    data = json.dumps([sort, *values], separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, key: SortKey) -> Optional[Cursor]:
+    """
+    Разбирает курсор, выданный для указанной сортировки.
+
+    Значения курсора приводятся к типам столбцов ключа сортировки, поэтому
+    подделанный или устаревший курсор отклоняется до запроса к БД.
+
+    Args:
+        cursor (str): Курсор из запроса. Пустая строка - первая страница.
+        sort (str): Сортировка текущего запроса.
+        key (SortKey): Ключ этой сортировки.
+
+    Raises:
+        HTTPException: Курсор повреждён, выдан для другой сортировки или
+            содержит значения не тех типов.
+
+    Returns:
+        Optional[Cursor]: Курсор или None для первой страницы.
+    """
+    if not cursor:
+        return None
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if (
+            not isinstance(data, list)
+            or len(data) != len(key.columns) + 1
+            or data[0] != sort
+        ):
+            raise ValueError(cursor)
+        values = tuple(map(_parse_value, key.columns, data[1:]))
+    except (binascii.Error, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Некорректный курсор."
+        )
+    return Cursor(sort, values)
+
+
+def _parse_value(column: ColumnElement, value: Any) -> Any:
+    """
+    Приводит значение курсора к типу столбца ключа сортировки.
+
+    Raises:
+        ValueError: Значение не подходит столбцу.
+    """
+    python_type = column.type.python_type
+    if python_type is int:
+        # Столбцы ID - INTEGER: большее значение БД отклонила бы ошибкой
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise ValueError(value)
+        if not -(2**31) <= value < 2**31:
+            raise ValueError(value)
+        return value
+    # Остальные значения (строки и даты) кодируются строками
+    if not isinstance(value, str) or "\x00" in value:
+        raise ValueError(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+def keyset_page(
+    stmt: Select,
+    key: SortKey,
+    cursor: Optional[Cursor],
+    limit: int,
+) -> Select:
+    """
+    Ограничивает запрос страницей после курсора.
+
+    Значения курсора (см. `decode_cursor`) передаются параметрами с типами
+    столбцов ключа. Выбирается на одну запись больше `limit`, чтобы узнать,
+    есть ли следующая страница.
+    """
+    if cursor is not None:
+        values = tuple_(
+            *(
+                literal(value, column.type)
+                for column, value in zip(key.columns, cursor.values)
+            )
+        )
+        columns = tuple_(*key.columns)
+        stmt = stmt.where(columns < values if key.descending else columns > values)
+    return stmt.order_by(*key.clauses()).limit(limit + 1)
+
+
+async def fetch_keyset_page(
+    session: AsyncSession,
+    stmt: Select,
+    key: SortKey,
+    sort: str,
+    cursor: Optional[Cursor],
+    limit: int,
+) -> tuple[list[Any], Optional[str]]:
+    """
+    Выполняет запрос страницы после курсора.
+
+    Args:
+        session (AsyncSession): Сессия базы данных.
+        stmt (Select): Запрос, выбирающий запись страницы одним столбцом
+            (например, строку JSON).
+        key (SortKey): Ключ сортировки.
+        sort (str): Имя сортировки (входит в курсор).
+        cursor (Optional[Cursor]): Курсор или None для первой страницы.
+        limit (int): Количество записей на странице.
+
+    Returns:
+        tuple[list[Any], Optional[str]]: Записи страницы и курсор следующей
+        страницы (None на последней).
+    """
+    stmt = keyset_page(stmt.add_columns(*key.columns), key, cursor, limit)
+    result = await session.execute(stmt)
+    rows = result.all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor(sort, tuple(rows[limit - 1][1:]))
+    return [row[0] for row in rows[:limit]], next_cursor
@@ -0,0 +1,159 @@
+"""
+Модуль для маршрутизации чтения в реплики базы данных.
+
+Запросы SELECT направляются в реплики по кругу, остальные запросы -
+в основную БД. Сессия, выполнившая запись, читает из основной БД до
+своего закрытия (см. `RoutingSession` в `src.database`).
+
+Реплики периодически проверяются: недоступная реплика или реплика
+с отставанием больше `REPLICA_MAX_LAG` исключается из круга, пока
+не пройдёт проверку снова. Если исправных реплик нет, чтение идёт
+в основную БД.
+
+Чтение своих записей обеспечивается закреплением за основной БД
+на `REPLICA_MAX_LAG` секунд:
+- клиента - после его запроса на запись (cookie `PRIMARY_COOKIE`);
+- заполнения записей кэша, зависящих от сброшенных пространств имён
+  (`ReplicaRouter.fence`), чтобы кэш не заполнился из отстающей реплики
+  данными, устаревшими относительно нового поколения. Остальное чтение
+  воркера по-прежнему идёт в реплики.
+"""
+
+import time
+import asyncio
+import logging
+import itertools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterable, Iterator, Optional
+
+from sqlalchemy import Engine, Select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from src.config import DB_REPLICA_URLS, REPLICA_MAX_LAG, REPLICA_HEALTH_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+# Cookie с моментом, до которого чтение клиента идёт в основную БД
+PRIMARY_COOKIE = "primary_until"
+
+# Отставание реплики в секундах (0 - реплика догнала основную БД или это не реплика)
+LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "END"
+)
+
+# Момент, до которого чтение текущего запроса идёт в основную БД
+primary_until: ContextVar[float] = ContextVar("primary_until", default=0.0)
+
+
+class ReplicaRouter:
+    """Класс для выбора движка чтения среди исправных реплик."""
+
+    def __init__(self, replicas: list[AsyncEngine]):
+        """Инициализирует маршрутизатор. Реплики считаются исправными до проверки."""
+        self.replicas = replicas
+        self.healthy = list(replicas)
+        self.cycle = itertools.cycle(self.healthy)
+        # Пространства имён кэша -> момент снятия закрепления их заполнения
+        self.fenced: dict[str, float] = {}
+
+    def reader(self) -> Optional[Engine]:
+        """
+        Выбирает движок для чтения.
+
+        Returns:
+            Optional[Engine]: Синхронный движок реплики или None, если чтение
+            должно идти в основную БД.
+        """
+        if not self.healthy:
+            return None
+        if time.time() < primary_until.get():
+            return None
+        return next(self.cycle).sync_engine
+
+    def fence(self, namespaces: Iterable[str]) -> None:
+        """
+        Закрепляет за основной БД заполнение записей кэша, зависящих от
+        сброшенных пространств имён, на `REPLICA_MAX_LAG` секунд.
+        """
+        if not self.replicas:
+            return
+        now = time.time()
+        self.fenced = {ns: until for ns, until in self.fenced.items() if until > now}
+        for namespace in namespaces:
+            self.fenced[namespace] = now + REPLICA_MAX_LAG
+
+    @contextmanager
+    def fenced_reads(self, namespaces: Iterable[str]) -> Iterator[None]:
+        """
+        Направляет чтение в основную БД, пока заполняется запись кэша,
+        зависящая от недавно сброшенных пространств имён.
+        """
+        until = max((self.fenced.get(ns, 0.0) for ns in namespaces), default=0.0)
+        if until <= max(time.time(), primary_until.get()):
+            yield
+            return
+        token = primary_until.set(until)
+        try:
+            yield
+        finally:
+            primary_until.reset(token)
+
+    async def check_health(self) -> None:
+        """Проверяет реплики и обновляет круг исправных."""
+        lags = await asyncio.gather(
+            *(self._lag(replica) for replica in self.replicas),
+            return_exceptions=True,
+        )
+        healthy = []
+        for replica, lag in zip(self.replicas, lags):
+            if isinstance(lag, BaseException) or lag > REPLICA_MAX_LAG:
+                if replica in self.healthy:
+                    logger.warning(f"Replica {replica.url!r} is unhealthy: {lag}")
+                continue
+            if replica not in self.healthy:
+                logger.info(f"Replica {replica.url!r} is healthy again")
+            healthy.append(replica)
+        if healthy != self.healthy:
+            self.healthy = healthy
+            self.cycle = itertools.cycle(healthy)
+
+    async def monitor(self) -> None:
+        """Периодически проверяет реплики."""
+        if not self.replicas:
+            return
+        while True:
+            await self.check_health()
+            await asyncio.sleep(REPLICA_HEALTH_INTERVAL)
+
+    async def dispose(self) -> None:
+        """Закрывает пулы соединений реплик."""
+        for replica in self.replicas:
+            await replica.dispose()
+
+    async def _lag(self, replica: AsyncEngine) -> float:
+        """Получает отставание реплики в секундах."""
+        async with asyncio.timeout(REPLICA_HEALTH_INTERVAL):
+            async with replica.connect() as connection:
+                return float(await connection.scalar(LAG_QUERY))
+
+
+def is_read(statement) -> bool:
+    """
+    Проверяет, можно ли выполнить запрос в реплике.
+
+    Запросы SELECT ... FOR UPDATE и запросы, помеченные параметром
+    выполнения `primary` (например, SELECT с изменяющими подзапросами WITH),
+    выполняются в основной БД.
+    """
+    return (
+        isinstance(statement, Select)
+        and statement._for_update_arg is None
+        and not statement.get_execution_options().get("primary", False)
+    )
+
+
+# Маршрутизатор чтения по репликам из настроек (без реплик всё идёт в основную БД)
+replicas = ReplicaRouter([create_async_engine(url) for url in DB_REPLICA_URLS])
@@ -3,28 +3,46 @@
 
 Предоставляет маршруты для выполнения CRUD-операций с авторами:
 - (POST /create) Создание нового автора
-- (GET /) Получение списка авторов с пагинацией
-- (GET /{author_id}) Получение автора по ID
+- (GET /) Получение списка авторов с фильтрами, сортировкой и пагинацией
+  по номеру страницы или по курсору, либо авторов по списку ID (?ids=1,2,3),
+  с книгами (?expand=books)
+- (GET /export) Потоковая выгрузка всех авторов в NDJSON или CSV
+- (POST /bulk) Пакетное создание авторов
+- (PATCH /bulk) Пакетное обновление авторов
+- (DELETE /bulk) Пакетное удаление авторов
+- (GET /{author_id}) Получение автора по ID, с книгами (?expand=books)
 - (PUT /{author_id}) Обновление данных автора
 - (DELETE /{author_id}) Удаление автора
+- (GET /{author_id}/books) Получение книг автора с пагинацией по курсору
 """
 
-import json
-from typing import Annotated
-from fastapi import APIRouter, Depends, Query
+from typing import Annotated, Optional
+from fastapi import APIRouter, Body, Depends, Query
+from fastapi.responses import StreamingResponse
 
+from src.config import BULK_MAX_ITEMS
+from src.cache import cached_response
+from src.export import ExportFormat, export_response
+from src.entity_cache import parse_ids
 from src.routes.depens import (
     author_controller,
-    redis_client,
+    author_filters,
     AuthorController,
-    RedisClient,
 )
 from src.schemas.author import (
+    AuthorFilters,
+    AuthorSort,
+    AuthorExpand,
     AuthorCreate,
     PaginatedAuthorsResponse,
+    CursorAuthorsResponse,
+    BatchAuthorsResponse,
     AuthorResponse,
     AuthorUpdate,
+    AuthorBulkUpdate,
 )
+from src.schemas.book import AuthorBooksSort, CursorBooksResponse
+from src.schemas.bulk import BulkResponse
 
 # Роутер для работы с авторами
 router = APIRouter()
@@ -39,47 +57,122 @@ async def create_author(
     return await controller.create_object(author)
 
 
-@router.get("", response_model=PaginatedAuthorsResponse)
+@router.get(
+    "",
+    response_model=PaginatedAuthorsResponse
+    | CursorAuthorsResponse
+    | BatchAuthorsResponse,
+)
+@cached_response(
+    # Страница по курсору не зависит от номера страницы
+    lambda cursor, **_: (
+        "authors:cursor:{cursor}" if cursor is not None else "authors:page:{page}"
+    )
+    + ":limit:{limit}:sort:{sort}:filters:{filters.key}:expand:{expand}",
+    lambda expand, **_: ("author:list", "book:list") if expand else ("author:list",),
+    bypass=lambda ids, **_: ids is not None,
+)
 async def get_authors(
-    redis_client: Annotated[RedisClient, Depends(redis_client)],
     controller: Annotated[AuthorController, Depends(author_controller)],
+    filters: Annotated[AuthorFilters, Depends(author_filters)],
     page: int = Query(1, ge=1, description="Номер страницы, начиная с 1"),
     limit: int = Query(
         10, ge=1, le=100, description="Количество элементов на странице"
     ),
+    cursor: Optional[str] = Query(
+        None,
+        description="Курсор страницы (пустая строка - первая страница). "
+        "Включает пагинацию по курсору вместо номера страницы",
+    ),
+    sort: AuthorSort = Query("id", description='Сортировка ("-" - по убыванию)'),
+    ids: Optional[str] = Query(
+        None,
+        description="ID через запятую (не более 100). Возвращает записи "
+        "в порядке ID и список отсутствующих вместо страницы",
+    ),
+    expand: Optional[AuthorExpand] = Query(
+        None, description="Вложить в авторов связанные объекты (books - книги)"
+    ),
+):
+    """
+    Получает список авторов с фильтрами и сортировкой, с пагинацией
+    по номеру страницы или по курсору либо авторов по списку ID.
+    """
+    if ids is not None:
+        return await controller.read_objects_by_ids(parse_ids(ids), expand)
+    if cursor is not None:
+        return await controller.read_objects_by_cursor(
+            cursor, limit, filters, sort, expand
+        )
+    return await controller.read_objects(page, limit, filters, sort, expand)
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_authors(
+    controller: Annotated[AuthorController, Depends(author_controller)],
+    filters: Annotated[AuthorFilters, Depends(author_filters)],
+    format: ExportFormat = Query("ndjson", description="Формат выгрузки"),
+    after: Optional[int] = Query(
+        None,
+        ge=0,
+        description="Выгружать записи с ID больше указанного "
+        "(продолжение прерванной выгрузки)",
+    ),
+):
+    """Выгружает всех авторов в порядке ID потоком, без пагинации."""
+    return export_response(
+        controller.export_objects(format, after, filters), "authors", format
+    )
+
+
+@router.post("/bulk", response_model=BulkResponse[AuthorResponse])
+async def create_authors(
+    controller: Annotated[AuthorController, Depends(author_controller)],
+    authors: Annotated[list[AuthorCreate], Body(max_length=BULK_MAX_ITEMS)],
 ):
-    """Получает список авторов с пагинацией."""
-    cache_key = f"authors:page:{page}:limit:{limit}"
-    cache_value = await redis_client.get(cache_key)
-    if cache_value:
-        return json.loads(cache_value)
+    """Создаёт несколько авторов одним запросом со статусом каждого элемента."""
+    return await controller.create_objects(authors)
 
-    authors = await controller.read_objects(page, limit)
 
-    await redis_client.set(cache_key, authors.model_dump_json())
-    await redis_client.expire(cache_key, 15)
+@router.patch("/bulk", response_model=BulkResponse[AuthorResponse])
+async def update_authors(
+    controller: Annotated[AuthorController, Depends(author_controller)],
+    authors: Annotated[list[AuthorBulkUpdate], Body(max_length=BULK_MAX_ITEMS)],
+):
+    """Обновляет несколько авторов одним запросом со статусом каждого элемента."""
+    return await controller.update_objects(authors)
 
-    return authors
+
+@router.delete("/bulk", response_model=BulkResponse[AuthorResponse])
+async def delete_authors(
+    controller: Annotated[AuthorController, Depends(author_controller)],
+    ids: Annotated[list[int], Body(max_length=BULK_MAX_ITEMS)],
+):
+    """Удаляет несколько авторов по ID одним запросом со статусом каждого элемента."""
+    return await controller.delete_objects(ids)
 
 
 @router.get("/{author_id}", response_model=AuthorResponse)
+@cached_response(
+    lambda expand, **_: (
+        "author:{author_id}:expand:{expand}" if expand else "author:{author_id}"
+    ),
+    lambda expand, **_: (
+        ("author:{author_id}", "book:list") if expand else ("author:{author_id}",)
+    ),
+    version=lambda controller, author_id, expand, **_: controller.read_version(
+        author_id, expand
+    ),
+)
 async def get_author(
-    redis_client: Annotated[RedisClient, Depends(redis_client)],
     controller: Annotated[AuthorController, Depends(author_controller)],
     author_id: int,
+    expand: Optional[AuthorExpand] = Query(
+        None, description="Вложить в автора связанные объекты (books - книги)"
+    ),
 ):
     """Получает автора по ID."""
-    cache_key = f"author:{author_id}"
-    cache_value = await redis_client.get(cache_key)
-    if cache_value:
-        return json.loads(cache_value)
-
-    author = await controller.read_object(author_id)
-
-    await redis_client.set(cache_key, author.model_dump_json())
-    await redis_client.expire(cache_key, 15)
-
-    return author
+    return await controller.read_object(author_id, expand)
 
 
 @router.put("/{author_id}", response_model=AuthorResponse)
@@ -99,3 +192,25 @@ async def delete_author(
 ):
     """Удаляет автора."""
     return await controller.delete_object(author_id)
+
+
+@router.get("/{author_id}/books", response_model=CursorBooksResponse)
+@cached_response(
+    "author:{author_id}:books:cursor:{cursor}:limit:{limit}:sort:{sort}",
+    ("author:{author_id}", "book:list"),
+)
+async def get_author_books(
+    controller: Annotated[AuthorController, Depends(author_controller)],
+    author_id: int,
+    cursor: str = Query(
+        "", description="Курсор страницы (пустая строка - первая страница)"
+    ),
+    limit: int = Query(
+        10, ge=1, le=100, description="Количество элементов на странице"
+    ),
+    sort: AuthorBooksSort = Query(
+        "publication_year", description='Сортировка ("-" - по убыванию)'
+    ),
+):
+    """Получает книги автора в порядке года публикации с пагинацией по курсору."""
+    return await controller.read_books(author_id, cursor, limit, sort)
@@ -3,28 +3,49 @@
 
 Предоставляет маршруты для выполнения CRUD-операций с книгами:
 - (POST /create) Создание новой книги
-- (GET /) Получение списка книг с пагинацией
+- (GET /) Получение списка книг с фильтрами, сортировкой и пагинацией
+  по номеру страницы или по курсору, либо книг по списку ID (?ids=1,2,3),
+  с авторами (?expand=author)
+- (GET /search) Поиск книг по названию с фильтрами по категории и автору
+- (GET /export) Потоковая выгрузка всех книг в NDJSON или CSV
+- (POST /bulk) Пакетное создание книг
+- (PATCH /bulk) Пакетное обновление книг
+- (DELETE /bulk) Пакетное удаление книг
 - (GET /{book_id}) Получение книги по ID
 - (PUT /{book_id}) Обновление данных книги
 - (DELETE /{book_id}) Удаление книги
+- (GET /{book_id}/readers) Получение читателей книги с пагинацией по курсору
 """
 
-import json
-from typing import Annotated
-from fastapi import APIRouter, Depends, Query
+from typing import Annotated, Optional
+from fastapi import APIRouter, Body, Depends, Query
+from fastapi.responses import StreamingResponse
 
+from src.config import BULK_MAX_ITEMS
+from src.cache import cached_response
+from src.export import ExportFormat, export_response
+from src.entity_cache import parse_ids
 from src.routes.depens import (
     book_controller,
-    redis_client,
+    book_filters,
+    search_query,
     BookController,
-    RedisClient,
 )
 from src.schemas.book import (
+    BookFilters,
+    BookSort,
+    BookExpand,
+    BookCategory,
     BookCreate,
     PaginatedBooksResponse,
+    CursorBooksResponse,
+    BatchBooksResponse,
     BookResponse,
     BookUpdate,
+    BookBulkUpdate,
 )
+from src.schemas.bulk import BulkResponse
+from src.schemas.reader import CursorReadersResponse
 
 # Роутер для работы с книгами
 router = APIRouter()
@@ -39,46 +60,134 @@ async def create_book(
     return await controller.create_object(book)
 
 
-@router.get("", response_model=PaginatedBooksResponse)
+@router.get(
+    "",
+    response_model=PaginatedBooksResponse | CursorBooksResponse | BatchBooksResponse,
+)
+@cached_response(
+    # Страница по курсору не зависит от номера страницы
+    lambda cursor, **_: (
+        "books:cursor:{cursor}" if cursor is not None else "books:page:{page}"
+    )
+    + ":limit:{limit}:sort:{sort}:filters:{filters.key}:expand:{expand}",
+    lambda expand, **_: ("book:list", "author:list") if expand else ("book:list",),
+    bypass=lambda ids, **_: ids is not None,
+)
 async def get_books(
-    redis_client: Annotated[RedisClient, Depends(redis_client)],
     controller: Annotated[BookController, Depends(book_controller)],
+    filters: Annotated[BookFilters, Depends(book_filters)],
+    page: int = Query(1, ge=1, description="Номер страницы, начиная с 1"),
+    limit: int = Query(
+        10, ge=1, le=100, description="Количество элементов на странице"
+    ),
+    cursor: Optional[str] = Query(
+        None,
+        description="Курсор страницы (пустая строка - первая страница). "
+        "Включает пагинацию по курсору вместо номера страницы",
+    ),
+    sort: BookSort = Query("id", description='Сортировка ("-" - по убыванию)'),
+    ids: Optional[str] = Query(
+        None,
+        description="ID через запятую (не более 100). Возвращает записи "
+        "в порядке ID и список отсутствующих вместо страницы",
+    ),
+    expand: Optional[BookExpand] = Query(
+        None, description="Вложить в книги связанные объекты (author - автора)"
+    ),
+):
+    """
+    Получает список книг с фильтрами и сортировкой, с пагинацией
+    по номеру страницы или по курсору либо книг по списку ID.
+    """
+    if ids is not None:
+        return await controller.read_objects_by_ids(parse_ids(ids), expand)
+    if cursor is not None:
+        return await controller.read_objects_by_cursor(
+            cursor, limit, filters, sort, expand
+        )
+    return await controller.read_objects(page, limit, filters, sort, expand)
+
+
+@router.get("/search", response_model=PaginatedBooksResponse)
+@cached_response(
+    "books:search:q:{q}:category:{category}:author:{author_id}"
+    ":page:{page}:limit:{limit}",
+    ("book:list",),
+)
+async def search_books(
+    controller: Annotated[BookController, Depends(book_controller)],
+    q: Annotated[str, Depends(search_query)],
+    category: Optional[BookCategory] = Query(None, description="Категория книг"),
+    author_id: Optional[int] = Query(None, ge=1, description="ID автора книг"),
     page: int = Query(1, ge=1, description="Номер страницы, начиная с 1"),
     limit: int = Query(
         10, ge=1, le=100, description="Количество элементов на странице"
     ),
 ):
-    """Получает список книг с пагинацией."""
-    cache_key = f"books:page:{page}:limit:{limit}"
-    cache_value = await redis_client.get(cache_key)
-    if cache_value:
-        return json.loads(cache_value)
+    """
+    Ищет книги по названию (словам, части слова или с опечатками),
+    упорядочивая их по релевантности.
+    """
+    return await controller.search_objects(q, category, author_id, page, limit)
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_books(
+    controller: Annotated[BookController, Depends(book_controller)],
+    filters: Annotated[BookFilters, Depends(book_filters)],
+    format: ExportFormat = Query("ndjson", description="Формат выгрузки"),
+    after: Optional[int] = Query(
+        None,
+        ge=0,
+        description="Выгружать записи с ID больше указанного "
+        "(продолжение прерванной выгрузки)",
+    ),
+):
+    """Выгружает все книги в порядке ID потоком, без пагинации."""
+    return export_response(
+        controller.export_objects(format, after, filters), "books", format
+    )
+
+
+@router.post("/bulk", response_model=BulkResponse[BookResponse])
+async def create_books(
+    controller: Annotated[BookController, Depends(book_controller)],
+    books: Annotated[list[BookCreate], Body(max_length=BULK_MAX_ITEMS)],
+):
+    """Создаёт несколько книг одним запросом со статусом каждого элемента."""
+    return await controller.create_objects(books)
 
-    books = await controller.read_objects(page, limit)
 
-    await redis_client.set(cache_key, books.model_dump_json())
-    await redis_client.expire(cache_key, 15)
+@router.patch("/bulk", response_model=BulkResponse[BookResponse])
+async def update_books(
+    controller: Annotated[BookController, Depends(book_controller)],
+    books: Annotated[list[BookBulkUpdate], Body(max_length=BULK_MAX_ITEMS)],
+):
+    """Обновляет несколько книг одним запросом со статусом каждого элемента."""
+    return await controller.update_objects(books)
 
-    return books
+
+@router.delete("/bulk", response_model=BulkResponse[BookResponse])
+async def delete_books(
+    controller: Annotated[BookController, Depends(book_controller)],
+    ids: Annotated[list[int], Body(max_length=BULK_MAX_ITEMS)],
+):
+    """Удаляет несколько книг по ID одним запросом со статусом каждого элемента."""
+    return await controller.delete_objects(ids)
 
 
 @router.get("/{book_id}", response_model=BookResponse)
+@cached_response(
+    "book:{book_id}",
+    ("book:{book_id}", "book:detail"),
+    version=lambda controller, book_id, **_: controller.read_version(book_id),
+)
 async def get_book(
     controller: Annotated[BookController, Depends(book_controller)],
     book_id: int,
 ):
     """Получает книгу по ID."""
-    cache_key = f"book:{book_id}"
-    cache_value = await redis_client.get(cache_key)
-    if cache_value:
-        return json.loads(cache_value)
-
-    book = await controller.read_object(book_id)
-
-    await redis_client.set(cache_key, book.model_dump_json())
-    await redis_client.expire(cache_key, 15)
-
-    return book
+    return await controller.read_object(book_id)
 
 
 @router.put("/{book_id}", response_model=BookResponse)
@@ -98,3 +207,22 @@ async def delete_book(
 ):
     """Удаляет книгу."""
     return await controller.delete_object(book_id)
+
+
+@router.get("/{book_id}/readers", response_model=CursorReadersResponse)
+@cached_response(
+    "book:{book_id}:readers:cursor:{cursor}:limit:{limit}",
+    ("book:{book_id}", "reader:list", "reader:list:books"),
+)
+async def get_book_readers(
+    controller: Annotated[BookController, Depends(book_controller)],
+    book_id: int,
+    cursor: str = Query(
+        "", description="Курсор страницы (пустая строка - первая страница)"
+    ),
+    limit: int = Query(
+        10, ge=1, le=100, description="Количество элементов на странице"
+    ),
+):
+    """Получает читателей, взявших книгу, в порядке ID с пагинацией по курсору."""
+    return await controller.read_readers(book_id, cursor, limit)
@@ -0,0 +1,19 @@
+"""
+Модуль маршрутов для наблюдения за кэшем через API.
+
+Предоставляет маршруты:
+- (GET /stats) Получение счётчиков кэша текущего воркера
+"""
+
+from fastapi import APIRouter
+
+from src.cache_codec import cache_stats
+
+# Роутер для работы с кэшем
+router = APIRouter()
+
+
+@router.get("/stats")
+async def get_cache_stats() -> dict[str, int]:
+    """Получает счётчики кэша текущего воркера."""
+    return cache_stats.as_dict()
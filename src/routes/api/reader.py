@@ -3,28 +3,60 @@
 
 Предоставляет маршруты для выполнения CRUD-операций с читателями:
 - (POST /create) Создание нового читателя
-- (GET /) Получение списка читателей с пагинацией
-- (GET /{reader_id}) Получение читателя по ID
+- (GET /) Получение списка читателей с фильтрами, сортировкой и пагинацией
+  по номеру страницы или по курсору, либо читателей по списку ID (?ids=1,2,3),
+  со взятыми книгами (?expand=books)
+- (GET /export) Потоковая выгрузка всех читателей в NDJSON или CSV
+- (POST /bulk) Пакетное создание читателей
+- (PATCH /bulk) Пакетное обновление читателей
+- (DELETE /bulk) Пакетное удаление читателей
+- (GET /{reader_id}) Получение читателя по ID, с ограничением числа книг
+  (?books_limit=N) или без книг (?books_limit=0)
 - (PUT /{reader_id}) Обновление данных читателя
 - (DELETE /{reader_id}) Удаление читателя
+- (GET /{reader_id}/books) Получение книг читателя с пагинацией по курсору
+- (PUT /{reader_id}/books) Выдача читателю нескольких книг
+- (DELETE /{reader_id}/books) Возврат нескольких книг читателя
+- (PUT /{reader_id}/books/{book_id}) Выдача книги читателю
+- (DELETE /{reader_id}/books/{book_id}) Возврат книги читателя
 """
 
-import json
-from typing import Annotated
-from fastapi import APIRouter, Depends, Query
+from typing import Annotated, Optional
+from fastapi import APIRouter, Body, Depends, Query, Request
+from fastapi.responses import StreamingResponse
 
+from src.config import BULK_MAX_ITEMS
+from src.cache import (
+    cached_response,
+    entry_response,
+    etag_matches,
+    not_modified_response,
+    record_hit,
+)
+from src.export import ExportFormat, export_response
+from src.entity_cache import parse_ids
 from src.routes.depens import (
     reader_controller,
-    redis_client,
+    reader_filters,
     ReaderController,
-    RedisClient,
 )
 from src.schemas.reader import (
+    ReaderFilters,
+    ReaderSort,
+    ReaderExpand,
     ReaderResponse,
+    ReaderLimitedResponse,
+    ReaderBooksResponse,
     PaginatedReadersResponse,
+    CursorReadersResponse,
+    BatchReadersResponse,
+    ReaderSimpleResponse,
     ReaderCreate,
     ReaderUpdate,
+    ReaderBulkUpdate,
 )
+from src.schemas.book import CursorBooksResponse
+from src.schemas.bulk import BulkResponse
 
 # Роутер для работы с читателями
 router = APIRouter()
@@ -39,47 +71,134 @@ async def create_reader(
     return await controller.create_object(reader)
 
 
-@router.get("", response_model=PaginatedReadersResponse)
+@router.get(
+    "",
+    response_model=PaginatedReadersResponse
+    | CursorReadersResponse
+    | BatchReadersResponse,
+)
+@cached_response(
+    # Страница по курсору не зависит от номера страницы
+    lambda cursor, **_: (
+        "readers:cursor:{cursor}" if cursor is not None else "readers:page:{page}"
+    )
+    + ":limit:{limit}:sort:{sort}:filters:{filters.key}:expand:{expand}",
+    lambda expand, **_: (
+        ("reader:list", "reader:list:books", "book:list")
+        if expand
+        else ("reader:list",)
+    ),
+    bypass=lambda ids, **_: ids is not None,
+)
 async def get_readers(
-    redis_client: Annotated[RedisClient, Depends(redis_client)],
     controller: Annotated[ReaderController, Depends(reader_controller)],
+    filters: Annotated[ReaderFilters, Depends(reader_filters)],
     page: int = Query(1, ge=1, description="Номер страницы, начиная с 1"),
     limit: int = Query(
         10, ge=1, le=100, description="Количество элементов на странице"
     ),
+    cursor: Optional[str] = Query(
+        None,
+        description="Курсор страницы (пустая строка - первая страница). "
+        "Включает пагинацию по курсору вместо номера страницы",
+    ),
+    sort: ReaderSort = Query("id", description='Сортировка ("-" - по убыванию)'),
+    ids: Optional[str] = Query(
+        None,
+        description="ID через запятую (не более 100). Возвращает записи "
+        "в порядке ID и список отсутствующих вместо страницы",
+    ),
+    expand: Optional[ReaderExpand] = Query(
+        None, description="Вложить в читателей связанные объекты (books - книги)"
+    ),
 ):
-    """Получает список читателей с пагинацией."""
-    cache_key = f"readers:page:{page}:limit:{limit}"
-    cache_value = await redis_client.get(cache_key)
-    if cache_value:
-        return json.loads(cache_value)
+    """
+    Получает список читателей с фильтрами и сортировкой, с пагинацией
+    по номеру страницы или по курсору либо читателей по списку ID.
+    """
+    if ids is not None:
+        return await controller.read_objects_by_ids(parse_ids(ids), expand)
+    if cursor is not None:
+        return await controller.read_objects_by_cursor(
+            cursor, limit, filters, sort, expand
+        )
+    return await controller.read_objects(page, limit, filters, sort, expand)
 
-    readers = await controller.read_objects(page, limit)
 
-    await redis_client.set(cache_key, readers.model_dump_json())
-    await redis_client.expire(cache_key, 15)
+@router.get("/export", response_class=StreamingResponse)
+async def export_readers(
+    controller: Annotated[ReaderController, Depends(reader_controller)],
+    filters: Annotated[ReaderFilters, Depends(reader_filters)],
+    format: ExportFormat = Query("ndjson", description="Формат выгрузки"),
+    after: Optional[int] = Query(
+        None,
+        ge=0,
+        description="Выгружать записи с ID больше указанного "
+        "(продолжение прерванной выгрузки)",
+    ),
+):
+    """Выгружает всех читателей в порядке ID потоком, без пагинации."""
+    return export_response(
+        controller.export_objects(format, after, filters), "readers", format
+    )
 
-    return readers
 
+@router.post("/bulk", response_model=BulkResponse[ReaderSimpleResponse])
+async def create_readers(
+    controller: Annotated[ReaderController, Depends(reader_controller)],
+    readers: Annotated[list[ReaderCreate], Body(max_length=BULK_MAX_ITEMS)],
+):
+    """Создаёт несколько читателей одним запросом со статусом каждого элемента."""
+    return await controller.create_objects(readers)
 
-@router.get("/{reader_id}", response_model=ReaderResponse)
-async def get_reader(
-    redis_client: Annotated[RedisClient, Depends(redis_client)],
+
+@router.patch("/bulk", response_model=BulkResponse[ReaderSimpleResponse])
+async def update_readers(
     controller: Annotated[ReaderController, Depends(reader_controller)],
-    reader_id: int,
+    readers: Annotated[list[ReaderBulkUpdate], Body(max_length=BULK_MAX_ITEMS)],
 ):
-    """Получает читателя по ID."""
-    cache_key = f"reader:{reader_id}"
-    cache_value = await redis_client.get(cache_key)
-    if cache_value:
-        return json.loads(cache_value)
+    """Обновляет несколько читателей одним запросом со статусом каждого элемента."""
+    return await controller.update_objects(readers)
 
-    reader = await controller.read_object(reader_id)
 
-    await redis_client.set(cache_key, reader.model_dump_json())
-    await redis_client.expire(cache_key, 15)
+@router.delete("/bulk", response_model=BulkResponse[ReaderSimpleResponse])
+async def delete_readers(
+    controller: Annotated[ReaderController, Depends(reader_controller)],
+    ids: Annotated[list[int], Body(max_length=BULK_MAX_ITEMS)],
+):
+    """Удаляет несколько читателей по ID одним запросом со статусом каждого элемента."""
+    return await controller.delete_objects(ids)
 
-    return reader
+
+@router.get(
+    "/{reader_id}",
+    response_model=ReaderResponse | ReaderLimitedResponse | ReaderSimpleResponse,
+)
+async def get_reader(
+    controller: Annotated[ReaderController, Depends(reader_controller)],
+    reader_id: int,
+    request: Request,
+    books_limit: Optional[int] = Query(
+        None,
+        ge=0,
+        le=100,
+        description="Наибольшее число книг в ответе (0 - без книг). Остальные "
+        "книги доступны по курсору books_next_cursor через GET /{reader_id}/books",
+    ),
+):
+    """
+    Получает читателя по ID, собирая ответ из нормализованного кэша.
+
+    Условный запрос проверяется по версиям записей до сборки ответа.
+    """
+    record_hit(request)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        etag = await controller.read_version(reader_id, books_limit)
+        if etag_matches(if_none_match, etag):
+            return not_modified_response(etag)
+    entry = await controller.read_detail(reader_id, books_limit)
+    return entry_response(entry, if_none_match)
 
 
 @router.put("/{reader_id}", response_model=ReaderResponse)
@@ -101,6 +220,45 @@ async def delete_reader(
     return await controller.delete_object(reader_id)
 
 
+@router.get("/{reader_id}/books", response_model=CursorBooksResponse)
+@cached_response(
+    "reader:{reader_id}:books:cursor:{cursor}:limit:{limit}",
+    ("reader:{reader_id}", "reader:{reader_id}:books", "book:list"),
+)
+async def get_reader_books(
+    controller: Annotated[ReaderController, Depends(reader_controller)],
+    reader_id: int,
+    cursor: str = Query(
+        "", description="Курсор страницы (пустая строка - первая страница)"
+    ),
+    limit: int = Query(
+        10, ge=1, le=100, description="Количество элементов на странице"
+    ),
+):
+    """Получает книги, взятые читателем, в порядке ID с пагинацией по курсору."""
+    return await controller.read_books(reader_id, cursor, limit)
+
+
+@router.put("/{reader_id}/books", response_model=ReaderBooksResponse)
+async def add_books_to_reader(
+    controller: Annotated[ReaderController, Depends(reader_controller)],
+    reader_id: int,
+    book_ids: Annotated[list[int], Body(max_length=BULK_MAX_ITEMS)],
+):
+    """Выдаёт читателю книги одним запросом, сообщая результат по каждой книге."""
+    return await controller.add_books_to_reader(reader_id, book_ids)
+
+
+@router.delete("/{reader_id}/books", response_model=ReaderBooksResponse)
+async def remove_books_from_reader(
+    controller: Annotated[ReaderController, Depends(reader_controller)],
+    reader_id: int,
+    book_ids: Annotated[list[int], Body(max_length=BULK_MAX_ITEMS)],
+):
+    """Возвращает книги читателя одним запросом, сообщая результат по каждой книге."""
+    return await controller.remove_books_from_reader(reader_id, book_ids)
+
+
 @router.put("/{reader_id}/books/{book_id}", response_model=ReaderResponse)
 async def add_book_to_reader(
     controller: Annotated[ReaderController, Depends(reader_controller)],
@@ -2,12 +2,84 @@
 Модуль для создания зависимостей.
 """
 
+from typing import AsyncIterator, Optional
+
+from fastapi import Query
+
+from src.database import UnitOfWork
 from src.controllers.author import AuthorController
 from src.controllers.book import BookController
 from src.controllers.reader import ReaderController
+from src.schemas.author import AuthorFilters, Nationality
+from src.schemas.book import BookFilters, BookCategory
+from src.schemas.reader import ReaderFilters
+from src.search import normalize_query
 from src.utils import RedisClient
 
 
+async def unit_of_work() -> AsyncIterator[UnitOfWork]:
+    """
+    Открывает единицу работы на время запроса: все операции запроса
+    выполняются в одной сессии и фиксируются один раз в конце.
+    """
+    async with UnitOfWork() as unit:
+        yield unit
+
+
+def search_query(
+    q: str = Query(..., max_length=100, description="Поисковый запрос"),
+) -> str:
+    """Возвращает нормализованный поисковый запрос (он же часть ключа кэша)."""
+    return normalize_query(q)
+
+
+def author_filters(
+    nationality: Optional[Nationality] = Query(
+        None, description="Национальность автора"
+    ),
+    last_name: Optional[str] = Query(
+        None, min_length=1, max_length=50, description="Фамилия автора"
+    ),
+) -> AuthorFilters:
+    """Возвращает фильтры списка авторов из параметров запроса."""
+    return AuthorFilters(nationality=nationality, last_name=last_name)
+
+
+def book_filters(
+    category: Optional[BookCategory] = Query(None, description="Категория книги"),
+    author_id: Optional[int] = Query(None, ge=1, description="ID автора книги"),
+    year_from: Optional[int] = Query(
+        None, ge=1, le=9999, description="Год публикации от (включительно)"
+    ),
+    year_to: Optional[int] = Query(
+        None, ge=1, le=9999, description="Год публикации до (включительно)"
+    ),
+    title_prefix: Optional[str] = Query(
+        None, min_length=1, max_length=50, description="Начало названия книги"
+    ),
+) -> BookFilters:
+    """Возвращает фильтры списка книг из параметров запроса."""
+    return BookFilters(
+        category=category,
+        author_id=author_id,
+        year_from=year_from,
+        year_to=year_to,
+        title_prefix=title_prefix,
+    )
+
+
+def reader_filters(
+    email_domain: Optional[str] = Query(
+        None,
+        min_length=1,
+        max_length=253,
+        description="Домен email читателя (без учёта регистра)",
+    ),
+) -> ReaderFilters:
+    """Возвращает фильтры списка читателей из параметров запроса."""
+    return ReaderFilters(email_domain=email_domain)
+
+
 def author_controller() -> AuthorController:
     """Возвращает новый экземпляр AuthorController."""
     return AuthorController()
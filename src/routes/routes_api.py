@@ -2,21 +2,43 @@
 Модуль маршрутов API приложения.
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
 from src.routes.api.author import router as author_router
+from src.routes.api.cache import router as cache_router
 from src.routes.api.book import router as book_router
 from src.routes.api.reader import router as reader_router
+from src.routes.depens import unit_of_work
 
 # Создание основного роутера с префиксом /v1
 router = APIRouter(prefix="/v1")
 
 
+# Маршруты сущностей выполняются в единице работы запроса (см. `unit_of_work`)
+
 # Добавление роутера авторов под префиксом /authors с тегом "Authors"
-router.include_router(author_router, prefix="/authors", tags=["Авторы"])
+router.include_router(
+    author_router,
+    prefix="/authors",
+    tags=["Авторы"],
+    dependencies=[Depends(unit_of_work)],
+)
 
 # Добавление роутера книг под префиксом /books с тегом "Books"
-router.include_router(book_router, prefix="/books", tags=["Книги"])
+router.include_router(
+    book_router,
+    prefix="/books",
+    tags=["Книги"],
+    dependencies=[Depends(unit_of_work)],
+)
 
 # Добавление роутера читателей под префиксом /readers с тегом "Readers"
-router.include_router(reader_router, prefix="/readers", tags=["Читатели"])
+router.include_router(
+    reader_router,
+    prefix="/readers",
+    tags=["Читатели"],
+    dependencies=[Depends(unit_of_work)],
+)
+
+# Добавление роутера кэша под префиксом /cache с тегом "Cache"
+router.include_router(cache_router, prefix="/cache", tags=["Кэш"])
@@ -3,9 +3,11 @@
 """
 
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Literal, Optional
 from enum import Enum
 
+from src.schemas.pagination import ListFilters, PaginatedResponse
+
 
 class Nationality(str, Enum):
     """Enum для указания национальности автора."""
@@ -27,15 +29,58 @@ class AuthorResponse(BaseModel):
     nationality: Nationality = Field(..., description="Author's nationality")
 
 
-class PaginatedAuthorsResponse(BaseModel):
+class PaginatedAuthorsResponse(PaginatedResponse):
     """Схема для представления списка авторов с пагинацией."""
 
     model_config = {"from_attributes": True}
     data: List[AuthorResponse] = Field(..., description="List of authors")
     page: int = Field(..., ge=1, description="Current page number")
     limit: int = Field(..., ge=1, le=100, description="Records per page")
-    total_pages: int = Field(..., ge=1, description="Total number of pages")
-    total_records: int = Field(..., ge=0, description="Total number of records")
+    total_pages: Optional[int] = Field(
+        None, ge=1, description="Total number of pages, omitted if not counted"
+    )
+    total_records: Optional[int] = Field(
+        None, ge=0, description="Total number of records, omitted if not counted"
+    )
+
+
+class CursorAuthorsResponse(BaseModel):
+    """Схема для представления списка авторов с пагинацией по курсору."""
+
+    model_config = {"from_attributes": True}
+    data: List[AuthorResponse] = Field(..., description="List of authors")
+    limit: int = Field(..., ge=1, le=100, description="Records per page")
+    next_cursor: Optional[str] = Field(
+        None, description="Cursor of the next page, null on the last page"
+    )
+
+
+class BatchAuthorsResponse(BaseModel):
+    """Схема для представления авторов, запрошенных по списку ID."""
+
+    model_config = {"from_attributes": True}
+    data: List[AuthorResponse] = Field(
+        ..., description="Found authors in the order of requested IDs"
+    )
+    missing: List[int] = Field(..., description="Requested IDs that do not exist")
+
+
+class AuthorFilters(ListFilters):
+    """Схема фильтров списка авторов."""
+
+    nationality: Optional[Nationality] = Field(
+        None, description="Nationality of the author"
+    )
+    last_name: Optional[str] = Field(
+        None, min_length=1, max_length=50, description="Last name of the author"
+    )
+
+
+# Сортировки списка авторов
+AuthorSort = Literal["id", "last_name"]
+
+# Связи, вкладываемые в авторов (`expand`)
+AuthorExpand = Literal["books"]
 
 
 class AuthorCreate(BaseModel):
@@ -56,3 +101,9 @@ class AuthorUpdate(BaseModel):
         None, max_length=50, description="Author's last name"
     )
     nationality: Optional[Nationality] = Field(None, description="Author's nationality")
+
+
+class AuthorBulkUpdate(AuthorUpdate):
+    """Схема для представления данных авторов при пакетном обновлении."""
+
+    author_id: int = Field(..., description="Identifier of the author to update")
@@ -3,10 +3,12 @@
 """
 
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Literal, Optional
 from enum import Enum
 from datetime import date as Date
 
+from src.schemas.pagination import ListFilters, PaginatedResponse
+
 
 class BookCategory(str, Enum):
     """Enum для указания категории книги."""
@@ -29,15 +31,66 @@ class BookResponse(BaseModel):
     author_id: Optional[int] = Field(None, description="Identifier of the author")
 
 
-class PaginatedBooksResponse(BaseModel):
+class PaginatedBooksResponse(PaginatedResponse):
     """Схема для представления списка книг с пагинацией."""
 
     model_config = {"from_attributes": True}
     data: List[BookResponse] = Field(..., description="List of books")
     page: int = Field(..., ge=1, description="Current page number")
     limit: int = Field(..., ge=1, le=100, description="Number of records per page")
-    total_pages: int = Field(..., ge=1, description="Total number of pages")
-    total_records: int = Field(..., ge=0, description="Total number of records")
+    total_pages: Optional[int] = Field(
+        None, ge=1, description="Total number of pages, omitted if not counted"
+    )
+    total_records: Optional[int] = Field(
+        None, ge=0, description="Total number of records, omitted if not counted"
+    )
+
+
+class CursorBooksResponse(BaseModel):
+    """Схема для представления списка книг с пагинацией по курсору."""
+
+    model_config = {"from_attributes": True}
+    data: List[BookResponse] = Field(..., description="List of books")
+    limit: int = Field(..., ge=1, le=100, description="Number of records per page")
+    next_cursor: Optional[str] = Field(
+        None, description="Cursor of the next page, null on the last page"
+    )
+
+
+class BatchBooksResponse(BaseModel):
+    """Схема для представления книг, запрошенных по списку ID."""
+
+    model_config = {"from_attributes": True}
+    data: List[BookResponse] = Field(
+        ..., description="Found books in the order of requested IDs"
+    )
+    missing: List[int] = Field(..., description="Requested IDs that do not exist")
+
+
+class BookFilters(ListFilters):
+    """Схема фильтров списка книг."""
+
+    category: Optional[BookCategory] = Field(None, description="Category of the book")
+    author_id: Optional[int] = Field(None, ge=1, description="Identifier of the author")
+    year_from: Optional[int] = Field(
+        None, ge=1, le=9999, description="Earliest publication year, inclusive"
+    )
+    year_to: Optional[int] = Field(
+        None, ge=1, le=9999, description="Latest publication year, inclusive"
+    )
+    title_prefix: Optional[str] = Field(
+        None, min_length=1, max_length=50, description="Beginning of the title"
+    )
+
+
+# Сортировки списка книг ("-" - по убыванию)
+BookSort = Literal["id", "title", "publication_year", "-publication_year"]
+
+# Связи, вкладываемые в книги (`expand`)
+BookExpand = Literal["author"]
+
+# Сортировки книг автора ("-" - по убыванию)
+AuthorBooksSort = Literal["publication_year", "-publication_year"]
 
 
 class BookCreate(BaseModel):
@@ -58,3 +111,9 @@ class BookUpdate(BaseModel):
     )
     category: Optional[BookCategory] = Field(None, description="Book category")
     author_id: Optional[int] = Field(None, description="Identifier of the author")
+
+
+class BookBulkUpdate(BookUpdate):
+    """Схема для представления данных книг при пакетном обновлении."""
+
+    book_id: int = Field(..., description="Identifier of the book to update")
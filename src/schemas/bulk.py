@@ -0,0 +1,29 @@
+"""
+Модуль со схемами для пакетных операций.
+"""
+
+from typing import Generic, List, Optional, TypeVar
+
+from pydantic import BaseModel, Field
+
+# Схема объекта в результате пакетной операции
+T = TypeVar("T")
+
+
+class BulkItemResult(BaseModel, Generic[T]):
+    """Схема для представления результата операции над одним элементом."""
+
+    index: int = Field(..., ge=0, description="Index of the item in the request")
+    status: int = Field(..., description="HTTP status of the item operation")
+    data: Optional[T] = Field(None, description="Resulting object on success")
+    detail: Optional[str] = Field(None, description="Error description on failure")
+
+
+class BulkResponse(BaseModel, Generic[T]):
+    """Схема для представления результата пакетной операции."""
+
+    results: List[BulkItemResult[T]] = Field(
+        ..., description="Per-item results in request order"
+    )
+    succeeded: int = Field(..., ge=0, description="Number of successful items")
+    failed: int = Field(..., ge=0, description="Number of failed items")
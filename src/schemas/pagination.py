@@ -0,0 +1,46 @@
+"""
+Модуль с базовыми схемами списков с пагинацией и их фильтров.
+"""
+
+import json
+from typing import Any
+
+from pydantic import BaseModel, SerializerFunctionWrapHandler, model_serializer
+
+
+class PaginatedResponse(BaseModel):
+    """
+    Базовая схема списка с пагинацией по номеру страницы.
+
+    Если общее число записей не считалось, итоги (`total_pages`
+    и `total_records`) в ответ не выводятся.
+    """
+
+    @model_serializer(mode="wrap")
+    def omit_unknown_totals(
+        self, handler: SerializerFunctionWrapHandler
+    ) -> dict[str, Any]:
+        data = handler(self)
+        if data.get("total_records") is None:
+            data.pop("total_pages", None)
+            data.pop("total_records", None)
+        return data
+
+
+class ListFilters(BaseModel):
+    """
+    Базовая схема фильтров списка (параметры запроса).
+
+    Незаданные фильтры равны None и не ограничивают список.
+    """
+
+    @property
+    def key(self) -> str:
+        """Часть ключа кэша из заданных фильтров (JSON, однозначна для значений)."""
+        return json.dumps(
+            self.model_dump(mode="json", exclude_none=True), separators=(",", ":")
+        )
+
+    def __bool__(self) -> bool:
+        """Проверяет, задан ли хотя бы один фильтр."""
+        return bool(self.model_dump(exclude_none=True))
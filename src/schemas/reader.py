@@ -3,7 +3,10 @@
 """
 
 from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional
+from typing import List, Literal, Optional
+
+from src.schemas.bulk import BulkResponse
+from src.schemas.pagination import ListFilters, PaginatedResponse
 
 
 class ReaderResponse(BaseModel):
@@ -23,6 +26,16 @@ class ReaderResponse(BaseModel):
     )
 
 
+class ReaderLimitedResponse(ReaderResponse):
+    """Схема для представления читателя с ограниченным списком книг."""
+
+    books_next_cursor: Optional[str] = Field(
+        None,
+        description="Cursor of the next page of GET /readers/{reader_id}/books, "
+        "null if all books are listed",
+    )
+
+
 class ReaderSimpleResponse(BaseModel):
     """Схема для представления читателя."""
 
@@ -37,15 +50,58 @@ class ReaderSimpleResponse(BaseModel):
     email: str = Field(..., max_length=255, description="Email of the reader")
 
 
-class PaginatedReadersResponse(BaseModel):
+class PaginatedReadersResponse(PaginatedResponse):
     """Схема для представления списка читателей с пагинацией."""
 
     model_config = {"from_attributes": True}
     data: List[ReaderSimpleResponse] = Field(..., description="List of readers")
     page: int = Field(..., ge=1, description="Current page number")
     limit: int = Field(..., ge=1, le=100, description="Number of records per page")
-    total_pages: int = Field(..., ge=1, description="Total number of pages")
-    total_records: int = Field(..., ge=0, description="Total number of records")
+    total_pages: Optional[int] = Field(
+        None, ge=1, description="Total number of pages, omitted if not counted"
+    )
+    total_records: Optional[int] = Field(
+        None, ge=0, description="Total number of records, omitted if not counted"
+    )
+
+
+class CursorReadersResponse(BaseModel):
+    """Схема для представления списка читателей с пагинацией по курсору."""
+
+    model_config = {"from_attributes": True}
+    data: List[ReaderSimpleResponse] = Field(..., description="List of readers")
+    limit: int = Field(..., ge=1, le=100, description="Number of records per page")
+    next_cursor: Optional[str] = Field(
+        None, description="Cursor of the next page, null on the last page"
+    )
+
+
+class BatchReadersResponse(BaseModel):
+    """Схема для представления читателей, запрошенных по списку ID."""
+
+    model_config = {"from_attributes": True}
+    data: List[ReaderSimpleResponse] = Field(
+        ..., description="Found readers in the order of requested IDs"
+    )
+    missing: List[int] = Field(..., description="Requested IDs that do not exist")
+
+
+class ReaderFilters(ListFilters):
+    """Схема фильтров списка читателей."""
+
+    email_domain: Optional[str] = Field(
+        None,
+        min_length=1,
+        max_length=253,
+        description="Domain of the reader's email, case-insensitive",
+    )
+
+
+# Сортировки списка читателей
+ReaderSort = Literal["id", "email"]
+
+# Связи, вкладываемые в читателей (`expand`)
+ReaderExpand = Literal["books"]
 
 
 class ReaderCreate(BaseModel):
@@ -72,6 +128,25 @@ class ReaderUpdate(BaseModel):
     )
 
 
+class ReaderBulkUpdate(ReaderUpdate):
+    """Схема для представления данных читателей при пакетном обновлении."""
+
+    reader_id: int = Field(..., description="Identifier of the reader to update")
+
+
+class ReaderBooksResponse(BulkResponse[int]):
+    """
+    Схема для представления результата пакетной выдачи или возврата книг.
+
+    Успешные элементы содержат ID книги.
+    """
+
+    reader: ReaderResponse = Field(
+        ..., description="Reader with borrowed books after the operation"
+    )
+
+
 from src.schemas.book import BookResponse  # noqa
 
 ReaderResponse.model_rebuild()
+ReaderBooksResponse.model_rebuild()
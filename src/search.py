@@ -0,0 +1,63 @@
+"""
+Модуль для полнотекстового и триграммного поиска по названиям.
+
+Запись находится, если выполнено одно из условий:
+- слова запроса есть в названии с учётом словоформ - `tsvector @@ tsquery`
+  по хранимому столбцу `tsvector` с индексом GIN;
+- запрос похож на часть названия - `запрос <% название` (сходство слов
+  `pg_trgm`) по индексу GIN `gin_trgm_ops`. Так находятся части слов
+  и названия с опечатками.
+
+Оба условия поддерживаются индексами, поэтому PostgreSQL объединяет их
+через BitmapOr, не просматривая таблицу. Результаты упорядочиваются по сумме
+релевантности `ts_rank_cd` и сходства слов.
+"""
+
+from fastapi import HTTPException, status
+from sqlalchemy import ColumnElement, func, literal, or_
+
+# Конфигурация текстового поиска PostgreSQL (столбец `tsvector` и запросы)
+SEARCH_CONFIG = "english"
+
+# Наименьшая длина запроса: более короткие строки не дают триграмм
+MIN_QUERY_LENGTH = 3
+
+
+def normalize_query(q: str) -> str:
+    """
+    Приводит поисковый запрос к нормальной форме (ключ кэша).
+
+    Регистр и пробелы не влияют на результаты, поэтому запросы, отличающиеся
+    только ими, получают одну запись кэша.
+
+    Raises:
+        HTTPException: Запрос короче `MIN_QUERY_LENGTH` символов.
+    """
+    normalized = " ".join(q.lower().split())
+    if len(normalized) < MIN_QUERY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Поисковый запрос должен содержать не менее "
+            f"{MIN_QUERY_LENGTH} символов.",
+        )
+    return normalized
+
+
+def title_search(
+    title: ColumnElement, tsv: ColumnElement, q: str
+) -> tuple[ColumnElement, ColumnElement]:
+    """
+    Строит условие поиска по названию и выражение его релевантности.
+
+    Args:
+        title (ColumnElement): Столбец названия с индексом `gin_trgm_ops`.
+        tsv (ColumnElement): Столбец `tsvector` названия с индексом GIN.
+        q (str): Нормализованный запрос.
+
+    Returns:
+        tuple[ColumnElement, ColumnElement]: Условие и релевантность.
+    """
+    query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    condition = or_(tsv.op("@@")(query), literal(q).op("<%")(title))
+    rank = func.ts_rank_cd(tsv, query) + func.word_similarity(q, title)
+    return condition, rank
@@ -1,36 +1,151 @@
-from typing import Any
+from typing import Any, Iterable, Mapping, Optional
 import redis.asyncio as redis
-from contextlib import asynccontextmanager
 
-from src.config import REDIS_HOST, REDIS_PORT
+from src.config import REDIS_HOST, REDIS_PORT, REDIS_MAX_CONNECTIONS
 
+# Скрипт снятия блокировки: удаляет ключ, только если он принадлежит владельцу
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
 
-@asynccontextmanager
-async def get_redis_client():
-    """Функция для получения клиента Redis."""
-    async with redis.Redis(host=REDIS_HOST, port=REDIS_PORT) as client:
-        yield client
+# Скрипт замены множества: записывает его, только если ключ-страж не изменился
+# с момента, когда значения были прочитаны из источника
+REPLACE_SET_SCRIPT = """
+if (redis.call("get", KEYS[2]) or "") ~= ARGV[1] then
+    return 0
+end
+redis.call("del", KEYS[1])
+redis.call("sadd", KEYS[1], unpack(ARGV, 3))
+redis.call("expire", KEYS[1], ARGV[2])
+return 1
+"""
+
+# Скрипт изменения счётчика: изменяет его, только если он уже сохранён
+INCREMENT_EXISTING_SCRIPT = """
+if redis.call("exists", KEYS[1]) == 1 then
+    return redis.call("incrby", KEYS[1], ARGV[1])
+end
+return false
+"""
+
+# Общий пул соединений Redis на всё приложение
+redis_pool = redis.ConnectionPool(
+    host=REDIS_HOST, port=REDIS_PORT, max_connections=REDIS_MAX_CONNECTIONS
+)
+
+
+def get_redis_client() -> redis.Redis:
+    """Функция для получения клиента Redis поверх общего пула соединений."""
+    return redis.Redis(connection_pool=redis_pool)
+
+
+async def close_redis_pool() -> None:
+    """Закрывает все соединения общего пула Redis."""
+    await redis_pool.aclose()
 
 
 class RedisClient:
     """Класс для работы с Redis."""
 
-    async def set(self, key: str, value: str) -> None:
-        """Сохраняет объект в Redis."""
-        async with get_redis_client() as client:
-            await client.set(key, value)
+    def __init__(self, client: Optional[redis.Redis] = None):
+        """Инициализирует клиент, по умолчанию использующий общий пул."""
+        self.client = client or get_redis_client()
+
+    async def set(
+        self, key: str, value: str | bytes, expiration_time: Optional[int] = None
+    ) -> None:
+        """Сохраняет объект в Redis, атомарно задавая время жизни (SET ... EX)."""
+        await self.client.set(key, value, ex=expiration_time)
 
     async def get(self, key: str) -> Any:
         """Получает сохраненный объект из Redis."""
-        async with get_redis_client() as client:
-            return await client.get(key)
+        return await self.client.get(key)
 
-    async def delete(self, key: str) -> bool:
-        """Удаляет ключ из Redis."""
-        async with get_redis_client() as client:
-            return await client.delete(key)
+    async def delete(self, *keys: str) -> int:
+        """Удаляет ключи из Redis."""
+        if not keys:
+            return 0
+        return await self.client.delete(*keys)
 
     async def expire(self, key: str, expiration_time: int) -> None:
         """Устанавливает время жизни для ключа в Redis."""
-        async with get_redis_client() as client:
-            await client.expire(key, expiration_time)
+        await self.client.expire(key, expiration_time)
+
+    async def mget(self, keys: Iterable[str]) -> list[Any]:
+        """Получает несколько объектов из Redis за один запрос (MGET)."""
+        keys = list(keys)
+        if not keys:
+            return []
+        return await self.client.mget(keys)
+
+    async def mset(
+        self, mapping: Mapping[str, str | bytes], expiration_time: Optional[int] = None
+    ) -> None:
+        """
+        Сохраняет несколько объектов за один запрос.
+
+        Без времени жизни используется MSET, иначе - конвейер из SET ... EX,
+        так как MSET не поддерживает TTL.
+        """
+        if not mapping:
+            return
+        if expiration_time is None:
+            await self.client.mset(mapping)
+            return
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key, value in mapping.items():
+                pipe.set(key, value, ex=expiration_time)
+            await pipe.execute()
+
+    async def acquire_lock(self, key: str, token: str, timeout: float) -> bool:
+        """Захватывает блокировку (SET NX PX) с автоматическим снятием по таймауту."""
+        return bool(await self.client.set(key, token, nx=True, px=int(timeout * 1000)))
+
+    async def release_lock(self, key: str, token: str) -> None:
+        """Снимает блокировку, если она всё ещё принадлежит владельцу токена."""
+        await self.client.eval(RELEASE_LOCK_SCRIPT, 1, key, token)
+
+    async def increment_existing(self, key: str, amount: int) -> Optional[int]:
+        """Изменяет сохранённый счётчик на `amount`. Отсутствующий ключ не создаётся."""
+        return await self.client.eval(INCREMENT_EXISTING_SCRIPT, 1, key, amount)
+
+    async def replace_set(
+        self,
+        key: str,
+        members: Iterable[str | int],
+        expiration_time: int,
+        guard_key: str,
+        guard_value: Optional[bytes],
+    ) -> bool:
+        """
+        Заменяет множество, если значение ключа-стража не изменилось.
+
+        Args:
+            key (str): Ключ множества.
+            members (Iterable[str | int]): Элементы множества (хотя бы один).
+            expiration_time (int): Время жизни множества в секундах.
+            guard_key (str): Ключ-страж.
+            guard_value (Optional[bytes]): Значение стража, прочитанное до
+                загрузки элементов (None, если ключа не было).
+
+        Returns:
+            bool: Было ли множество записано.
+        """
+        return bool(
+            await self.client.eval(
+                REPLACE_SET_SCRIPT,
+                2,
+                key,
+                guard_key,
+                guard_value or b"",
+                expiration_time,
+                *members,
+            )
+        )
+
+    def pipeline(self, transaction: bool = False) -> redis.client.Pipeline:
+        """Создаёт конвейер для отправки нескольких команд за один запрос."""
+        return self.client.pipeline(transaction=transaction)
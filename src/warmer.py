@@ -0,0 +1,175 @@
+"""
+Модуль для прогрева кэша.
+
+Прогреватель запрашивает маршруты приложения напрямую через ASGI, поэтому
+записи кэша заполняются тем же кодом, что и при обычных запросах:
+- при запуске - первые страницы списков и самые запрашиваемые адреса;
+- после инвалидации - первые страницы и горячие адреса, зависящие от
+  сброшенных пространств имён.
+
+Популярность адресов считается в памяти воркера и периодически сбрасывается
+в отсортированное множество Redis одним конвейером. Число одновременных
+запросов прогревателя ограничено, чтобы он не занимал весь пул соединений БД.
+"""
+
+import asyncio
+import logging
+from collections import Counter
+from typing import Iterable, Optional
+
+import httpx
+from fastapi import FastAPI
+
+from src.config import (
+    WARMER_ENABLED,
+    WARMER_LIST_PAGES,
+    WARMER_HOT_ITEMS,
+    WARMER_CONCURRENCY,
+    WARMER_FLUSH_INTERVAL,
+)
+from src.utils import RedisClient
+
+logger = logging.getLogger(__name__)
+
+# Пути ресурсов по именам сущностей из графа инвалидации
+RESOURCE_PATHS = {
+    "author": "/v1/authors",
+    "book": "/v1/books",
+    "reader": "/v1/readers",
+}
+
+# Отсортированное множество Redis с популярностью адресов
+HITS_KEY = "warmer:hits"
+
+# Заголовок запросов прогревателя (они не учитываются в популярности)
+WARMER_HEADER = "X-Cache-Warmer"
+
+# Сколько адресов хранить в множестве популярности сверх горячих
+HITS_RETENTION_FACTOR = 10
+
+
+class CacheWarmer:
+    """Класс прогревателя кэша текущего воркера."""
+
+    def __init__(self):
+        """Инициализирует прогреватель. Запросы возможны только после `start`."""
+        self.redis = RedisClient()
+        self.client: Optional[httpx.AsyncClient] = None
+        self.semaphore = asyncio.Semaphore(WARMER_CONCURRENCY)
+        self.hits: Counter[str] = Counter()
+        self.hot: list[str] = []
+        self.pending: set[str] = set()
+        self.tasks: set[asyncio.Task] = set()
+
+    def record_hit(self, url: str) -> None:
+        """Учитывает обращение к адресу."""
+        if (
+            len(self.hits) < WARMER_HOT_ITEMS * HITS_RETENTION_FACTOR
+            or url in self.hits
+        ):
+            self.hits[url] += 1
+
+    async def start(self, app: FastAPI) -> None:
+        """Подключает прогреватель к приложению и прогревает кэш в фоне."""
+        if not WARMER_ENABLED:
+            return
+        self.client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://cache-warmer",
+            headers={WARMER_HEADER: "1"},
+        )
+        self._spawn(self._run())
+
+    async def stop(self) -> None:
+        """Останавливает фоновые задачи прогревателя."""
+        for task in list(self.tasks):
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    def refill(self, namespaces: Iterable[str]) -> None:
+        """Прогревает адреса, зависящие от сброшенных пространств имён."""
+        urls = []
+        for namespace in namespaces:
+            urls.extend(self._urls_for(namespace))
+        self.schedule(urls)
+
+    def schedule(self, urls: Iterable[str]) -> None:
+        """Запускает прогрев адресов, которые ещё не прогреваются."""
+        if self.client is None:
+            return
+        for url in urls:
+            if url not in self.pending:
+                self.pending.add(url)
+                self._spawn(self._warm(url))
+
+    async def flush_hits(self) -> None:
+        """Сбрасывает накопленные обращения в Redis и обновляет горячие адреса."""
+        hits, self.hits = self.hits, Counter()
+        async with self.redis.pipeline() as pipe:
+            for url, count in hits.items():
+                pipe.zincrby(HITS_KEY, count, url)
+            pipe.zremrangebyrank(
+                HITS_KEY, 0, -WARMER_HOT_ITEMS * HITS_RETENTION_FACTOR - 1
+            )
+            pipe.zrevrange(HITS_KEY, 0, WARMER_HOT_ITEMS - 1)
+            result = await pipe.execute()
+        self.hot = [url.decode() for url in result[-1]]
+
+    async def _run(self) -> None:
+        """Прогревает кэш при запуске и периодически сбрасывает обращения."""
+        # Без Redis при запуске прогреваются только первые страницы списков
+        try:
+            await self.flush_hits()
+        except Exception:
+            logger.exception("Failed to load hot cache warmer URLs")
+        self.schedule(
+            [
+                f"{path}?page={page}"
+                for path in RESOURCE_PATHS.values()
+                for page in range(1, WARMER_LIST_PAGES + 1)
+            ]
+            + self.hot
+        )
+        while True:
+            await asyncio.sleep(WARMER_FLUSH_INTERVAL)
+            try:
+                await self.flush_hits()
+            except Exception:
+                logger.exception("Failed to flush cache warmer hits")
+
+    def _urls_for(self, namespace: str) -> list[str]:
+        """Возвращает адреса, ответы которых зависят от пространства имён."""
+        entity, _, scope = namespace.partition(":")
+        # Вложенные пространства (`reader:{id}:books`) относятся к объекту
+        scope = scope.partition(":")[0]
+        path = RESOURCE_PATHS[entity]
+        if scope == "list":
+            pages = [f"{path}?page={page}" for page in range(1, WARMER_LIST_PAGES + 1)]
+            return pages + [url for url in self.hot if url.startswith(f"{path}?")]
+        if scope == "detail":
+            return [url for url in self.hot if url.startswith(f"{path}/")]
+        item = f"{path}/{scope}"
+        return [url for url in self.hot if url == item or url.startswith(f"{item}?")]
+
+    async def _warm(self, url: str) -> None:
+        """Запрашивает адрес, ограничивая число одновременных запросов."""
+        try:
+            async with self.semaphore:
+                await self.client.get(url)
+        except Exception:
+            logger.exception(f"Failed to warm cache for {url}")
+        finally:
+            self.pending.discard(url)
+
+    def _spawn(self, coroutine) -> None:
+        """Запускает фоновую задачу, сохраняя ссылку на неё."""
+        task = asyncio.create_task(coroutine)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+
+# Прогреватель текущего воркера
+warmer = CacheWarmer()
@@ -0,0 +1,38 @@
+"""
+Тесты построения и сравнения ETag записей кэша.
+"""
+
+import pytest
+
+from src.cache import etag_matches, make_etag
+
+
+def test_make_etag_is_weak_and_stable():
+    etag = make_etag("book:1", "3")
+    assert etag.startswith('W/"') and etag.endswith('"')
+    assert etag == make_etag("book:1", "3")
+
+
+@pytest.mark.parametrize("key, version", [("book:2", "3"), ("book:1", "4")])
+def test_make_etag_depends_on_key_and_version(key, version):
+    assert make_etag(key, version) != make_etag("book:1", "3")
+
+
+@pytest.mark.parametrize(
+    "if_none_match, matches",
+    [
+        ("*", True),
+        # Слабое сравнение: префикс W/ не учитывается
+        (make_etag("book:1", "3"), True),
+        (make_etag("book:1", "3").removeprefix("W/"), True),
+        (f'"other", {make_etag("book:1", "3")}', True),
+        (make_etag("book:1", "4"), False),
+        ("", False),
+    ],
+)
+def test_etag_matches(if_none_match, matches):
+    assert etag_matches(if_none_match, make_etag("book:1", "3")) is matches
+
+
+def test_empty_etag_never_matches():
+    assert not etag_matches("*", "")
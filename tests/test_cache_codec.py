@@ -0,0 +1,52 @@
+"""
+Тесты кодеков записей кэша.
+"""
+
+import pytest
+
+from src.cache_codec import (
+    CODECS,
+    FORMAT_VERSION,
+    IdentityCodec,
+    compression_codec,
+    decode,
+    encode,
+)
+from src.config import CACHE_COMPRESSION_THRESHOLD
+
+SMALL = b'{"book_id":1}'
+LARGE = b'{"title":"Dune"},' * CACHE_COMPRESSION_THRESHOLD
+
+
+@pytest.mark.parametrize(
+    "codec", CODECS.values(), ids=lambda codec: type(codec).__name__
+)
+def test_codec_round_trip(codec):
+    assert codec.decompress(codec.compress(LARGE)) == LARGE
+
+
+def test_small_body_is_not_compressed():
+    data = encode(SMALL)
+    assert data[:2] == bytes((FORMAT_VERSION, IdentityCodec.id))
+    assert decode(data) == SMALL
+
+
+def test_large_body_is_compressed():
+    data = encode(LARGE)
+    assert data[:2] == bytes((FORMAT_VERSION, compression_codec.id))
+    assert len(data) < len(LARGE)
+    assert decode(data) == LARGE
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"",
+        bytes((FORMAT_VERSION,)),
+        # Запись прежнего формата или неизвестного кодека считается промахом
+        bytes((FORMAT_VERSION - 1, IdentityCodec.id)) + SMALL,
+        bytes((FORMAT_VERSION, 255)) + SMALL,
+    ],
+)
+def test_unknown_format_is_miss(data):
+    assert decode(data) is None
@@ -0,0 +1,83 @@
+"""
+Тесты DDL шагов миграций, построенного из метаданных моделей.
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy.dialects.postgresql.asyncpg import dialect
+
+from src.migrations import MIGRATIONS, add_column, create_index, replace_constraint
+
+
+class RecordingConnection:
+    """Соединение, которое записывает команды вместо их выполнения."""
+
+    dialect = dialect()
+
+    def __init__(self, invalid: bool = False):
+        self.statements: list[str] = []
+        self.invalid = invalid
+
+    async def exec_driver_sql(self, sql: str) -> None:
+        self.statements.append(sql)
+
+    async def scalar(self, *args) -> bool:
+        # Запрос признака недостроенного индекса
+        return self.invalid
+
+
+def run(step, connection=None) -> list[str]:
+    """Выполняет шаг миграции и возвращает его команды."""
+    connection = connection or RecordingConnection()
+    asyncio.run(step(connection))
+    return connection.statements
+
+
+def test_versions_increase():
+    versions = [migration.version for migration in MIGRATIONS]
+    assert versions == sorted(set(versions))
+
+
+@pytest.mark.parametrize(
+    "step",
+    [step for migration in MIGRATIONS for step in migration.steps],
+)
+def test_steps_compile(step):
+    # Каждый шаг находит свои индексы, столбцы и ограничения в метаданных
+    assert run(step)
+
+
+def test_add_column():
+    assert run(add_column("books", "version")) == [
+        "ALTER TABLE books ADD COLUMN IF NOT EXISTS version "
+        "INTEGER DEFAULT '1' NOT NULL"
+    ]
+
+
+def test_create_index_concurrently():
+    assert run(create_index("books", "ix_books_category")) == [
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_books_category "
+        "ON books (category, book_id)"
+    ]
+
+
+def test_create_index_rebuilds_invalid():
+    statements = run(
+        create_index("books", "ix_books_category"), RecordingConnection(invalid=True)
+    )
+    assert statements[0] == "DROP INDEX CONCURRENTLY IF EXISTS ix_books_category"
+    assert statements[1].startswith("CREATE INDEX CONCURRENTLY IF NOT EXISTS")
+
+
+def test_replace_constraint():
+    add, validate = run(
+        replace_constraint("books", "fk_author", "books_author_id_fkey")
+    )
+    assert add == (
+        "ALTER TABLE books DROP CONSTRAINT IF EXISTS books_author_id_fkey, "
+        "DROP CONSTRAINT IF EXISTS fk_author, "
+        "ADD CONSTRAINT fk_author FOREIGN KEY(author_id) "
+        "REFERENCES authors (author_id) ON DELETE SET NULL NOT VALID"
+    )
+    assert validate == "ALTER TABLE books VALIDATE CONSTRAINT fk_author"
@@ -0,0 +1,72 @@
+"""
+Тесты разбора курсоров постраничной навигации.
+"""
+
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+
+from src.database import Book
+from src.pagination import SortKey, _parse_value, decode_cursor, encode_cursor
+
+
+@pytest.mark.parametrize(
+    "column, value, expected",
+    [
+        (Book.book_id, 42, 42),
+        (Book.book_id, -(2**31), -(2**31)),
+        (Book.title, "Dune", "Dune"),
+        (Book.publication_year, "1965-08-01", date(1965, 8, 1)),
+    ],
+)
+def test_parse_value(column, value, expected):
+    assert _parse_value(column, value) == expected
+
+
+@pytest.mark.parametrize(
+    "column, value",
+    [
+        # INTEGER: только целые в пределах 32 бит, bool не считается числом
+        (Book.book_id, True),
+        (Book.book_id, 1.0),
+        (Book.book_id, "1"),
+        (Book.book_id, 2**31),
+        (Book.book_id, -(2**31) - 1),
+        # Строки и даты кодируются строками без нулевых символов
+        (Book.title, 1),
+        (Book.title, "a\x00b"),
+        (Book.publication_year, 1965),
+        (Book.publication_year, "1965-13-01"),
+    ],
+)
+def test_parse_value_rejects(column, value):
+    with pytest.raises(ValueError):
+        _parse_value(column, value)
+
+
+KEY = SortKey((Book.publication_year, Book.book_id))
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("year", [date(1965, 8, 1), 7])
+    assert decode_cursor(cursor, "year", KEY) == ("year", (date(1965, 8, 1), 7))
+
+
+def test_empty_cursor_is_first_page():
+    assert decode_cursor("", "year", KEY) is None
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        encode_cursor("title", [date(1965, 8, 1), 7]),
+        encode_cursor("year", [date(1965, 8, 1)]),
+        encode_cursor("year", ["1965-08-01", "7"]),
+    ],
+)
+def test_invalid_cursor(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, "year", KEY)
+    assert error.value.status_code == 400